@@ -22,7 +22,9 @@ from pathlib import Path
 
 import numpy as np
 import plotly.figure_factory as pff
-import pandas as pd
+
+sys.path.insert(0, format(Path(__file__).parent.parent / "csv_utility"))
+from csv_reader import add_reader_argument, read_csv
 
 VERSION = 1.0
 
@@ -85,6 +87,7 @@ example:
     arg_parser.add_argument("--show_scale", dest="SSCALE", help="show scale", action='store_true', default=False)
 
     arg_parser.add_argument('csv_file', metavar='CSV_FILE', help='csv files to read', nargs=1)
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -151,7 +154,7 @@ if __name__ == "__main__":
 
     #--- processing
 
-    csv_df = pd.read_csv(csv_file)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
 
     if df_query is not None:
         try:
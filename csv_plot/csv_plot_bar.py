@@ -23,6 +23,9 @@ from pathlib import Path
 import plotly.express as px
 import pandas as pd
 
+sys.path.insert(0, format(Path(__file__).parent.parent / "csv_utility"))
+from csv_reader import add_reader_argument, read_csv
+
 VERSION = 1.0
 
 
@@ -120,6 +123,7 @@ example:
                             metavar='X_COLUMN_OR_Y_COLUMNS',
                             help='name of x column or names of y columns with csv format')
     arg_parser.add_argument('y_columns', metavar='COLUMN[,COLUMN[,COLUMN..]]', help='names of y colums', nargs='?')
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -208,7 +212,7 @@ if __name__ == "__main__":
     #--- processing
 
     # 2D Histograms | Python | Plotly https://plotly.com/python/2D-Histogram/
-    csv_df = pd.read_csv(csv_file)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
 
     if x_column is None:
         x_column = "csv_plot_bar_x"
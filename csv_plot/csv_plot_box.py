@@ -23,6 +23,9 @@ from pathlib import Path
 import plotly.express as px
 import pandas as pd
 
+sys.path.insert(0, format(Path(__file__).parent.parent / "csv_utility"))
+from csv_reader import add_reader_argument, read_csv
+
 VERSION = 1.0
 
 
@@ -108,6 +111,7 @@ example:
     arg_parser.add_argument('csv_file', metavar='CSV_FILE', help='csv files to read', nargs=1)
     arg_parser.add_argument('x_column', metavar='X_COLUMN', help='name of colum as values or x-axis', nargs=1)
     arg_parser.add_argument('y_column', metavar='Y_COLUMN', help='name of colum as values', nargs="?")
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -188,7 +192,7 @@ if __name__ == "__main__":
             sys.exit(1)
 
     #--- processing
-    csv_df = pd.read_csv(csv_file)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
 
     if y_col_name is not None:
         fig_params = {"x": x_col_name, "y": y_col_name}
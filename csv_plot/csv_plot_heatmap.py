@@ -23,6 +23,9 @@ from pathlib import Path
 import plotly.express as px
 import pandas as pd
 
+sys.path.insert(0, format(Path(__file__).parent.parent / "csv_utility"))
+from csv_reader import add_reader_argument, read_csv
+
 VERSION = 1.0
 
 Z_HIST_FUNC_LIST = ['count', 'sum', 'avg', 'min', 'max']
@@ -107,6 +110,7 @@ example:
     arg_parser.add_argument('x_column', metavar='X_COLUMN', help='name of colum as x-axis', nargs=1)
     arg_parser.add_argument('y_column', metavar='Y_COLUMN', help='name of colum as y-axis', nargs=1)
     arg_parser.add_argument('z_column', metavar='Z_COLUMN', help='name of colum as z-axis', nargs="?")
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -202,7 +206,7 @@ if __name__ == "__main__":
     #--- processing
 
     # 2D Histograms | Python | Plotly https://plotly.com/python/2D-Histogram/
-    csv_df = pd.read_csv(csv_file)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
 
     if z_col_name is not None:
         z_params = {"z": z_col_name, "histfunc": z_hist_func}
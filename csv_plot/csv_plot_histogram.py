@@ -6,7 +6,7 @@
 #
 # Author:       m.akei
 # Copyright:    (c) 2020 by m.na.akei
-# Time-stamp:   <2020-08-30 09:56:44>
+# Time-stamp:   <2026-10-18 15:58:31>
 # Licence:
 #  Copyright (c) 2021 Masaharu N. Akei
 #
@@ -20,7 +20,6 @@ import re
 import json
 from pathlib import Path
 
-import math
 import numpy as np
 
 import plotly.graph_objects as go
@@ -29,7 +28,9 @@ from plotly.subplots import make_subplots
 import plotly.express as px
 import pandas as pd
 
-from scipy.stats import moment
+sys.path.insert(0, format(Path(__file__).parent.parent / "csv_utility"))
+from csv_reader import add_reader_argument, read_csv
+from csv_bins import NBIN_MODES, evaluate_number_of_bin
 
 VERSION = 1.0
 
@@ -56,12 +57,15 @@ remark:
 
   about '--nbin_mode', see Histogram - Wikipedia https://en.wikipedia.org/wiki/Histogram .
   NOTE 's_and_s' means Shimazaki and Shinomoto's choice.
+  for large data, '--nbin_samples' makes 's_and_s' to search on subsample,
+  then number of bins tends to be smaller than one with all values.
 
 example:
   csv_plot_histogram.py --nbins=50 --category="ABC004" --xrange=0.4,0.6 --output=test_plot_hist.html test_plot.csv  "ABC001" "ABC002"
   csv_plot_histogram.py --nbins=50 --category="ABC004" --side_hist=rug --output=test_plot_hist.html test_plot.csv  "ABC001" "ABC002"
   csv_plot_histogram.py --nbins=50 --category="ABC004" --side_hist=rug --log_y --xrange=0.4,0.6 --output=test_plot_hist.html test_plot.csv "ABC001" "ABC002"
   csv_plot_histogram.py --nbin_mode="square-root" --output=test_plot_hist.html test_plot.csv "ABC001" "ABC002"
+  csv_plot_histogram.py --nbin_mode="s_and_s" --nbin_samples=100000 --output=test_plot_hist.html test_plot.csv "ABC001"
 
   csv_plot_histogram.py --output=test.html --pareto_chart --nbins=100 a10.csv value
   csv_plot_histogram.py --output=test.html --pareto_chart --pareto_sort_mode=axis --nbins=100 a10.csv value
@@ -76,7 +80,13 @@ example:
     arg_parser.add_argument("--nbin_modes",
                             dest="NBIN_MODE",
                             help="method to evaluate number of bins. if given, '--nbins' is ignored.",
-                            choices=["square-root", "sturges", "rice", "doane", "s_and_s", "freedman_diaconis"],
+                            choices=NBIN_MODES,
+                            default=None)
+    arg_parser.add_argument("--nbin_samples",
+                            dest="NBIN_SAMPLES",
+                            help="size of uniform subsample to evaluate number of bins by 's_and_s', default=all values",
+                            type=int,
+                            metavar="INT",
                             default=None)
 
     arg_parser.add_argument("--side_hist",
@@ -146,6 +156,7 @@ example:
     arg_parser.add_argument('csv_file', metavar='CSV_FILE', help='csv files to read', nargs=1)
     arg_parser.add_argument('x_column', metavar='X_COLUMN', help='name of colum as x-axis', nargs=1)
     arg_parser.add_argument('y_column', metavar='Y_COLUMN', help='name of colum as weight of histogram', nargs="?")
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -221,67 +232,6 @@ def plot_pareto_chart(df, column, sort_mode, params):
     return fig, pareto_df
 
 
-def evaluate_number_of_bin(ds_0, mode):
-    ds = ds_0.dropna()
-    npts = len(ds)
-    nbin_tabl = {}
-    nbin_tabl["square-root"] = math.ceil(math.sqrt(npts))
-    nbin_tabl["sturges"] = math.ceil(math.log2(npts)) + 1
-    nbin_tabl["rice"] = math.ceil(2 * math.pow(npts, 1 / 3))
-    sig = math.sqrt((6 * (npts - 2)) / ((npts + 1) * (npts + 3)))
-    skw = moment(ds, moment=3)
-    nbin_tabl["doane"] = int(1 + math.log2(npts) + math.log2(1 + abs(skw) / sig))
-    nbin_tabl["s_and_s"] = evaluate_number_of_bin_Shimazaki_and_Shinomoto(ds)
-    nbin_tabl["freedman_diaconis"] = evaluate_number_of_bin_Freedman_Diaconis(ds)
-
-    if mode not in nbin_tabl:
-        mes = f"??error:csv_plot_histogram:invalid mode to evaluate number of bins:{mode}"
-        print(mes, file=sys.stderr)
-        raise ValueError(mes)
-    print(f"%inf:csv_plot_histgoram:evaluate_number_of_bin:required mode={mode}", file=sys.stderr)
-    for k in nbin_tabl.keys():
-        print(f"\t{k}={nbin_tabl[k]}", file=sys.stderr)
-    nbins = int(nbin_tabl[mode])
-    return nbins
-
-
-def evaluate_number_of_bin_Shimazaki_and_Shinomoto(ds, N_MIN=4, N_MAX=100):
-    # GitHub - oldmonkABA/optimal_histogram_bin_width: Method to compute equal sized Optimal Histogram Bin Width https://github.com/oldmonkABA/optimal_histogram_bin_width
-    # https://www.neuralengine.org/res/code/python/histsample_torii.py https://www.neuralengine.org/res/code/python/histsample_torii.py
-    x = ds.array
-    x_max = max(x)
-    x_min = min(x)
-    N0 = np.arange(N_MIN, N_MAX)
-    D = (x_max - x_min) / N0  # bin size vector
-    Cost = np.zeros(shape=(np.size(D), 1))
-    Cost = np.zeros(np.size(D))
-
-    for i in range(np.size(N0)):
-        ki = np.histogram(x, bins=N0[i])
-        ki = ki[0]
-        k = np.mean(ki)
-        v = np.var(ki)
-        Cost[i] = (2 * k - v) / (D[i]**2)
-
-    idx = np.argmin(Cost)
-    cmin = Cost[idx]  # minimum cost
-    optD = D[idx]  # optiomum bin
-
-    print(f" {cmin}, {N0[idx]}, {optD}", file=sys.stderr)
-
-    return N0[idx]
-
-
-def evaluate_number_of_bin_Freedman_Diaconis(ds):
-
-    iqr = ds.quantile(.75) - ds.quantile(.25)
-
-    npts = len(ds)
-    bin_width = 2 * iqr / math.pow(npts, 1 / 3)
-    nbin = int(np.ceil((ds.max() - ds.min()) / bin_width))
-    return nbin
-
-
 if __name__ == "__main__":
     args = init()
     csv_file = args.csv_file[0]
@@ -338,6 +288,10 @@ if __name__ == "__main__":
 
     nbin = args.NBINS
     nbin_mode = args.NBIN_MODE
+    nbin_samples = args.NBIN_SAMPLES
+    if nbin_samples is not None and nbin_samples < 1:
+        print("??error:csv_plot_histogram:'--nbin_samples' must be positive: {}".format(nbin_samples), file=sys.stderr)
+        sys.exit(1)
 
     facets = args.FACETS
     facet_mode = False
@@ -364,10 +318,10 @@ if __name__ == "__main__":
     #--- processing
 
     # 2D Histograms | Python | Plotly https://plotly.com/python/2D-Histogram/
-    csv_df = pd.read_csv(csv_file)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
 
     if nbin_mode is not None:
-        nbin = evaluate_number_of_bin(csv_df[x_col_name], nbin_mode)
+        nbin = evaluate_number_of_bin(csv_df[x_col_name], nbin_mode, n_samples=nbin_samples)
         print(f"%inf:csv_plot_histogram:number of bins={nbin}", file=sys.stderr)
     nbin_params = {"nbins": nbin}
     if y_col_name is not None:
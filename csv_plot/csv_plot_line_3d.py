@@ -23,6 +23,9 @@ from pathlib import Path
 import plotly.express as px
 import pandas as pd
 
+sys.path.insert(0, format(Path(__file__).parent.parent / "csv_utility"))
+from csv_reader import add_reader_argument, read_csv
+
 VERSION = 1.0
 
 
@@ -86,6 +89,7 @@ example:
     arg_parser.add_argument('x_column', metavar='X_COLUMN', help='name of x column')
     arg_parser.add_argument('y_column', metavar='Y_COLUMN', help='name of y column')
     arg_parser.add_argument('z_column', metavar='Z_COLUMN', help='name of z column')
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -164,7 +168,7 @@ if __name__ == "__main__":
 
     #--- processing
 
-    csv_df = pd.read_csv(csv_file)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
 
     if categ is not None:
         color_params = {"color": categ}
@@ -22,6 +22,9 @@ from pathlib import Path
 import plotly.express as px
 import pandas as pd
 
+sys.path.insert(0, format(Path(__file__).parent.parent / "csv_utility"))
+from csv_reader import add_reader_argument, read_csv
+
 VERSION = 1.0
 
 COLOR_TABLE = ["Inferno", "Viridis", "OrRd", "YlOrBr", "Peach", "Pinkyl", "BuGn", "solar", "haline", "matter", "algae", "amp"]
@@ -83,6 +86,7 @@ example:
     arg_parser.add_argument('csv_file', metavar='CSV_FILE', help='csv files to read', nargs=1)
     arg_parser.add_argument('key_column', metavar='KEY', help='name of key column', nargs=1)
     arg_parser.add_argument('columns', metavar='COLUMNS', help='names of colums', nargs=1)
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -132,7 +136,7 @@ if __name__ == "__main__":
     #--- processing
 
     # 2D Histograms | Python | Plotly https://plotly.com/python/2D-Histogram/
-    csv_df = pd.read_csv(csv_file)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
 
     color_params = {"color_continuous_scale": color_scale}
 
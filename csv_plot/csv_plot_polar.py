@@ -23,6 +23,9 @@ from pathlib import Path
 import plotly.express as px
 import pandas as pd
 
+sys.path.insert(0, format(Path(__file__).parent.parent / "csv_utility"))
+from csv_reader import add_reader_argument, read_csv
+
 VERSION = 1.0
 
 
@@ -118,6 +121,7 @@ example:
     arg_parser.add_argument('r_column', metavar='R_COLUMN', help='name of colum as radius')
     arg_parser.add_argument('theta_column', metavar='THETA_COLUMN', help='name of colum as theta')
     arg_parser.add_argument('weight_column', metavar='WEIGHT_COLUMN', help='name of colum as weight', nargs="?")
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -190,7 +194,7 @@ if __name__ == "__main__":
             sys.exit(1)
 
     #--- processing
-    csv_df = pd.read_csv(csv_file)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
 
     fig_params = {"r": r_col_name, "theta": theta_col_name, "start_angle": start_angle, "direction": th_direction}
     line_params = {"line_close": line_close, "line_shape": line_shape}
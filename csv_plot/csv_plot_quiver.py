@@ -21,10 +21,12 @@ from pathlib import Path
 
 import scipy.interpolate as scii
 import numpy as np
-import pandas as pd
 import plotly.figure_factory as ff
 import plotly.graph_objects as go
 
+sys.path.insert(0, format(Path(__file__).parent.parent / "csv_utility"))
+from csv_reader import add_reader_argument, read_csv
+
 VERSION = 1.0
 
 
@@ -74,6 +76,7 @@ example:
     arg_parser.add_argument('y_column', metavar='Y_COLUMN', help='name of y column')
     arg_parser.add_argument('u_column', metavar='U_COLUMN', help='name of u column')
     arg_parser.add_argument('v_column', metavar='V_COLUMN', help='name of v column')
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -174,7 +177,7 @@ if __name__ == "__main__":
     #--- processing
 
     # 2D Histograms | Python | Plotly https://plotly.com/python/2D-Histogram/
-    csv_df = pd.read_csv(csv_file)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
 
     x_column_data = csv_df[x_column].values
     y_column_data = csv_df[y_column].values
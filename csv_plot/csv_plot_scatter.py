@@ -23,6 +23,9 @@ from pathlib import Path
 import plotly.express as px
 import pandas as pd
 
+sys.path.insert(0, format(Path(__file__).parent.parent / "csv_utility"))
+from csv_reader import add_reader_argument, read_csv
+
 VERSION = 1.0
 
 
@@ -125,6 +128,7 @@ example:
     arg_parser.add_argument('csv_file', metavar='CSV_FILE', help='csv files to read')
     arg_parser.add_argument('x_column', metavar='X_COLUMN', help='name of x column')
     arg_parser.add_argument('y_column', metavar='Y_COLUMN', help='name of y column')
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -214,7 +218,7 @@ if __name__ == "__main__":
     #--- processing
 
     # 2D Histograms | Python | Plotly https://plotly.com/python/2D-Histogram/
-    csv_df = pd.read_csv(csv_file)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
 
     if facet_mode:
         facet_params = {}
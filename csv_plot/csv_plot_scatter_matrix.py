@@ -21,7 +21,9 @@ import json
 from pathlib import Path
 
 import plotly.express as px
-import pandas as pd
+
+sys.path.insert(0, format(Path(__file__).parent.parent / "csv_utility"))
+from csv_reader import add_reader_argument, read_csv
 
 VERSION = 1.0
 
@@ -64,6 +66,7 @@ example:
     arg_parser.add_argument("--height", dest="HEIGHT", help="height of output", type=int, metavar='HEIGHT', default=None)
 
     arg_parser.add_argument('csv_file', metavar='CSV_FILE', help='csv files to read', nargs=1)
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -114,7 +117,7 @@ if __name__ == "__main__":
     fig_params = {"dimensions": dimensions, "opacity": 1.0}
 
     # 2D Histograms | Python | Plotly https://plotly.com/python/2D-Histogram/
-    csv_df = pd.read_csv(csv_file)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
 
     if symbol is not None:
         csv_df[symbol] = csv_df[symbol].astype(str, errors="ignore")
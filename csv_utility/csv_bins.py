@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# Name:         csv_bins.py
+# Description:  evaluation of number of bins for histogram
+#
+# Author:       m.akei
+# Copyright:    (c) 2021 by m.na.akei
+# Time-stamp:   <2026-10-18 15:40:12>
+# Licence:
+#  Copyright (c) 2021 Masaharu N. Akei
+#
+#  This software is released under the MIT License.
+#    http://opensource.org/licenses/mit-license.php
+# ----------------------------------------------------------------------
+"""evaluation of number of bins for histogram, those are used by csv_histogram.py and csv_plot_histogram.py.
+
+  square-root, sturges, rice, doane : closed form with number of points
+  s_and_s           : Shimazaki and Shinomoto's choice, minimizing cost function
+  freedman_diaconis : bin width from inter quartile range
+
+about rules, see Histogram - Wikipedia https://en.wikipedia.org/wiki/Histogram .
+"""
+import sys
+import math
+
+import numpy as np
+from scipy.stats import moment
+
+VERSION = 1.0
+
+NBIN_MODES = ["square-root", "sturges", "rice", "doane", "s_and_s", "freedman_diaconis"]
+NBIN_SAMPLE_SEED = 0
+
+
+def evaluate_number_of_bin(ds_0, mode, n_samples=None):
+    """evaluate number of bins for histogram by given mode
+
+    :param ds_0: values, NaN are ignored
+    :param mode: one of NBIN_MODES
+    :param n_samples: size of uniform subsample for 's_and_s', if None, all values are used
+    :returns: number of bins
+    :rtype: int
+    :remark: only rule of 'mode' is evaluated.
+
+    """
+    if mode not in NBIN_MODES:
+        mes = f"??error:csv_bins:invalid mode to evaluate number of bins:{mode}"
+        print(mes, file=sys.stderr)
+        raise ValueError(mes)
+
+    ds = ds_0.dropna()
+    npts = len(ds)
+    if mode == "square-root":
+        nbins = math.ceil(math.sqrt(npts))
+    elif mode == "sturges":
+        nbins = math.ceil(math.log2(npts)) + 1
+    elif mode == "rice":
+        nbins = math.ceil(2 * math.pow(npts, 1 / 3))
+    elif mode == "doane":
+        sig = math.sqrt((6 * (npts - 2)) / ((npts + 1) * (npts + 3)))
+        skw = moment(ds, moment=3)
+        nbins = int(1 + math.log2(npts) + math.log2(1 + abs(skw) / sig))
+    elif mode == "s_and_s":
+        nbins = evaluate_number_of_bin_Shimazaki_and_Shinomoto(ds, n_samples=n_samples)
+    else:
+        nbins = evaluate_number_of_bin_Freedman_Diaconis(ds)
+
+    print(f"%inf:csv_bins:evaluate_number_of_bin:mode={mode}, number of bins={nbins}", file=sys.stderr)
+    return int(nbins)
+
+
+def histogram_edges(x_min, x_max, nbins):
+    """edges of equal width bins, those are same as 'numpy.histogram' with integer 'bins'
+
+    :param x_min: minimum value
+    :param x_max: maximum value
+    :param nbins: number of bins
+    :returns: edges, length is nbins+1
+    :rtype: numpy.ndarray
+
+    """
+    if x_min == x_max:
+        x_min = x_min - 0.5
+        x_max = x_max + 0.5
+    return np.linspace(x_min, x_max, nbins + 1, endpoint=True)
+
+
+def evaluate_number_of_bin_Shimazaki_and_Shinomoto(ds, N_MIN=4, N_MAX=100, n_samples=None):
+    """evaluate number of bins by Shimazaki and Shinomoto's choice
+
+    :param ds: values without NaN
+    :param N_MIN: minimum of candidates of number of bins
+    :param N_MAX: upper limit of candidates of number of bins, this is not included
+    :param n_samples: size of uniform subsample, if None or number of values is not larger, all values are used
+    :returns: number of bins with minimum cost
+    :rtype: int
+    :remark:
+      values are sorted only once, and counts in bins of all candidates are found by one 'searchsorted'
+      with edges of bins. counts are same as results of 'numpy.histogram', the last bin includes right edge.
+
+      with subsample, result is optimum for size of subsample, so it tends to be smaller than one with all values.
+
+    """
+    # GitHub - oldmonkABA/optimal_histogram_bin_width: Method to compute equal sized Optimal Histogram Bin Width https://github.com/oldmonkABA/optimal_histogram_bin_width
+    # https://www.neuralengine.org/res/code/python/histsample_torii.py https://www.neuralengine.org/res/code/python/histsample_torii.py
+    x = np.asarray(ds, dtype=float)
+    if n_samples is not None and len(x) > n_samples:
+        rng = np.random.default_rng(NBIN_SAMPLE_SEED)
+        x = rng.choice(x, size=n_samples, replace=False)
+        print(f"%inf:csv_bins:Shimazaki and Shinomoto:subsample of {n_samples} values is used", file=sys.stderr)
+    x = np.sort(x)
+    npts = len(x)
+    x_max = x[-1]
+    x_min = x[0]
+    N0 = np.arange(N_MIN, N_MAX)
+    D = (x_max - x_min) / N0  # bin size vector
+
+    inner_edges = [histogram_edges(x_min, x_max, n)[1:-1] for n in N0]
+    pos = np.searchsorted(x, np.concatenate(inner_edges), side="left")
+    splits = np.cumsum([len(v) for v in inner_edges])[:-1]
+
+    Cost = np.zeros(np.size(D))
+    for i, p in enumerate(np.split(pos, splits)):
+        ki = np.diff(p, prepend=0, append=npts)
+        k = np.mean(ki)
+        v = np.var(ki)
+        Cost[i] = (2 * k - v) / (D[i]**2)
+
+    idx = np.argmin(Cost)
+    cmin = Cost[idx]  # minimum cost
+    optD = D[idx]  # optiomum bin
+
+    print(f" {cmin}, {N0[idx]}, {optD}", file=sys.stderr)
+
+    return N0[idx]
+
+
+def evaluate_number_of_bin_Freedman_Diaconis(ds):
+    """evaluate number of bins by Freedman-Diaconis' choice
+
+    :param ds: values without NaN
+    :returns: number of bins
+    :rtype: int
+
+    """
+    iqr = ds.quantile(.75) - ds.quantile(.25)
+
+    npts = len(ds)
+    bin_width = 2 * iqr / math.pow(npts, 1 / 3)
+    nbin = int(np.ceil((ds.max() - ds.min()) / bin_width))
+    return nbin
+
+
+if __name__ == "__main__":
+    print("??error:csv_bins:this is module", file=sys.stderr)
+    sys.exit(1)
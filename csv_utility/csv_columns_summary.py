@@ -6,7 +6,7 @@
 #
 # Author:       m.akei
 # Copyright:    (c) 2020 by m.na.akei
-# Time-stamp:   <2020-10-23 18:42:11>
+# Time-stamp:   <2026-10-18 11:40:52>
 # Licence:
 #  Copyright (c) 2021 Masaharu N. Akei
 #
@@ -16,11 +16,16 @@
 import argparse
 import textwrap
 import sys
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 import re
 import numpy as np
 import pandas as pd
 
+sys.path.insert(0, format(Path(__file__).parent))
+from csv_reader import add_reader_argument, read_csv
+
 VERSION = 1.0
 
 STATUS_FUNCTIONS = ['all', 'count', 'sum', 'avg', 'min', 'max', 'std', 'median']
@@ -30,9 +35,13 @@ def init():
     arg_parser = argparse.ArgumentParser(description="statistics summary for each colunm with CSV format",
                                          formatter_class=argparse.RawDescriptionHelpFormatter,
                                          epilog=textwrap.dedent('''
+remark:
+  With '--jobs', columns are summarized by given number of threads, and result is in order of columns.
+
 example:
   csv_columns_summary.py --function=sum --columns=A,B test1.csv
   csv_columns_summary.py --count=1 test1.csv
+  csv_columns_summary.py --jobs=8 big_sample_headers.csv
   csv_columns_summary.py --function=all --columns=A,B test1.csv| csvlook -I
 | columns | count | sum | avg                | min | max | std                | median |
 | ------- | ----- | --- | ------------------ | --- | --- | ------------------ | ------ |
@@ -57,9 +66,17 @@ example:
                             metavar="STRING",
                             default=None)
 
+    arg_parser.add_argument("--jobs",
+                            dest="JOBS",
+                            help="number of threads to summarize columns in parallel, default=1",
+                            type=int,
+                            metavar="INT",
+                            default=1)
+
     arg_parser.add_argument("--output", dest="OUTPUT", help="path of output file, default=stdout", type=str, metavar='FILE', default=None)
 
     arg_parser.add_argument('csv_file', metavar='CSV_FILE', help='files to read, if empty, stdin is used')
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -78,6 +95,42 @@ def count_in_series(ds, string_for_count):
     return result
 
 
+def column_summary(ds, f_mode, count_s, row_has_na):
+    """summary of column
+
+    :param ds: pandas.Series
+    :param f_mode: one of STATUS_FUNCTIONS
+    :param count_s: string to count, if not None, 'f_mode' is ignored
+    :param row_has_na: mask of rows that have NA in any column, for count
+    :returns: list of values, or None for not numeric column
+    :rtype: list
+
+    """
+    vals = []
+    if count_s is not None:
+        vals.append(count_in_series(ds, count_s))
+    elif np.dtype('float64') == ds.dtype or np.dtype('int64') == ds.dtype:
+        if f_mode == "all":
+            vals.extend([int(((ds != 0) & ~row_has_na).sum()), ds.sum(), ds.mean(), ds.min(), ds.max(), ds.std(), ds.median()])
+        elif f_mode == "count":
+            vals.append(int(((ds != 0) & ~row_has_na).sum()))
+        elif f_mode == "sum":
+            vals.append(ds.sum())
+        elif f_mode == "avg":
+            vals.append(ds.mean())
+        elif f_mode == "min":
+            vals.append(ds.min())
+        elif f_mode == "max":
+            vals.append(ds.max())
+        elif f_mode == "std":
+            vals.append(ds.std())
+        elif f_mode == "median":
+            vals.append(ds.median())
+    else:
+        return None
+    return vals
+
+
 if __name__ == "__main__":
     args = init()
     csv_file = args.csv_file
@@ -85,6 +138,10 @@ if __name__ == "__main__":
     f_mode = args.FUNC
     output_file = args.OUTPUT
     count_s = args.COUNTS
+    n_jobs = args.JOBS
+    if n_jobs <= 0:
+        print("??error:csv_columns_summary:'--jobs' must be positive integer:{}".format(n_jobs), file=sys.stderr)
+        sys.exit(1)
 
     if csv_file == "-":
         csv_file = sys.stdin
@@ -92,7 +149,7 @@ if __name__ == "__main__":
     if output_file is None:
         output_file = sys.stdout
 
-    csv_df = pd.read_csv(csv_file)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
     if columns_s is not None:
         columns = re.split(r"\s*,\s*", columns_s)
     else:
@@ -110,32 +167,18 @@ if __name__ == "__main__":
     for cname in columns:
         if cname not in csv_df.columns:
             print("#warn:csv_columns_summary:{} dose not exists".format(cname), file=sys.stderr)
-            continue
-        vals = []
-        if count_s is not None:
-            ds = csv_df[cname]
-            vals.append(count_in_series(ds, count_s))
-        elif np.dtype('float64') == csv_df[cname].dtype or np.dtype('int64') == csv_df[cname].dtype:
-            if f_mode == "all":
-                vals.extend([
-                    len(csv_df.loc[csv_df[cname] != 0].dropna()), csv_df[cname].sum(), csv_df[cname].mean(), csv_df[cname].min(),
-                    csv_df[cname].max(), csv_df[cname].std(), csv_df[cname].median()
-                ])
-            elif f_mode == "count":
-                vals.append(len(csv_df.loc[csv_df[cname] != 0].dropna()))
-            elif f_mode == "sum":
-                vals.append(csv_df[cname].sum())
-            elif f_mode == "avg":
-                vals.append(csv_df[cname].mean())
-            elif f_mode == "min":
-                vals.append(csv_df[cname].min())
-            elif f_mode == "max":
-                vals.append(csv_df[cname].max())
-            elif f_mode == "std":
-                vals.append(csv_df[cname].std())
-            elif f_mode == "median":
-                vals.append(csv_df[cname].median())
-        elif count_s is None:
+    columns = [cname for cname in columns if cname in csv_df.columns]
+
+    # count is number of rows that have not zero in the column and have no NA in all columns
+    row_has_na = csv_df.isnull().any(axis=1)
+    if n_jobs > 1 and len(columns) > 1:
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(lambda cname: column_summary(csv_df[cname], f_mode, count_s, row_has_na), columns))
+    else:
+        results = [column_summary(csv_df[cname], f_mode, count_s, row_has_na) for cname in columns]
+
+    for cname, vals in zip(columns, results):
+        if vals is None:
             print("#warn:csv_columns_summary:skipped:data type of '{}' is {}.".format(cname, csv_df[cname].dtype), file=sys.stderr)
             continue
         out_df.loc[cname] = vals
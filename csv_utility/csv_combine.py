@@ -20,7 +20,9 @@ import sys
 from pathlib import Path
 
 import re
-import pandas as pd
+
+sys.path.insert(0, format(Path(__file__).parent))
+from csv_reader import add_reader_argument, read_csv
 
 VERSION = 1.0
 
@@ -138,6 +140,7 @@ example:
     arg_parser.add_argument('csv_file_2_or_value', metavar='CSV_FILE_or_VALUE', help='second csv file or scalar float value')
     # arg_parser.add_argument('infile', nargs='?', type=argparse.FileType('r'), default=sys.stdin)
     # arg_parser.add_argument('outfile', nargs='?', type=argparse.FileType('w'), default=sys.stdout)
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -193,9 +196,9 @@ if __name__ == "__main__":
             print("%Inf:csv_uty:exec python code:{}".format(pp), file=sys.stderr)
             exec(pp)
 
-    csv_df_1 = pd.read_csv(csv_file_1)
+    csv_df_1 = read_csv(csv_file_1, reader=args.READER, cache=args.CACHE)
     if Path(csv_file_2_or_value).exists():
-        csv_df_2 = pd.read_csv(csv_file_2_or_value)
+        csv_df_2 = read_csv(csv_file_2_or_value, reader=args.READER, cache=args.CACHE)
     else:
         csv_df_2 = csv_df_1.copy()
         csv_df_2[csv_df_2.columns] = float(csv_file_2_or_value)
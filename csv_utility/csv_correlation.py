@@ -16,11 +16,15 @@
 import argparse
 import textwrap
 import sys
+from pathlib import Path
 
 import re
 import statsmodels.tsa.api as tsa
 import pandas as pd
 
+sys.path.insert(0, format(Path(__file__).parent))
+from csv_reader import add_reader_argument, read_csv
+
 VERSION = 1.0
 
 
@@ -87,6 +91,7 @@ example:
     arg_parser.add_argument('csv_file', metavar='CSV_FILE', help='files to read, if empty, stdin is used')
     arg_parser.add_argument('columns', metavar='COLUMN[,COLUMN...]', help='columns to do')
 
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -110,7 +115,7 @@ if __name__ == "__main__":
     if csv_file == "-":
         csv_file = sys.stdin
 
-    csv_df = pd.read_csv(csv_file)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
 
     csv_df[columns] = csv_df[columns].fillna(na_value)
 
@@ -16,11 +16,15 @@
 import argparse
 import textwrap
 import sys
+from pathlib import Path
 
 import re
 import numpy as np
 import pandas as pd
 
+sys.path.insert(0, format(Path(__file__).parent))
+from csv_reader import add_reader_argument, read_csv
+
 VERSION = 1.0
 
 AGG_FUNCTIONS = ["sum", "min", "max", "mean", "median", "prod", "count_nonzero"]
@@ -130,6 +134,7 @@ D,9.0,,,,,,,5.0
     arg_parser.add_argument('rows', metavar="ROW_COLUMN[,ROW_COLUMN...]", type=str)
     arg_parser.add_argument('columns', metavar="COLUMN[,COLUMN...]", type=str)
     # arg_parser.add_argument('outfile', nargs='?', type=argparse.FileType('w'), default=sys.stdout)
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -183,7 +188,7 @@ if __name__ == "__main__":
     elif aggfunc_s == "count_nonzero":
         aggfunc = np.count_nonzero
 
-    csv_df = pd.read_csv(csv_file)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
     if values is not None:
         ct_params.update({"values": csv_df[values], "aggfunc": aggfunc})
 
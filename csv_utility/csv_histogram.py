@@ -6,7 +6,7 @@
 #
 # Author:       m.akei
 # Copyright:    (c) 2020 by m.na.akei
-# Time-stamp:   <2020-09-12 16:18:16>
+# Time-stamp:   <2026-10-18 15:52:07>
 # Licence:
 #  Copyright (c) 2021 Masaharu N. Akei
 #
@@ -19,11 +19,13 @@ import sys
 import re
 
 from pathlib import Path
-import math
 
 import numpy as np
 import pandas as pd
-from scipy.stats import moment
+
+sys.path.insert(0, format(Path(__file__).parent))
+from csv_reader import add_reader_argument, read_csv
+from csv_bins import NBIN_MODES, evaluate_number_of_bin
 
 VERSION = 1.0
 
@@ -38,12 +40,15 @@ remark:
 
   about '--nbin_mode', see Histogram - Wikipedia https://en.wikipedia.org/wiki/Histogram .
   NOTE 's_and_s' means Shimazaki and Shinomoto's choice.
+  for large data, '--nbin_samples' makes 's_and_s' to search on subsample,
+  then number of bins tends to be smaller than one with all values.
 
 example:
   csv_histogram.py --nbins=100 --output=- big_sample_arb.csv  COL_0008|less
   csv_histogram.py --nbins=100 --output=- --range=0.5,1.0 big_sample_arb.csv  COL_0008 COL_0033|less
   csv_histogram.py --facets=B,C,D test_hist.csv E
   csv_histogram.py --facets=B,C,D test_hist.csv A
+  csv_histogram.py --nbin_modes=s_and_s --nbin_samples=100000 --output=- big_sample_arb.csv COL_0008
 
 '''))
 
@@ -52,7 +57,13 @@ example:
     arg_parser.add_argument("--nbin_modes",
                             dest="NBIN_MODE",
                             help="method to evaluate number of bins. if given, '--nbins' is ignored.",
-                            choices=["square-root", "sturges", "rice", "doane", "s_and_s", "freedman_diaconis"],
+                            choices=NBIN_MODES,
+                            default=None)
+    arg_parser.add_argument("--nbin_samples",
+                            dest="NBIN_SAMPLES",
+                            help="size of uniform subsample to evaluate number of bins by 's_and_s', default=all values",
+                            type=int,
+                            metavar="INT",
                             default=None)
 
     arg_parser.add_argument("--range", dest="XRANGE", help="range of x", type=str, metavar='LOWER_X,UPPER_X', default=None)
@@ -64,6 +75,7 @@ example:
     arg_parser.add_argument('csv_file', metavar='CSV_FILE', help='files to read, if empty, stdin is used')
     arg_parser.add_argument('column', metavar='COLUMN', help='name of column to make histogram')
     arg_parser.add_argument('weight_column', metavar='WEIGHT_COLUMN', nargs="?", help='name of column as weight')
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -112,69 +124,6 @@ def number_hist_facets(hist_df, input_df, column_name, facets_columns, bins, wei
     return hist_df
 
 
-def evaluate_number_of_bin(ds_0, mode):
-    ds = ds_0.dropna()
-    npts = len(ds)
-    nbin_tabl = {}
-    nbin_tabl["square-root"] = math.ceil(math.sqrt(npts))
-    nbin_tabl["sturges"] = math.ceil(math.log2(npts)) + 1
-    nbin_tabl["rice"] = math.ceil(2 * math.pow(npts, 1 / 3))
-    sig = math.sqrt((6 * (npts - 2)) / ((npts + 1) * (npts + 3)))
-    skw = moment(ds, moment=3)
-    print(ds)
-    print(skw)
-    nbin_tabl["doane"] = int(1 + math.log2(npts) + math.log2(1 + abs(skw) / sig))
-    nbin_tabl["s_and_s"] = evaluate_number_of_bin_Shimazaki_and_Shinomoto(ds)
-    nbin_tabl["freedman_diaconis"] = evaluate_number_of_bin_Freedman_Diaconis(ds)
-
-    if mode not in nbin_tabl:
-        mes = f"??error:csv_plot_histogram:invalid mode to evaluate number of bins:{mode}"
-        print(mes, file=sys.stderr)
-        raise ValueError(mes)
-    print(f"%inf:csv_plot_histgoram:evaluate_number_of_bin:required mode={mode}", file=sys.stderr)
-    for k in nbin_tabl.keys():
-        print(f"\t{k}={nbin_tabl[k]}", file=sys.stderr)
-    nbins = int(nbin_tabl[mode])
-    return nbins
-
-
-def evaluate_number_of_bin_Shimazaki_and_Shinomoto(ds, N_MIN=4, N_MAX=100):
-    # GitHub - oldmonkABA/optimal_histogram_bin_width: Method to compute equal sized Optimal Histogram Bin Width https://github.com/oldmonkABA/optimal_histogram_bin_width
-    # https://www.neuralengine.org/res/code/python/histsample_torii.py https://www.neuralengine.org/res/code/python/histsample_torii.py
-    x = ds.array
-    x_max = max(x)
-    x_min = min(x)
-    N0 = np.arange(N_MIN, N_MAX)
-    D = (x_max - x_min) / N0  # bin size vector
-    Cost = np.zeros(shape=(np.size(D), 1))
-    Cost = np.zeros(np.size(D))
-
-    for i in range(np.size(N0)):
-        ki = np.histogram(x, bins=N0[i])
-        ki = ki[0]
-        k = np.mean(ki)
-        v = np.var(ki)
-        Cost[i] = (2 * k - v) / (D[i]**2)
-
-    idx = np.argmin(Cost)
-    cmin = Cost[idx]  # minimum cost
-    optD = D[idx]  # optiomum bin
-
-    print(f" {cmin}, {N0[idx]}, {optD}", file=sys.stderr)
-
-    return N0[idx]
-
-
-def evaluate_number_of_bin_Freedman_Diaconis(ds):
-
-    iqr = ds.quantile(.75) - ds.quantile(.25)
-
-    npts = len(ds)
-    bin_width = 2 * iqr / math.pow(npts, 1 / 3)
-    nbin = int(np.ceil((ds.max() - ds.min()) / bin_width))
-    return nbin
-
-
 if __name__ == "__main__":
     args = init()
     csv_file = args.csv_file
@@ -185,6 +134,10 @@ if __name__ == "__main__":
 
     nbins = args.NBINS
     nbin_mode = args.NBIN_MODE
+    nbin_samples = args.NBIN_SAMPLES
+    if nbin_samples is not None and nbin_samples < 1:
+        print("??error:csv_histogram:'--nbin_samples' must be positive: {}".format(nbin_samples), file=sys.stderr)
+        sys.exit(1)
     nphist_arg = {"bins": nbins}
 
     xrange_s = args.XRANGE
@@ -206,7 +159,7 @@ if __name__ == "__main__":
     if csv_file == "-":
         csv_file = sys.stdin
 
-    csv_df = pd.read_csv(csv_file)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
 
     if csv_df[column_name].dtype == object:
         print("-- un-numerical mode:", file=sys.stderr)
@@ -224,9 +177,9 @@ if __name__ == "__main__":
             df = csv_df[[column_name]]
         df.dropna(inplace=True)
         if nbin_mode is not None:
-            nbin = evaluate_number_of_bin(df[column_name], nbin_mode)
-            print(f"%inf:csv_plot_histogram:number of bins={nbin}", file=sys.stderr)
-        nphist_arg["bins"] = nbin
+            nbin = evaluate_number_of_bin(df[column_name], nbin_mode, n_samples=nbin_samples)
+            print(f"%inf:csv_histogram:number of bins={nbin}", file=sys.stderr)
+            nphist_arg["bins"] = nbin
         if weight_column is not None:
             nphist_arg.update({"weights": np.array(df[weight_column])})
         hist, bins = np.histogram(np.array(df[column_name]), **nphist_arg)
@@ -28,6 +28,9 @@ import lmfit.models as lmfm
 
 import pandas as pd
 
+sys.path.insert(0, format(Path(__file__).parent))
+from csv_reader import add_reader_argument, read_csv
+
 VERSION = 1.0
 
 MODEL_SAMPLE = '''
@@ -206,6 +209,7 @@ d_df.to_csv("lmfit_sample.csv", index=False)
     arg_parser.add_argument('csv_file', metavar='CSV_FILE', help='files to read, if empty, stdin is used', default=None, nargs="?")
     arg_parser.add_argument('x_column', metavar='COLUMN', help='name of x column', default=None, nargs="?")
     arg_parser.add_argument('y_column', metavar='COLUMN', help='name of y column', default=None, nargs="?")
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args, arg_parser
 
@@ -346,7 +350,7 @@ if __name__ == "__main__":
         arg_parser.print_help(file=sys.stderr)
         sys.exit(0)
 
-    csv_df = pd.read_csv(csv_file)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
     if x_range_s is None:
         x_values = csv_df[x_column]
         y_values = csv_df[y_column]
@@ -16,6 +16,7 @@
 import argparse
 import textwrap
 import sys
+from pathlib import Path
 
 from distutils.version import LooseVersion
 
@@ -23,6 +24,9 @@ import re
 import numpy as np
 import pandas as pd
 
+sys.path.insert(0, format(Path(__file__).parent))
+from csv_reader import add_reader_argument, read_csv
+
 VERSION = 1.0
 
 PANDAS_MIN_VERSION = "1.1.3"
@@ -158,6 +162,7 @@ example:
                             type=str,
                             default=None)
     arg_parser.add_argument('columns', nargs='?', metavar="COLUM[,COLUMN...]", help="names of value columns", type=str, default=None)
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -199,7 +204,7 @@ if __name__ == "__main__":
         if len(value_columns) == 0:
             print("%Inf:csv_meltpivot: pivoting without values", file=sys.stderr)
 
-    csv_df = pd.read_csv(in_file)
+    csv_df = read_csv(in_file, reader=args.READER, cache=args.CACHE)
 
     params = {}
     if mode == "melt":
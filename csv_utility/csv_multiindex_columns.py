@@ -16,11 +16,15 @@
 import argparse
 import textwrap
 import sys
+from pathlib import Path
 
 import re
 import numpy as np
 import pandas as pd
 
+sys.path.insert(0, format(Path(__file__).parent))
+from csv_reader import add_reader_argument, read_csv
+
 VERSION = 1.0
 
 
@@ -77,15 +81,17 @@ csv_multiindex_columns.py --nrows=3 --to_single test_multiindex_columns.csv |csv
     arg_parser.add_argument("--only_header", dest="ONLYHEADER", help="parse only header rows", action="store_true", default=False)
 
     arg_parser.add_argument('csv_file', metavar='CSV_FILE', help='files to read, if empty, stdin is used')
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
 
-def read_csv_of_multiindex_columns(filepath_or_buffer, header='infer', **kwargs):
+def read_csv_of_multiindex_columns(filepath_or_buffer, header='infer', reader="auto", **kwargs):
     """FIXME! briefly describe function
 
     :param filepath_or_buffer: 
     :param header: 
+    :param reader: engine to read csv, see csv_reader.READER_ENGINES
     :returns: 
     :rtype: 
     :example:
@@ -103,7 +109,7 @@ results:
 
     """
     # python - Pandas read multiindexed csv with blanks - Stack Overflow https://stackoverflow.com/questions/30322581/pandas-read-multiindexed-csv-with-blanks
-    df = pd.read_csv(filepath_or_buffer, header=header, dtype='object', **kwargs)
+    df = read_csv(filepath_or_buffer, reader=reader, header=header, dtype='object', **kwargs)
     columns = pd.DataFrame(df.columns.tolist())
     if isinstance(header, list):
         for ih in header:
@@ -141,7 +147,7 @@ if __name__ == "__main__":
     csv_params = {}
     if only_header:
         csv_params.update({"nrows": 1})
-    csv_df = read_csv_of_multiindex_columns(csv_file, header=header, **csv_params)
+    csv_df = read_csv_of_multiindex_columns(csv_file, header=header, reader=args.READER, cache=args.CACHE, **csv_params)
 
     # print(csv_df)
     if to_single:
@@ -31,6 +31,9 @@ import minify_html
 import seaborn as sns
 import pandas as pd
 
+sys.path.insert(0, format(Path(__file__).parent))
+from csv_reader import add_reader_argument, read_csv
+
 VERSION = 1.0
 
 
@@ -157,6 +160,7 @@ example:
 
     arg_parser.add_argument('csv_file', metavar='CSV_FILE', help='files to read, if empty, stdin is used')
 
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -812,7 +816,7 @@ if __name__ == "__main__":
         output_file = open(output_file, "w")
 
     # Styling  pandas 1.1.4 documentation https://pandas.pydata.org/docs/user_guide/style.html
-    csv_df = pd.read_csv(csv_file, dtype='object')
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE, dtype='object')
 
     if len(columns) > 0:
         csv_df = csv_df[columns]
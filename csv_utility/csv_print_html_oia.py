@@ -21,7 +21,8 @@ import html
 import minify_html
 import json
 
-import pandas as pd
+sys.path.insert(0, format(Path(__file__).parent))
+from csv_reader import add_reader_argument, read_csv
 
 VERSION = 1.0
 
@@ -76,6 +77,7 @@ IDX,B,C,O,I,A
 
     arg_parser.add_argument('oia_columns', metavar='COLUMNS', nargs="+", help="colum names of Observation/Investigation/Action")
 
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -572,7 +574,7 @@ if __name__ == "__main__":
     if output_file != sys.stdout:
         output_file = open(output_file, "w")
 
-    csv_df = pd.read_csv(csv_file, dtype='object')
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE, dtype='object')
 
     progress_bar = len(csv_df) > 500
     html_str = html_prologe_oia(width=None, word_colors=pcolors_s, search_on_html=search_on_html, title=title, progress_bar=progress_bar)
@@ -39,6 +39,7 @@ except Exception as e:
 
 sys.path.insert(0, format(Path(__file__).parent))
 from csv_print_html_oia import part_color
+from csv_reader import add_reader_argument, read_csv
 
 VERSION = 1.0
 
@@ -173,6 +174,7 @@ IDX,B,DT,C,O,I,A,image,title_of_image
 
     arg_parser.add_argument('oia_columns', metavar='COLUMN', nargs="+", help="colum names of Observation/Investigation/Action")
 
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -843,7 +845,7 @@ if __name__ == "__main__":
 
     output_file_html_f = open(output_file_html, "w")
 
-    csv_df = pd.read_csv(csv_file, dtype='object')
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE, dtype='object')
     csv_df[datetime_column] = pd.to_datetime(csv_df[datetime_column], format=datetime_format)
     csv_df.sort_values(datetime_column, inplace=True)
     # csv_df.reset_index(inplace=True)
@@ -27,6 +27,7 @@ import pandas as pd
 sys.path.insert(0, format(Path(__file__).parent))
 from csv_print_html_tl import make_gantt
 from csv_print_timeline_trim_svg import add_style, add_script, trim_svg_string
+from csv_reader import add_reader_argument, read_csv
 
 VERSION = 1.0
 
@@ -96,6 +97,7 @@ example:
 
     arg_parser.add_argument('csv_file', metavar='CSV_FILE', help='files to read, if empty, stdin is used')
     arg_parser.add_argument('datetime_column', metavar='DATETIME_COLUMN', nargs="?", help="column of datetime")
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -198,7 +200,7 @@ if __name__ == "__main__":
         print("??error:csv_print_timepoint:DATETIME_COLUMN is required.", file=sys.stderr)
         sys.exit(1)
 
-    csv_df = pd.read_csv(csv_file)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
     csv_df[datetime_column] = pd.to_datetime(csv_df[datetime_column], format=datetime_format)
 
     if group_column is not None:
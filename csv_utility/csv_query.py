@@ -16,9 +16,11 @@
 import argparse
 import textwrap
 import sys
+from pathlib import Path
 import re
 
-import pandas as pd
+sys.path.insert(0, format(Path(__file__).parent))
+from csv_reader import add_reader_argument, read_csv
 
 VERSION = 1.0
 
@@ -59,6 +61,7 @@ example:
 
     arg_parser.add_argument('csv_file', metavar='CSV_FILE', help='path of csv file')
     arg_parser.add_argument('query', metavar='STR', help='query string', nargs='?')
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -88,7 +91,7 @@ if __name__ == "__main__":
             query = " or ".join(["({})".format(v) for v in qs if len(v) != 0])
             print("%inf:csv_query:query was read from '{}':{}".format(query_file, query), file=sys.stderr)
 
-    csv_df = pd.read_csv(csv_file, encoding=encode)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE, encoding=encode)
 
     try:
         res_df = csv_df.query(query, engine="python")
@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# Name:         csv_reader.py
+# Description:  common reader of csv file for csv_utility and csv_plot
+#
+# Author:       m.akei
+# Copyright:    (c) 2020 by m.na.akei
+# Time-stamp:   <2026-10-18 17:05:44>
+# Licence:
+#  Copyright (c) 2021 Masaharu N. Akei
+#
+#  This software is released under the MIT License.
+#    http://opensource.org/licenses/mit-license.php
+# ----------------------------------------------------------------------
+import argparse
+import textwrap
+import sys
+import os
+import json
+import time
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PYARROW_PKG = True
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.compute as pa_compute
+    import pyarrow.feather as pa_feather
+except Exception as e:
+    PYARROW_PKG = False
+
+READER_ENGINES = ["auto", "pyarrow", "c", "python"]
+
+# options of pd.read_csv that are supported by read_csv_pyarrow
+PYARROW_OPTIONS = ["dtype", "usecols", "encoding", "sep"]
+PYARROW_DTYPES = [None, "string", "object", str, object]
+
+# same as default 'na_values' of pd.read_csv
+NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "n/a", "nan",
+    "null"
+]
+# sidecar cache of parsed csv
+CACHE_DIR_ENV = "CSV_TOOLS_CACHE"
+CACHE_SIZE_ENV = "CSV_TOOLS_CACHE_SIZE"
+CACHE_SIZE_DEFAULT = 2048  # MB
+CACHE_VERSION = 3
+CACHE_SUFFIX = ".feather"
+CACHE_STATS_FILE = "cache_stats.json"
+CACHE_SOURCE_KEY = b"csv_reader_source"
+CACHE_UNSUPPORTED_OPTIONS = ["chunksize", "iterator", "nrows", "skiprows", "skipfooter"]
+
+TRUE_VALUES = ["True", "TRUE", "true"]
+FALSE_VALUES = ["False", "FALSE", "false"]
+NUMBER_TYPES = ["int64", "uint64", "float64"]
+
+
+def add_reader_argument(arg_parser):
+    """add '--reader' and '--no_cache' options to argument parser
+
+    :param arg_parser: argparse.ArgumentParser
+
+    """
+    arg_parser.add_argument("--reader",
+                            dest="READER",
+                            help="engine to read csv, 'auto' means 'pyarrow' if it is available: default=auto",
+                            choices=READER_ENGINES,
+                            default="auto")
+    arg_parser.add_argument("--no_cache",
+                            "--no-cache",
+                            dest="CACHE",
+                            help="not use cache of parsed csv, that is enabled by environment variable {}".format(CACHE_DIR_ENV),
+                            action="store_false",
+                            default=True)
+
+
+def select_engine(csv_file, reader="auto", **kwargs):
+    """select engine to read csv
+
+    :param csv_file: path of csv file or sys.stdin
+    :param reader: one of READER_ENGINES
+    :returns: name of engine, "pyarrow", "c" or "python"
+    :rtype: str
+    :remark:
+       'pyarrow' is not used for stdin and for options that are not supported by read_csv_pyarrow,
+       then 'c' is used.
+
+    """
+    if reader not in ["auto", "pyarrow"]:
+        return reader
+
+    reason = None
+    if not PYARROW_PKG:
+        reason = "pyarrow is not available"
+    elif csv_file == sys.stdin or csv_file == "-" or not isinstance(csv_file, str):
+        reason = "input is not file"
+    elif any([v not in PYARROW_OPTIONS for v in kwargs]):
+        reason = "options are not supported:{}".format([v for v in kwargs if v not in PYARROW_OPTIONS])
+    elif kwargs.get("dtype", None) not in PYARROW_DTYPES:
+        reason = "dtype is not supported:{}".format(kwargs["dtype"])
+    elif len(kwargs.get("sep", ",")) != 1:
+        reason = "separator is not supported:{}".format(kwargs["sep"])
+    elif kwargs.get("usecols", None) is not None and callable(kwargs["usecols"]):
+        reason = "callable usecols is not supported"
+
+    if reason is not None:
+        if reader == "pyarrow":
+            print("#warn:csv_reader:pyarrow engine is not used, {}".format(reason), file=sys.stderr)
+        return "c"
+
+    return "pyarrow"
+
+
+def cast_to_number(values, types=NUMBER_TYPES):
+    """cast array of strings into number
+
+    :param values: pyarrow.ChunkedArray of strings
+    :param types: list of types to try
+    :returns: converted array or None
+    :rtype: pyarrow.ChunkedArray
+
+    """
+    for typ in types:
+        try:
+            result = values.cast(typ)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            continue
+        if typ != "float64" and any([pa_compute.any(pa_compute.starts_with(values, v)).as_py() for v in ["0x", "0X"]]):
+            # hexadecimal numbers are not converted by pd.read_csv
+            return None
+        return result
+    return None
+
+
+def infer_column_type(values):
+    """convert array of strings into numerical or bool values
+
+    :param values: pyarrow.ChunkedArray of strings
+    :returns: converted array
+    :rtype: pyarrow.ChunkedArray
+
+    """
+    if values.null_count == len(values):
+        return values.cast(pa.float64())
+
+    result = cast_to_number(values, types=NUMBER_TYPES[:2])
+    if result is None:
+        if pa_compute.any(pa_compute.match_substring_regex(values, r"^\s|\s$|^\+")).as_py():
+            # pd.read_csv accepts white spaces around number and '+'
+            result = cast_to_number(pa_compute.utf8_ltrim(pa_compute.utf8_trim_whitespace(values), "+"))
+        else:
+            result = cast_to_number(values, types=NUMBER_TYPES[2:])
+    if result is not None:
+        return result
+
+    if pa_compute.all(pa_compute.is_in(pa_compute.drop_null(values), value_set=pa.array(TRUE_VALUES + FALSE_VALUES))).as_py():
+        # NA is kept, then the column is object of True, False and NaN, as pd.read_csv does
+        return pa_compute.if_else(pa_compute.is_null(values), pa.scalar(None, pa.bool_()),
+                                  pa_compute.is_in(values, value_set=pa.array(TRUE_VALUES)))
+
+    return values
+
+
+def read_csv_pyarrow(csv_file, dtype=None, usecols=None, encoding=None, sep=","):
+    """read csv file by multi-threaded reader of pyarrow
+
+    :param csv_file: path of csv file
+    :param dtype: None, or one of "string", "object", str and object
+    :param usecols: list of columns to read
+    :param encoding: encoding of csv file
+    :param sep: delimiter, one character
+    :returns: dataframe
+    :rtype: pandas.DataFrame
+    :remark:
+       all values are read as string, and types of columns are inferred by infer_column_type, so datetime is not parsed,
+       as pd.read_csv does.
+       names of columns are same as pd.read_csv, even if there are duplicated names.
+
+    """
+    header = list(pd.read_csv(csv_file, nrows=0, sep=sep, encoding=encoding).columns)
+    fnames = ["f{}".format(i) for i in range(len(header))]
+    if usecols is not None:
+        if any([v not in header for v in usecols]):
+            raise ValueError("usecols do not match columns:{}".format([v for v in usecols if v not in header]))
+        include_columns = [f for f, c in zip(fnames, header) if c in usecols]
+    else:
+        include_columns = fnames
+
+    read_opts = pa_csv.ReadOptions(use_threads=True, column_names=fnames, skip_rows=1, encoding=encoding or "utf8")
+    parse_opts = pa_csv.ParseOptions(delimiter=sep)
+    convert_opts = pa_csv.ConvertOptions(column_types={f: pa.string() for f in fnames},
+                                         include_columns=include_columns,
+                                         null_values=NA_VALUES,
+                                         strings_can_be_null=True)
+    table = pa_csv.read_csv(csv_file, read_options=read_opts, parse_options=parse_opts, convert_options=convert_opts)
+
+    columns = [table.column(f) for f in include_columns]
+    if dtype is None:
+        columns = [infer_column_type(v) for v in columns]
+    names = [header[fnames.index(f)] for f in include_columns]
+    series = {}
+    for cn, values in zip(names, columns):
+        ds = values.to_pandas()
+        if pa.types.is_boolean(values.type) and values.null_count > 0:
+            ds = ds.where(ds.notna(), np.nan)
+        elif pa.types.is_string(values.type):
+            if dtype == "string":
+                ds = ds.astype("string")
+            else:
+                ds = ds.where(ds.notna(), np.nan)
+        series[cn] = ds
+    df = pd.DataFrame(series, index=pd.RangeIndex(table.num_rows))
+
+    return df
+
+
+def get_cache_dir():
+    """directory of cache
+
+    :returns: path of directory, or None if cache is not enabled
+    :rtype: pathlib.Path
+
+    """
+    cache_dir = os.environ.get(CACHE_DIR_ENV, None)
+    if cache_dir is None or len(cache_dir) == 0 or not PYARROW_PKG:
+        return None
+    return Path(cache_dir).expanduser()
+
+
+def get_cache_size():
+    """maximum size of cache in bytes
+
+    :returns: size
+    :rtype: int
+
+    """
+    try:
+        return int(float(os.environ.get(CACHE_SIZE_ENV, CACHE_SIZE_DEFAULT)) * 1024 * 1024)
+    except ValueError:
+        print("#warn:csv_reader:invalid {}:{}".format(CACHE_SIZE_ENV, os.environ[CACHE_SIZE_ENV]), file=sys.stderr)
+        return CACHE_SIZE_DEFAULT * 1024 * 1024
+
+
+def get_cache_file(csv_file, reader, kwargs):
+    """path of cache for csv file
+
+    :param csv_file: path of csv file
+    :param reader: one of READER_ENGINES
+    :param kwargs: options for pd.read_csv
+    :returns: path of cache file, or None if cache is not available
+    :rtype: pathlib.Path
+    :remark:
+       key of cache is made from path, size and mtime of csv file, and options to read.
+
+    """
+    cache_dir = get_cache_dir()
+    if cache_dir is None or not isinstance(csv_file, str) or any([v in kwargs for v in CACHE_UNSUPPORTED_OPTIONS]):
+        return None
+    try:
+        st = os.stat(csv_file)
+    except OSError:
+        return None
+    key = {
+        "path": str(Path(csv_file).resolve()),
+        "size": st.st_size,
+        "mtime": st.st_mtime_ns,
+        "reader": reader,
+        "options": {k: repr(v) for k, v in kwargs.items()},
+        "version": CACHE_VERSION
+    }
+    key_s = json.dumps(key, sort_keys=True)
+
+    return cache_dir / (hashlib.sha1(key_s.encode("utf-8")).hexdigest() + CACHE_SUFFIX)
+
+
+def update_cache_stats(cache_dir, **counts):
+    """add counts to statistics of cache
+
+    :param cache_dir: directory of cache
+    :param counts: counts to add, "hits", "misses" and "evictions"
+
+    """
+    stats_file = cache_dir / CACHE_STATS_FILE
+    stats = load_cache_stats(cache_dir)
+    for k, v in counts.items():
+        stats[k] = stats.get(k, 0) + v
+    try:
+        with open(stats_file, "w") as f:
+            json.dump(stats, f)
+    except OSError:
+        pass
+
+
+def load_cache_stats(cache_dir):
+    stats = {"hits": 0, "misses": 0, "evictions": 0}
+    try:
+        with open(cache_dir / CACHE_STATS_FILE) as f:
+            stats.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+    return stats
+
+
+def read_cache(cache_file):
+    """read dataframe from cache file by memory mapping
+
+    :param cache_file: path of cache file
+    :returns: dataframe or None
+    :rtype: pandas.DataFrame
+
+    """
+    try:
+        df = pa_feather.read_table(str(cache_file), memory_map=True).to_pandas()
+        # mtime of cache file is used as last access time for LRU
+        os.utime(cache_file)
+    except (OSError, pa.ArrowInvalid) as e:
+        print("#warn:csv_reader:failed to read cache:{}:{}".format(cache_file, e), file=sys.stderr)
+        return None
+
+    o_columns = [cn for cn in df.columns if df[cn].dtype == object]
+    for cn in o_columns:
+        df[cn] = df[cn].where(df[cn].notna(), np.nan)
+
+    return df
+
+
+def write_cache(df, cache_file, csv_file):
+    """write dataframe into cache file, and evict old cache files
+
+    :param df: dataframe
+    :param cache_file: path of cache file
+    :param csv_file: path of csv file
+
+    """
+    cache_dir = cache_file.parent
+    tmp_file = cache_file.with_suffix(".tmp{}".format(os.getpid()))
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[CACHE_SOURCE_KEY] = str(Path(csv_file).resolve()).encode("utf-8")
+        table = table.replace_schema_metadata(metadata)
+        pa_feather.write_feather(table, str(tmp_file), compression="uncompressed")
+        os.replace(tmp_file, cache_file)
+    except (OSError, pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+        print("#warn:csv_reader:failed to write cache:{}:{}".format(cache_file, e), file=sys.stderr)
+        if tmp_file.exists():
+            tmp_file.unlink()
+        return
+
+    evict_cache(cache_dir, get_cache_size())
+
+
+def list_cache_files(cache_dir):
+    """list cache files in order of last access, older first
+
+    :param cache_dir: directory of cache
+    :returns: list of (path, size, last access time)
+    :rtype: list
+
+    """
+    entries = []
+    for cf in cache_dir.glob("*" + CACHE_SUFFIX):
+        try:
+            st = cf.stat()
+        except OSError:
+            continue
+        entries.append((cf, st.st_size, st.st_mtime))
+    entries.sort(key=lambda x: x[2])
+
+    return entries
+
+
+def evict_cache(cache_dir, max_size):
+    """remove least recently used cache files until total size is less than max_size
+
+    :param cache_dir: directory of cache
+    :param max_size: maximum size in bytes
+
+    """
+    entries = list_cache_files(cache_dir)
+    total_size = sum([v[1] for v in entries])
+    n_evicted = 0
+    for cf, size, _ in entries[:-1]:
+        if total_size <= max_size:
+            break
+        try:
+            cf.unlink()
+        except OSError:
+            continue
+        total_size -= size
+        n_evicted += 1
+    if n_evicted > 0:
+        print("%inf:csv_reader:{} cache files were evicted".format(n_evicted), file=sys.stderr)
+        update_cache_stats(cache_dir, evictions=n_evicted)
+
+
+def read_csv_by_engine(csv_file, reader="auto", **kwargs):
+    """read csv file by selected engine
+
+    :param csv_file: path of csv file or sys.stdin
+    :param reader: one of READER_ENGINES
+    :param kwargs: options for pd.read_csv
+    :returns: dataframe, or reader for 'chunksize'
+    :rtype: pandas.DataFrame
+    :remark:
+       if pyarrow failed to read, pd.read_csv with 'c' engine is used.
+       for 'c' engine, 'float_precision="round_trip"' is used by default.
+
+    """
+    engine = select_engine(csv_file, reader, **kwargs)
+    if engine == "pyarrow":
+        try:
+            return read_csv_pyarrow(csv_file, **kwargs)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, UnicodeDecodeError, ValueError) as e:
+            print("#warn:csv_reader:pyarrow failed to read, 'c' engine is used:{}".format(e), file=sys.stderr)
+            engine = "c"
+
+    if engine == "c":
+        # floats are parsed exactly, as pyarrow does, so values do not depend on engine and input
+        kwargs.setdefault("float_precision", "round_trip")
+    return pd.read_csv(csv_file, engine=engine, **kwargs)
+
+
+def read_csv(csv_file, reader="auto", cache=True, **kwargs):
+    """read csv file, with cache if it is enabled
+
+    :param csv_file: path of csv file or sys.stdin
+    :param reader: one of READER_ENGINES
+    :param cache: if False, cache is not used
+    :param kwargs: options for pd.read_csv
+    :returns: dataframe, or reader for 'chunksize'
+    :rtype: pandas.DataFrame
+    :remark:
+       cache is enabled by environment variable CSV_TOOLS_CACHE, that is path of directory for cache files.
+       parsed dataframe is stored as Feather file, and the file is memory-mapped at next reading.
+       total size of cache files is limited by CSV_TOOLS_CACHE_SIZE[MB], least recently used files are removed.
+
+    """
+    if csv_file == "-":
+        csv_file = sys.stdin
+
+    cache_file = get_cache_file(csv_file, reader, kwargs) if cache else None
+    if cache_file is not None and cache_file.exists():
+        df = read_cache(cache_file)
+        if df is not None:
+            print("%inf:csv_reader:read from cache:{}".format(cache_file), file=sys.stderr)
+            update_cache_stats(cache_file.parent, hits=1)
+            return df
+
+    df = read_csv_by_engine(csv_file, reader, **kwargs)
+
+    if cache_file is not None:
+        write_cache(df, cache_file, csv_file)
+        update_cache_stats(cache_file.parent, misses=1)
+
+    return df
+
+
+def init():
+    arg_parser = argparse.ArgumentParser(description="statistics of cache for csv_reader",
+                                         formatter_class=argparse.RawDescriptionHelpFormatter,
+                                         epilog=textwrap.dedent('''
+remark:
+  csv_reader.py is the common module to read csv file for scripts in csv_utility and csv_plot.
+  when environment variable CSV_TOOLS_CACHE was given as path of directory, parsed csv is stored in the directory
+  as Feather file, and it is used while the csv file is not changed. the cache requires pyarrow module.
+  total size of cache is limited by environment variable CSV_TOOLS_CACHE_SIZE[MB], default is {}MB,
+  and least recently used files are removed.
+  to disable cache for each command, use '--no_cache'.
+
+example:
+  export CSV_TOOLS_CACHE=~/.cache/csv_tools
+  csv_status.py big_sample_arb.csv
+  csv_reader.py --list
+  csv_reader.py --clear
+
+'''.format(CACHE_SIZE_DEFAULT)))
+
+    arg_parser.add_argument("--list", dest="LIST", help="list cache files", action="store_true", default=False)
+    arg_parser.add_argument("--clear", dest="CLEAR", help="remove all cache files and statistics", action="store_true", default=False)
+    args = arg_parser.parse_args()
+    return args
+
+
+if __name__ == "__main__":
+    args = init()
+    list_mode = args.LIST
+    clear_mode = args.CLEAR
+
+    cache_dir = get_cache_dir()
+    if cache_dir is None:
+        print("??error:csv_reader:cache is not enabled, {} is not defined or pyarrow is not available".format(CACHE_DIR_ENV),
+              file=sys.stderr)
+        sys.exit(1)
+
+    entries = list_cache_files(cache_dir) if cache_dir.exists() else []
+    if clear_mode:
+        for cf, _, _ in entries:
+            cf.unlink()
+        stats_file = cache_dir / CACHE_STATS_FILE
+        if stats_file.exists():
+            stats_file.unlink()
+        print("%inf:csv_reader:{} cache files were removed".format(len(entries)), file=sys.stderr)
+        sys.exit(0)
+
+    stats = load_cache_stats(cache_dir)
+    total_size = sum([v[1] for v in entries])
+    n_reads = stats["hits"] + stats["misses"]
+    print("directory     : {}".format(cache_dir))
+    print("entries       : {}".format(len(entries)))
+    print("size          : {:.1f}MB / {:.1f}MB".format(total_size / 1024 / 1024, get_cache_size() / 1024 / 1024))
+    print("hits          : {}".format(stats["hits"]))
+    print("misses        : {}".format(stats["misses"]))
+    print("hit ratio     : {:.3f}".format(stats["hits"] / n_reads if n_reads > 0 else 0))
+    print("evictions     : {}".format(stats["evictions"]))
+    if list_mode:
+        for cf, size, atime in reversed(entries):
+            try:
+                metadata = pa_feather.read_table(str(cf), memory_map=True).schema.metadata or {}
+                source = metadata.get(CACHE_SOURCE_KEY, b"").decode("utf-8")
+            except (OSError, pa.ArrowInvalid):
+                source = ""
+            print("{} {:10.1f}KB {} {}".format(time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(atime)), size / 1024, cf.name, source))
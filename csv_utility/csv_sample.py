@@ -16,10 +16,13 @@
 import argparse
 import textwrap
 import sys
+from pathlib import Path
 
 import re
 import random
-import pandas as pd
+
+sys.path.insert(0, format(Path(__file__).parent))
+from csv_reader import add_reader_argument, read_csv
 
 VERSION = 1.0
 
@@ -44,6 +47,7 @@ example:
     arg_parser.add_argument('sample_size', metavar='SAMPLE_SIZE', help='size of sample: ex 100 50%% 0.5', type=str)
     # arg_parser.add_argument('infile', nargs='?', type=argparse.FileType('r'), default=sys.stdin)
     # arg_parser.add_argument('outfile', nargs='?', type=argparse.FileType('w'), default=sys.stdout)
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -71,7 +75,7 @@ if __name__ == "__main__":
         d_range = [0, 1.0]
 
     print("%Inf:csv_sample:read csv file: {}".format(csv_file), file=sys.stderr)
-    csv_df = pd.read_csv(csv_file)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
 
     nrows = len(csv_df)
     if s_size_s.endswith("%"):
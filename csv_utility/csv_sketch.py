@@ -0,0 +1,574 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# Name:         csv_sketch.py
+# Description:  mergeable sketches for statistics of large csv file
+#
+# Author:       m.akei
+# Copyright:    (c) 2021 by m.na.akei
+# Time-stamp:   <2026-10-18 10:12:31>
+# Licence:
+#  Copyright (c) 2021 Masaharu N. Akei
+#
+#  This software is released under the MIT License.
+#    http://opensource.org/licenses/mit-license.php
+# ----------------------------------------------------------------------
+"""mergeable sketches of values in column, those are used for statistics of large csv file in bounded memory.
+
+  KLLSketch   : quantiles
+  MisraGries  : frequent values, mode
+  HyperLogLog : number of unique values
+  GroupedHyperLogLog : number of unique values for each group
+
+each sketch has 'update' to add values and 'merge' to combine another sketch of same parameters,
+so results of chunks or groups can be combined.
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+VERSION = 1.0
+
+KLL_K = 400
+KLL_SEED = 0
+MG_COUNTERS = 1000
+HLL_P = 14
+
+MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def hash_values(values):
+    """hash values into 64-bit digests, NA values are removed
+
+    :param values: array or series
+    :returns: digests
+    :rtype: numpy.ndarray of uint64
+    :remark:
+       numerical values are hashed as float64, so integer and float of same value have same digest.
+
+    """
+    ds = pd.Series(values).dropna()
+    if pd.api.types.is_numeric_dtype(ds) and not pd.api.types.is_bool_dtype(ds):
+        ds = ds.astype(np.float64)
+    return pd.util.hash_array(ds.to_numpy())
+
+
+def leading_zeros(x):
+    """number of leading zero bits of 64-bit integers
+
+    :param x: array of uint64
+    :returns: number of leading zeros, 64 for 0
+    :rtype: numpy.ndarray
+
+    """
+    n = np.zeros(len(x), dtype=np.int64)
+    x = x.copy()
+    for shift in [32, 16, 8, 4, 2, 1]:
+        mask = (x >> np.uint64(64 - shift)) == 0
+        n += np.where(mask, shift, 0)
+        x = np.where(mask, x << np.uint64(shift), x)
+    n += (x == 0)
+    return n
+
+
+def quantile_from_sorted(values, weights, n, q):
+    """quantile by linear interpolation on positions of weighted sorted values
+
+    :param values: sorted values
+    :param weights: number of items of each value
+    :param n: total number of items
+    :param q: quantile, 0<=q<=1
+    :returns: value at quantile
+    :rtype: float
+    :remark:
+       same as numpy.percentile(interpolation='linear'), when each weight is count of value.
+
+    """
+    if n == 0:
+        return np.nan
+    cum = np.cumsum(weights)
+    pos = q * (n - 1)
+    i_lo = int(np.floor(pos))
+    i_hi = min(i_lo + 1, n - 1)
+    gamma = pos - i_lo
+    a = values[np.searchsorted(cum, i_lo, side="right")]
+    b = values[np.searchsorted(cum, i_hi, side="right")]
+    # as numpy._lerp
+    diff_b_a = b - a
+    if gamma >= 0.5:
+        return b - diff_b_a * (1 - gamma)
+    return a + diff_b_a * gamma
+
+
+def median_from_sorted(values, weights, n):
+    """median of weighted sorted values, mean of two values at middle when number of values is even, as numpy.median
+
+    :param values: sorted values
+    :param weights: number of items of each value
+    :param n: total number of items
+    :returns: median
+    :rtype: float
+
+    """
+    if n == 0:
+        return np.nan
+    cum = np.cumsum(weights)
+    a = values[np.searchsorted(cum, (n - 1) // 2, side="right")]
+    b = values[np.searchsorted(cum, n // 2, side="right")]
+    return (a + b) / 2
+
+
+class KLLSketch():
+    """quantile sketch by KLL algorithm(Karnin, Lang and Liberty, 2016)
+
+    :remark:
+       values are kept in compactors, one for each level, item in level 'h' has weight 2^h.
+       when a compactor exceeds its capacity, it is sorted and every other item, with random offset, is promoted
+       to next level. capacity of top level is 'k', and capacities decrease by 2/3 toward the bottom.
+       error of rank is less than about 2.5/k of number of values, for k=400, quantile has rank error about 0.6%,
+       and about k values are kept.
+       when values were not compacted, quantiles are exact and same as numpy.percentile.
+       minimum and maximum are exact. random generator is seeded, so results are deterministic.
+
+    """
+    def __init__(self, k=KLL_K, seed=KLL_SEED):
+        """
+        :param k: accuracy parameter, size of top compactor
+        :param seed: seed of random generator to select items in compaction
+        """
+        self.__k = k
+        self.__levels = [np.empty(0)]
+        self.__n = 0
+        self.__min = np.nan
+        self.__max = np.nan
+        self.__seed = seed
+        self.__rng = None
+        self.__compacted = False
+
+    @property
+    def n(self):
+        return self.__n
+
+    @property
+    def is_exact(self):
+        return not self.__compacted
+
+    def capacity(self, level):
+        depth = len(self.__levels)
+        return max(2, int(np.ceil(self.__k * (2.0 / 3.0)**(depth - level - 1))))
+
+    def update(self, values, weights=None):
+        """add values
+
+        :param values: array of numbers, NaN is ignored
+        :param weights: number of each value, if None, each value is counted once.
+
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if weights is None:
+            weights = np.ones(len(values), dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.int64)
+        mask = ~np.isnan(values) & (weights > 0)
+        values = values[mask]
+        weights = weights[mask]
+        if len(values) == 0:
+            return
+        self.__n += int(weights.sum())
+        self.__min = np.nanmin([self.__min, values.min()])
+        self.__max = np.nanmax([self.__max, values.max()])
+        # value that has weight 'w' is put into levels at bits of 'w', so total weight is kept
+        h = 0
+        while np.any(weights > 0):
+            if h == len(self.__levels):
+                self.__levels.append(np.empty(0))
+            self.__levels[h] = np.concatenate([self.__levels[h], values[(weights & 1) == 1]])
+            weights = weights >> 1
+            h += 1
+        self.compress()
+
+    def merge(self, other):
+        """combine another sketch
+
+        :param other: KLLSketch
+
+        """
+        if other.n == 0:
+            return
+        self.__compacted |= not other.is_exact
+        for h, items in enumerate(other.levels):
+            if h >= len(self.__levels):
+                self.__levels.append(np.empty(0))
+            self.__levels[h] = np.concatenate([self.__levels[h], items])
+        self.__n += other.n
+        self.__min = np.nanmin([self.__min, other.min])
+        self.__max = np.nanmax([self.__max, other.max])
+        self.compress()
+
+    @property
+    def levels(self):
+        return self.__levels
+
+    @property
+    def min(self):
+        return self.__min
+
+    @property
+    def max(self):
+        return self.__max
+
+    def compress(self):
+        compacted = True
+        while compacted:
+            compacted = False
+            for h in range(len(self.__levels)):
+                items = self.__levels[h]
+                if len(items) <= self.capacity(h):
+                    continue
+                if h + 1 == len(self.__levels):
+                    self.__levels.append(np.empty(0))
+                items = np.sort(items)
+                if len(items) % 2 == 1:
+                    rest = items[-1:]
+                    items = items[:-1]
+                else:
+                    rest = items[:0]
+                if self.__rng is None:
+                    self.__rng = np.random.default_rng(self.__seed)
+                offset = self.__rng.integers(2)
+                self.__levels[h + 1] = np.concatenate([self.__levels[h + 1], items[offset::2]])
+                self.__levels[h] = rest
+                self.__compacted = True
+                compacted = True
+                break
+
+    def quantile(self, q):
+        """value at quantile
+
+        :param q: quantile, 0<=q<=1
+        :returns: estimated value
+        :rtype: float
+
+        """
+        if self.__n == 0:
+            return np.nan
+        if q <= 0:
+            return self.__min
+        if q >= 1:
+            return self.__max
+        values, weights = self.sorted_items()
+        return quantile_from_sorted(values, weights, self.__n, q)
+
+    def sorted_items(self):
+        values = np.concatenate(self.__levels)
+        weights = np.concatenate([np.full(len(v), 2**h, dtype=np.int64) for h, v in enumerate(self.__levels)])
+        idx = np.argsort(values, kind="stable")
+        return values[idx], weights[idx]
+
+    def median(self):
+        """median, mean of two values at middle when number of values is even, as numpy.median
+
+        :returns: estimated median
+        :rtype: float
+
+        """
+        if self.__n == 0:
+            return np.nan
+        if not self.is_exact:
+            return self.quantile(0.5)
+        values, weights = self.sorted_items()
+        return median_from_sorted(values, weights, self.__n)
+
+
+class MisraGries():
+    """frequent values by Misra-Gries summary, that is mergeable(Agarwal et al., 2012)
+
+    :remark:
+       at most 'm' counters are kept. when there are more counters, count of (m+1)-th counter is subtracted from all counters,
+       and counters that are not positive are removed.
+       estimated count 'c_e' of value that has count 'c' satisfies c - n/(m+1) <= c_e <= c, where n is number of values,
+       so any value that has count more than n/(m+1) is kept. the upper bound of error is given by 'error'.
+
+    """
+    def __init__(self, m=MG_COUNTERS):
+        """
+        :param m: number of counters
+        """
+        self.__m = m
+        self.__counts = pd.Series(dtype=np.int64)
+        self.__n = 0
+        self.__error = 0
+
+    @property
+    def n(self):
+        return self.__n
+
+    @property
+    def error(self):
+        """upper bound of error of each count"""
+        return self.__error
+
+    @property
+    def counts(self):
+        return self.__counts
+
+    def update(self, values):
+        """add values
+
+        :param values: array or series, NA is ignored
+
+        """
+        self.update_counts(pd.Series(values).value_counts(sort=False, dropna=True))
+
+    def update_counts(self, counts, error=0):
+        """add counts of values
+
+        :param counts: series, index is value and value is count
+        :param error: error of given counts
+
+        """
+        counts = counts[counts > 0]
+        self.__n += int(counts.sum())
+        self.__error += error
+        if len(self.__counts) > 0:
+            counts = pd.concat([self.__counts, counts]).groupby(level=0, sort=False).sum()
+        if len(counts) > self.__m:
+            c_min = counts.nlargest(self.__m + 1, keep="first").iloc[-1]
+            counts = counts - c_min
+            counts = counts[counts > 0]
+            self.__error += int(c_min)
+        self.__counts = counts.astype(np.int64)
+
+    def merge(self, other):
+        """combine another summary
+
+        :param other: MisraGries
+
+        """
+        self.update_counts(other.counts, error=other.error)
+        # values that were removed by 'other' are counted in its 'n'
+        self.__n += other.n - int(other.counts.sum())
+
+    def top(self, n_top=None):
+        """frequent values in descending order of counts, order of first appearance for same count
+
+        :param n_top: number of values, if None, all counters
+        :returns: series of estimated counts
+        :rtype: pandas.Series
+
+        """
+        result = self.__counts.sort_values(ascending=False, kind="stable")
+        if n_top is not None:
+            result = result.iloc[:n_top]
+        return result
+
+
+def register_ranks(digests, p):
+    """registers and ranks of digests for HyperLogLog
+
+    :param digests: array of uint64
+    :param p: number of bits to select register
+    :returns: index of register and position of first 1-bit in remaining bits
+    :rtype: tuple(numpy.ndarray, numpy.ndarray)
+
+    """
+    digests = np.asarray(digests, dtype=np.uint64)
+    idx = (digests >> np.uint64(64 - p)).astype(np.int64)
+    rest = (digests << np.uint64(p)) & MASK64
+    rank = np.minimum(leading_zeros(rest) + 1, 64 - p + 1).astype(np.uint8)
+    return idx, rank
+
+
+def hll_estimate(sum_inv, n_zeros, m):
+    """estimation of HyperLogLog, with linear counting for small cardinality
+
+    :param sum_inv: sum of 2^-rank over registers
+    :param n_zeros: number of registers that are zero
+    :param m: number of registers
+    :returns: estimated count
+    :rtype: numpy.ndarray
+
+    """
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.asarray(sum_inv, dtype=np.float64)
+    n_zeros = np.asarray(n_zeros, dtype=np.float64)
+    with np.errstate(divide="ignore"):
+        linear = m * np.log(m / n_zeros)
+    estimate = np.where((estimate <= 2.5 * m) & (n_zeros > 0), linear, estimate)
+    return np.round(estimate).astype(np.int64)
+
+
+class HyperLogLog():
+    """number of unique values by HyperLogLog(Flajolet et al., 2007)
+
+    :remark:
+       values are hashed into 64-bit digests, upper 'p' bits select one of 2^p registers,
+       and each register keeps maximum position of first 1-bit in remaining bits.
+       relative standard error is 1.04/sqrt(2^p), for p=14, 0.81% with 16KB memory.
+       for small cardinality, linear counting is used.
+
+    """
+    def __init__(self, p=HLL_P):
+        """
+        :param p: number of bits to select register
+        """
+        self.__p = p
+        self.__m = 1 << p
+        self.__registers = np.zeros(self.__m, dtype=np.uint8)
+
+    @property
+    def registers(self):
+        return self.__registers
+
+    def update(self, values):
+        """add values
+
+        :param values: array or series, NA is ignored
+
+        """
+        self.update_digests(hash_values(values))
+
+    def update_digests(self, digests):
+        """add 64-bit digests of values
+
+        :param digests: array of uint64
+
+        """
+        if len(digests) == 0:
+            return
+        idx, rank = register_ranks(digests, self.__p)
+        np.maximum.at(self.__registers, idx, rank)
+
+    def merge(self, other):
+        """combine another counter
+
+        :param other: HyperLogLog
+
+        """
+        np.maximum(self.__registers, other.registers, out=self.__registers)
+
+    def count(self):
+        """estimated number of unique values
+
+        :returns: estimated count
+        :rtype: int
+
+        """
+        sum_inv = np.sum(np.ldexp(1.0, -self.__registers.astype(np.int64)))
+        n_zeros = np.count_nonzero(self.__registers == 0)
+        return int(hll_estimate(sum_inv, n_zeros, self.__m))
+
+
+class GroupedHyperLogLog():
+    """HyperLogLog for each group, registers are kept sparsely
+
+    :remark:
+       only registers that are not zero are kept as pairs of key(=code of group * 2^p + index of register) and rank,
+       in sorted numpy arrays. so memory for each group is proportional to min(number of unique values, 2^p),
+       and number of unique values of many groups, for example groups by high-cardinality key, is estimated in bounded memory.
+       error is same as HyperLogLog, and linear counting is used for small group.
+
+    """
+    def __init__(self, p=HLL_P):
+        """
+        :param p: number of bits to select register
+        """
+        self.__p = p
+        self.__m = 1 << p
+        self.__groups = pd.Index([])
+        self.__keys = np.empty(0, dtype=np.int64)
+        self.__ranks = np.empty(0, dtype=np.uint8)
+
+    @property
+    def groups(self):
+        return self.__groups
+
+    @property
+    def registers(self):
+        """groups, indexes and ranks of registers that are not zero"""
+        codes = self.__keys >> self.__p
+        return self.__groups[codes], self.__keys & (self.__m - 1), self.__ranks
+
+    def group_codes(self, groups):
+        """codes of groups, new groups are appended
+
+        :param groups: values of groups
+        :returns: codes
+        :rtype: numpy.ndarray
+
+        """
+        groups = pd.Index(groups)
+        codes = self.__groups.get_indexer(groups)
+        if np.any(codes < 0):
+            self.__groups = self.__groups.append(groups[codes < 0].unique())
+            codes = self.__groups.get_indexer(groups)
+        return codes.astype(np.int64)
+
+    def update(self, groups, values):
+        """add values with groups
+
+        :param groups: array or series of group of each value
+        :param values: array or series, NA is ignored
+
+        """
+        groups = pd.Series(groups).reset_index(drop=True)
+        values = pd.Series(values).reset_index(drop=True)
+        mask = (values.notna() & groups.notna()).to_numpy()
+        codes = self.group_codes(groups[mask])
+        if len(codes) == 0:
+            return
+        idx, rank = register_ranks(hash_values(values[mask]), self.__p)
+        self.merge_registers((codes << self.__p) + idx, rank)
+
+    def merge_registers(self, keys, ranks):
+        keys = np.concatenate([self.__keys, keys])
+        ranks = np.concatenate([self.__ranks, ranks])
+        order = np.lexsort((ranks, keys))
+        keys = keys[order]
+        ranks = ranks[order]
+        # the last one of each key has maximum rank
+        last = np.append(keys[1:] != keys[:-1], True)
+        self.__keys = keys[last]
+        self.__ranks = ranks[last]
+
+    def merge(self, other):
+        """combine another counter
+
+        :param other: GroupedHyperLogLog
+
+        """
+        groups, idx, ranks = other.registers
+        self.group_codes(other.groups)
+        self.merge_registers((self.group_codes(groups) << self.__p) + idx, ranks)
+
+    def map_groups(self, mapper):
+        """counter with converted groups, registers of groups that become same are merged
+
+        :param mapper: dict or function to convert group
+        :returns: counter
+        :rtype: GroupedHyperLogLog
+
+        """
+        result = GroupedHyperLogLog(p=self.__p)
+        groups, idx, ranks = self.registers
+        result.group_codes(self.__groups.map(mapper))
+        result.merge_registers((result.group_codes(groups.map(mapper)) << self.__p) + idx, ranks)
+        return result
+
+    def count(self):
+        """estimated number of unique values for each group
+
+        :returns: series, index is group, in order of appearance
+        :rtype: pandas.Series
+
+        """
+        n_groups = len(self.__groups)
+        codes = self.__keys >> self.__p
+        sum_inv = np.bincount(codes, weights=np.ldexp(1.0, -self.__ranks.astype(np.int64)), minlength=n_groups)
+        n_zeros = self.__m - np.bincount(codes, minlength=n_groups)
+        return pd.Series(hll_estimate(sum_inv + n_zeros, n_zeros, self.__m), index=self.__groups)
+
+
+if __name__ == "__main__":
+    print("??error:csv_sketch:this is module, not for command line", file=sys.stderr)
+    sys.exit(1)
@@ -22,6 +22,9 @@ from pathlib import Path
 
 import pandas as pd
 
+sys.path.insert(0, format(Path(__file__).parent))
+from csv_reader import add_reader_argument, read_csv
+
 VERSION = 1.0
 
 # 多重意味付けカラムの分解
@@ -126,6 +129,7 @@ example2:
     arg_parser.add_argument("--output", dest="OUTPUT", help="path of output file", type=str, metavar="FILE", default=None)
 
     arg_parser.add_argument('csv_file', metavar='CSV_FILE', help='files to read, if empty, stdin is used')
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -211,7 +215,7 @@ if __name__ == "__main__":
 
     new_cs, trans_tables = parse_columns(col_defs)
 
-    csv_df = pd.read_csv(csv_file)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
 
     # check names of columns
     for col in list(trans_tables.keys()) + inc_cols:
@@ -6,7 +6,7 @@
 #
 # Author:       m.akei
 # Copyright:    (c) 2020 by m.na.akei
-# Time-stamp:   <2020-08-16 12:33:46>
+# Time-stamp:   <2026-10-18 11:02:14>
 # Licence:
 #  Copyright (c) 2021 Masaharu N. Akei
 #
@@ -16,11 +16,21 @@
 import argparse
 import textwrap
 import sys
+import io
+import math
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 # import pprint
 
+import numpy as np
 import pandas as pd
 from distutils.version import LooseVersion
 
+sys.path.insert(0, format(Path(__file__).parent))
+from csv_reader import add_reader_argument, read_csv
+from csv_uty import StreamingDeduplicator, read_csv_header
+from csv_sketch import KLLSketch, MisraGries, HyperLogLog, GroupedHyperLogLog, quantile_from_sorted, median_from_sorted
+
 PANDAS_MIN_VERSION = "1.1.3"
 if LooseVersion(PANDAS_MIN_VERSION) > LooseVersion(pd.__version__):
     print("??Error:csv_uty:padnas version must be newer than {}.".format(PANDAS_MIN_VERSION), file=sys.stderr)
@@ -58,6 +68,22 @@ MODE_TABLE_DESC = {
     "negative": "Coount elements over index, that have less than 0",
 }
 MODE_TABLE = list(MODE_TABLE_DESC.keys())
+# modes, those are answered by sketches with '--approx'
+APPROX_MODES = ["median", "quantile25", "quantile50", "quantile75", "nunique", "mode"]
+APPROX_QUANTILES = {"median": 0.5, "quantile25": 0.25, "quantile50": 0.5, "quantile75": 0.75}
+# modes, those are aggregations and available with '--modes'
+FUSED_MODES = [
+    "count", "sum", "avg", "std", "min", "max", "median", "sem", "skew", "var", "quantile25", "quantile50", "quantile75", "nunique",
+    "vrange", "notzero", "zero", "morethan", "lessthan", "positive", "negative"
+]
+COUNTER_MODES = ["notzero", "zero", "morethan", "lessthan", "positive", "negative"]
+MODES_FORMAT = ["wide", "long"]
+
+# maximum number of unique values in each column, those are counted exactly in streaming mode
+STATUS_EXACT_LIMIT = 100000
+NUMERIC_KINDS = ["int", "float"]
+# strings, those are parsed into bool by pandas.read_csv
+BOOL_STRINGS = {"True": True, "TRUE": True, "true": True, "False": False, "FALSE": False, "false": False}
 
 
 def init():
@@ -75,6 +101,35 @@ remark:
 
   With '--group', each histogram is made of value grouped by given group column.  
 
+  When '--chunksize' was given, input is read in chunks that have given number of rows, and statistics are accumulated
+  in one sequential read, so size of memory is independent of number of rows. '--mode' is not available in this streaming mode.
+  Mean, std, skew and kurtosis are evaluated by merging moments of chunks, so those may be different in last digits.
+  Counts of values are kept exactly while number of unique values in the column is not more than {},
+  and quantiles, median, mode and unique values are same as ones without '--chunksize'.
+  Over the limit, those are estimated by sketches(see csv_sketch.py): quantiles and median have rank error about 0.6%,
+  number of unique values has relative error about 0.8%, and only frequent values are printed as unique values.
+  Values are read as strings, and kind of each column is decided by all values, so strings like '0012' are kept
+  when the column is not numerical. Duplicated rows are found by strings of values.
+
+  With '--modes', several modes are evaluated by one groupby, and result is written into one csv.
+  Available modes are {}.
+  Counters, those are notzero, zero, morethan, lessthan, positive and negative, are evaluated as boolean columns,
+  those are summed in the same groupby. For '--modes', zero and notzero count values that are equal or not equal to 0.
+  With '--modes_format=wide', columns of result are modes without '--group', or '<column>_<mode>' with '--group'.
+  With '--modes_format=long', rows of result are ([group,] column, mode, value).
+
+  With '--jobs', statistics of columns are evaluated by given number of threads, those share data without copy.
+  Output is same as one without '--jobs'. '--jobs' is not used for '--mode'.
+
+  With '--approx', modes {} are answered by mergeable sketches(see csv_sketch.py), with or without '--group',
+  and those are available with '--chunksize'. memory for each column and group is bounded:
+    median, quantile*: KLL sketch, exact for up to about 400 values, else rank error is about 0.6%.
+    nunique          : HyperLogLog, relative standard error is about 0.8%, linear counting is used for small count.
+                       registers are kept sparsely for each group, so memory is small for groups that have few values.
+    mode             : Misra-Gries summary with 1000 counters, counts of values have error less than n/1001,
+                       n is number of values. if no value has count more than that, result is empty.
+  For quantiles without '--group', only columns that have numerical values are used.
+
   description of mode:
 {}
 
@@ -106,7 +161,12 @@ example:
   ('A0001', 897)
   ('B0010', 219)
 
-'''.format(mode_help)))
+  csv_status.py --chunksize=100000 big_sample_headers.csv
+  csv_status.py --chunksize=100000 --approx --mode=nunique --group=ABC004 big_sample_headers.csv
+  csv_status.py --modes=sum,avg,std,min,max,nunique --group=ABC004 big_sample_headers.csv
+  csv_status.py --modes=count,morethan --arguments=3740 --modes_format=long bit-pattern-headers.csv
+
+'''.format(STATUS_EXACT_LIMIT, ", ".join(APPROX_MODES), ", ".join(FUSED_MODES), mode_help)))
 
     arg_parser.add_argument('-v', '--version', action='version', version='%(prog)s {}'.format(VERSION))
     arg_parser.add_argument("--columns",
@@ -123,7 +183,29 @@ example:
                             type=str,
                             metavar='COLUMN',
                             default=None)
+    arg_parser.add_argument("--modes",
+                            dest="MODES",
+                            help="modes those are evaluated in one pass, see remark",
+                            type=str,
+                            metavar="MODE[,MODE...]",
+                            default=None)
+    arg_parser.add_argument("--modes_format",
+                            dest="MODES_FORMAT",
+                            help="format of result of '--modes', default=wide",
+                            choices=MODES_FORMAT,
+                            default="wide")
     arg_parser.add_argument("--arguments", dest="OPTARGS", help="arguments for some mode", type=str, metavar="ARG[,ARG...]", default=None)
+    arg_parser.add_argument("--approx",
+                            dest="APPROX",
+                            help="estimate result of mode by sketches in bounded memory, see remark",
+                            action="store_true",
+                            default=False)
+    arg_parser.add_argument("--jobs",
+                            dest="JOBS",
+                            help="number of threads to evaluate statistics of columns in parallel, default=1",
+                            type=int,
+                            metavar='INT',
+                            default=1)
 
     arg_parser.add_argument("--output",
                             dest="OUTPUT",
@@ -131,66 +213,120 @@ example:
                             type=str,
                             metavar='FILE',
                             default=sys.stdout)
+    arg_parser.add_argument("--chunksize",
+                            dest="CHUNKSIZE",
+                            help="number of rows in each chunk for streaming mode, see remark",
+                            type=int,
+                            metavar='INT',
+                            default=None)
 
     arg_parser.add_argument('csv_file', metavar='CSV_FILE', help='files to read, if empty, stdin is used')
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
 
-def series_statistics(ps):
+def series_statistics(ps, file=None):
     """print statistics about pandas.Series
 
     :param ps: pandas.Series 
+    :param file: output, if None, sys.stdout is used
 
     """
     if ps.dtype == object:
-        print(ps.describe(include='all'))
-        print("-- unique values:")
+        print(ps.describe(include='all'), file=file)
+        print("-- unique values:", file=file)
         vcs = list(ps.value_counts().items())
         if len(vcs) > 10:
             print("#Warning:csv_status:too many uniqe values:{}".format(ps.nunique()), file=sys.stderr)
             max_print = 10
-            print("\n".join([str(v) for v in vcs[:max_print]]))
+            print("\n".join([str(v) for v in vcs[:max_print]]), file=file)
             if len(vcs) - max_print > max_print:
-                print(":\n:")
-                print("\n".join([str(v) for v in vcs[-max_print:]]))
+                print(":\n:", file=file)
+                print("\n".join([str(v) for v in vcs[-max_print:]]), file=file)
             else:
-                print(vcs[max_print:])
+                print(vcs[max_print:], file=file)
         else:
-            print("\n".join([str(v) for v in vcs]))
+            print("\n".join([str(v) for v in vcs]), file=file)
 
     else:
-        print(ps.describe(include='all'))
+        print(ps.describe(include='all'), file=file)
         idxmax = ps.idxmax()
         idxmin = ps.idxmin()
         v_sum = ps.sum(skipna=True)
         v_med = ps.median(skipna=True)
         v_mode = ps.mode(dropna=True).tolist()
-        print("maximum value: pos={}, value={}".format(idxmax, ps.iloc[idxmax]))
-        print("minimum value: pos={}, value={}".format(idxmin, ps.iloc[idxmin]))
-        print("summarize    : value={}".format(v_sum))
-        print("median       : value={}".format(v_med))
+        print("maximum value: pos={}, value={}".format(idxmax, ps.iloc[idxmax]), file=file)
+        print("minimum value: pos={}, value={}".format(idxmin, ps.iloc[idxmin]), file=file)
+        print("summarize    : value={}".format(v_sum), file=file)
+        print("median       : value={}".format(v_med), file=file)
         if len(v_mode) > 10:
-            print("mode         : too many")
+            print("mode         : too many", file=file)
         else:
-            print("mode         : value={}".format(v_mode))
+            print("mode         : value={}".format(v_mode), file=file)
+
+    print("NA count     : {}".format(ps.isnull().sum()), file=file)
+    print("", file=file)
+
+
+def map_columns(func, columns, n_jobs=1):
+    """apply function to each column
 
-    print("NA count     : {}".format(ps.isnull().sum()))
-    print("")
+    :param func: function that has name of column as argument
+    :param columns: list of names of columns
+    :param n_jobs: number of threads
+    :returns: list of results, in order of columns
+    :rtype: list
+    :remark:
+       columns are shared by threads without copy. most of statistics of numpy and pandas release GIL,
+       so those run in parallel. results do not depend on 'n_jobs'.
+
+    """
+    if n_jobs <= 1 or len(columns) <= 1:
+        return [func(cn) for cn in columns]
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        return list(executor.map(func, columns))
+
+
+def describe_frame(ldesc, cnames):
+    """make result of pandas.DataFrame.describe(include='all') from ones of columns
+
+    :param ldesc: list of pandas.Series, those are results of describe for each column
+    :param cnames: names of columns
+    :returns: dataframe
+    :rtype: pandas.DataFrame
+
+    """
+    names = []
+    for desc in sorted(ldesc, key=len):
+        for name in desc.index:
+            if name not in names:
+                names.append(name)
+    desc_df = pd.concat([desc.reindex(names, copy=False) for desc in ldesc], axis=1, sort=False)
+    desc_df.columns = pd.Index(cnames)
+    return desc_df
 
 
-def entire_status(csv_df, output, col_list):
+def series_report(ps):
+    output = io.StringIO()
+    series_statistics(ps, file=output)
+    return output.getvalue()
+
+
+def entire_status(csv_df, output, col_list, n_jobs=1):
     # for each columns
     if len(col_list) > 0:
         cnames = csv_df.columns
         for cn in col_list:
             if cn not in cnames:
                 print("#warn:csv_status:column:{} not found".format(cn), file=sys.stderr)
-            else:
-                c_ps = csv_df[cn]
-                print("== information for columns:{} of {}".format(cn, csv_file), file=output)
-                print("dtype   {}".format(c_ps.dtype), file=output)
-                series_statistics(c_ps)
+        col_list = [cn for cn in col_list if cn in cnames]
+        reports = map_columns(lambda cn: series_report(csv_df[cn]), col_list, n_jobs)
+        for cn, report in zip(col_list, reports):
+            c_ps = csv_df[cn]
+            print("== information for columns:{} of {}".format(cn, csv_file), file=output)
+            print("dtype   {}".format(c_ps.dtype), file=output)
+            sys.stdout.write(report)
 
     else:
         cnames = csv_df.columns
@@ -202,11 +338,812 @@ def entire_status(csv_df, output, col_list):
         print("-- number of columsn: {}".format(len(cnames)), file=output)
         print("-- duplicated rows  : {}".format(len(csv_df[csv_df.duplicated()])), file=output)
         print("-- statistical information for each column", file=output)
-        print(csv_df.describe(include='all'), file=output)
+        if n_jobs > 1:
+            print(describe_frame(map_columns(lambda cn: csv_df[cn].describe(), cnames, n_jobs), cnames), file=output)
+        else:
+            print(csv_df.describe(include='all'), file=output)
         print("-- NA count", file=output)
         print(csv_df.isnull().sum(), file=output)
 
 
+def value_kind(ps):
+    """kind of values in pandas.Series, as dtype that is given by pandas.read_csv
+
+    :param ps: pandas.Series, that has no NA. strings are parsed as pandas.read_csv does
+    :returns: one of 'int', 'float', 'bool' and 'object'
+    :rtype: str
+
+    """
+    if pd.api.types.is_bool_dtype(ps):
+        return "bool"
+    if pd.api.types.is_integer_dtype(ps):
+        return "int"
+    if pd.api.types.is_float_dtype(ps):
+        return "float"
+    inferred = pd.api.types.infer_dtype(ps, skipna=True)
+    if inferred == "boolean":
+        return "bool"
+    if inferred != "string":
+        return "object"
+    if ps.isin(BOOL_STRINGS.keys()).all():
+        return "bool"
+    values = pd.to_numeric(ps, errors="coerce")
+    if values.isnull().any():
+        return "object"
+    return "int" if pd.api.types.is_integer_dtype(values) else "float"
+
+
+def merge_kind(kind_a, kind_b):
+    """kind of column that has values of both kinds
+
+    :param kind_a: kind of values or None
+    :param kind_b: kind of values
+    :returns: kind
+    :rtype: str
+
+    """
+    if kind_a is None or kind_a == kind_b:
+        return kind_b
+    if kind_a in NUMERIC_KINDS and kind_b in NUMERIC_KINDS:
+        return "float"
+    return "object"
+
+
+def kind_dtype(kind, has_na):
+    """dtype of column, when entire data was read by pandas.read_csv
+
+    :param kind: kind of column or None for only NA
+    :param has_na: if True, column has NA
+    :returns: dtype
+    :rtype: numpy.dtype
+
+    """
+    if kind == "int" and not has_na:
+        return np.dtype(np.int64)
+    if kind == "bool" and not has_na:
+        return np.dtype(bool)
+    if kind in ["bool", "object"]:
+        return np.dtype(object)
+    return np.dtype(np.float64)
+
+
+def cast_values(ps, kind):
+    """values of pandas.Series as given kind
+
+    :param ps: pandas.Series, that has no NA
+    :param kind: one of 'int', 'float' and 'bool', that was given by 'value_kind' for the values
+    :returns: series of numbers or bools
+    :rtype: pandas.Series
+
+    """
+    if kind == "bool":
+        if pd.api.types.infer_dtype(ps, skipna=True) == "string":
+            ps = ps.map(BOOL_STRINGS)
+        return ps.astype(bool)
+    if kind == "float":
+        # strings are parsed exactly, as 'float_precision="round_trip"' of csv_reader
+        return ps.astype(np.float64)
+    return pd.to_numeric(ps)
+
+
+def typed_values(values, kind, dtype):
+    """values of given kind, from strings
+
+    :param values: pandas.Index or array of strings
+    :param kind: kind of column
+    :param dtype: dtype of column, see 'kind_dtype'
+    :returns: values
+    :rtype: pandas.Index
+
+    """
+    if kind not in NUMERIC_KINDS + ["bool"] or len(values) == 0:
+        return pd.Index(values)
+    ps = cast_values(pd.Series(values), kind)
+    if kind != "bool":
+        ps = ps.astype(dtype)
+    return pd.Index(ps.to_numpy())
+
+
+def typed_counts(counts, kind, dtype):
+    """counts of values of given kind, from counts of strings
+
+    :param counts: pandas.Series, index is value and value is count
+    :param kind: kind of column
+    :param dtype: dtype of column, see 'kind_dtype'
+    :returns: counts, strings that are same value in the kind, like '0012' and '12' for 'int', are merged
+    :rtype: pandas.Series
+
+    """
+    if kind not in NUMERIC_KINDS + ["bool"] or len(counts) == 0:
+        return counts
+    counts = pd.Series(counts.to_numpy(), index=typed_values(counts.index, kind, dtype))
+    return counts.groupby(level=0, sort=False).sum()
+
+
+def map_group_sketches(sketch, g_map):
+    """sketches with converted groups, sketches of groups that become same are merged
+
+    :param sketch: GroupedHyperLogLog or dict of sketch for each group
+    :param g_map: dict to convert group
+    :returns: sketches
+
+    """
+    if isinstance(sketch, GroupedHyperLogLog):
+        return sketch.map_groups(g_map)
+    result = {}
+    for key, sk in sketch.items():
+        t_key = g_map[key]
+        if t_key in result:
+            result[t_key].merge(sk)
+        else:
+            result[t_key] = sk
+    return result
+
+
+class ColumnStatistics():
+    """statistics of a column, those are accumulated chunk by chunk
+
+    :remark:
+       count of values and NA, maximum and minimum with position, sum and central moments up to 4th order are accumulated.
+       moments of chunks are merged by the formula of Chan et al.(pairwise version of Welford's method),
+       so mean, variance, skew and kurtosis are available in one pass.
+       counts of values are kept exactly while number of unique values is not more than 'exact_limit',
+       then quantiles, median, mode and unique values are exact. Over the limit, KLLSketch, MisraGries and HyperLogLog are used.
+
+       values are given as strings, and those are counted as they are, so strings like '0012' are kept when the column is not numerical.
+       kind of column is decided by all values, and counts are converted into values of the kind by 'finish'.
+
+    """
+    def __init__(self, name, exact_limit=STATUS_EXACT_LIMIT):
+        """
+        :param name: name of column
+        :param exact_limit: maximum number of unique values, those are counted exactly
+        """
+        self.name = name
+        self.kind = None
+        self.n_values = 0
+        self.n_na = 0
+        self.v_max = np.nan
+        self.v_min = np.nan
+        self.pos_max = np.nan
+        self.pos_min = np.nan
+        self.__exact_limit = exact_limit
+        self.__counts = pd.Series(dtype=np.int64)
+        self.__quantiles = None
+        self.__frequents = None
+        self.__uniques = None
+        self.__num_uniques = None
+        self.__n = 0
+        self.__mean = 0.0
+        self.__m2 = 0.0
+        self.__m3 = 0.0
+        self.__m4 = 0.0
+        self.__int_sum = 0
+        self.__float_sums = []
+
+    @property
+    def is_exact(self):
+        return self.__counts is not None
+
+    def dtype(self):
+        """dtype of the column, when entire data was read by pandas.read_csv
+
+        :returns: dtype
+        :rtype: numpy.dtype
+
+        """
+        return kind_dtype(self.kind, self.n_na > 0)
+
+    def update(self, ps):
+        """add values in a chunk
+
+        :param ps: pandas.Series, a column of chunk, that has strings
+
+        """
+        na_mask = ps.isnull().to_numpy()
+        n_na = int(na_mask.sum())
+        self.n_na += n_na
+        if n_na == len(ps):
+            return
+        if n_na > 0:
+            ps = ps[~na_mask]
+        self.n_values += len(ps)
+
+        kind = value_kind(ps)
+        self.kind = merge_kind(self.kind, kind)
+        if self.kind in NUMERIC_KINDS:
+            self.add_moments(cast_values(ps, kind), kind)
+        else:
+            # sketches of numbers are not available for strings
+            self.__quantiles = None
+            self.__num_uniques = None
+        self.add_counts(ps)
+
+    def finish(self):
+        """convert counts of strings into ones of values of the kind, after all chunks were given
+
+        """
+        dtype = self.dtype()
+        if self.__counts is not None:
+            self.__counts = typed_counts(self.__counts, self.kind, dtype)
+        else:
+            frequents = self.__frequents
+            self.__frequents = MisraGries()
+            self.__frequents.update_counts(typed_counts(frequents.counts, self.kind, dtype), error=frequents.error)
+            if self.__num_uniques is not None:
+                self.__uniques = self.__num_uniques
+        if self.kind in NUMERIC_KINDS:
+            self.v_max = dtype.type(self.v_max)
+            self.v_min = dtype.type(self.v_min)
+
+    def add_moments(self, ps, kind):
+        values = ps.to_numpy(dtype=np.float64)
+        n_a = self.__n
+        n_b = len(values)
+        n = n_a + n_b
+        mean_b = values.mean()
+        d_b = values - mean_b
+        d_b2 = d_b * d_b
+        m2_b = d_b2.sum()
+        m3_b = (d_b2 * d_b).sum()
+        m4_b = (d_b2 * d_b2).sum()
+
+        delta = mean_b - self.__mean
+        m2_a = self.__m2
+        m3_a = self.__m3
+        self.__m4 += m4_b + delta**4 * n_a * n_b * (n_a * n_a - n_a * n_b + n_b * n_b) / n**3 + 6 * delta**2 * (
+            n_a * n_a * m2_b + n_b * n_b * m2_a) / n**2 + 4 * delta * (n_a * m3_b - n_b * m3_a) / n
+        self.__m3 += m3_b + delta**3 * n_a * n_b * (n_a - n_b) / n**2 + 3 * delta * (n_a * m2_b - n_b * m2_a) / n
+        self.__m2 += m2_b + delta**2 * n_a * n_b / n
+        self.__mean += delta * n_b / n
+        self.__n = n
+
+        if kind == "float":
+            self.__float_sums.append(values.sum())
+        else:
+            self.__int_sum += int(ps.sum())
+
+        # first occurrences are kept
+        i_max = values.argmax()
+        if not values[i_max] <= self.v_max:
+            self.v_max = ps.iloc[i_max]
+            self.pos_max = ps.index[i_max]
+        i_min = values.argmin()
+        if not values[i_min] >= self.v_min:
+            self.v_min = ps.iloc[i_min]
+            self.pos_min = ps.index[i_min]
+
+    def add_counts(self, ps):
+        counts = ps.value_counts(sort=False)
+        if self.__counts is not None:
+            if len(self.__counts) > 0:
+                counts = pd.concat([self.__counts, counts]).groupby(level=0, sort=False).sum()
+            if len(counts) <= self.__exact_limit:
+                self.__counts = counts
+                return
+            print("#warn:csv_status:{}:number of unique values exceeds {}, sketches are used".format(self.name, self.__exact_limit),
+                  file=sys.stderr)
+            self.__counts = None
+            self.__frequents = MisraGries()
+            self.__uniques = HyperLogLog()
+            if self.kind in NUMERIC_KINDS:
+                self.__quantiles = KLLSketch()
+                self.__num_uniques = HyperLogLog()
+        self.__frequents.update_counts(counts)
+        self.__uniques.update(counts.index)
+        if self.__quantiles is not None:
+            num_counts = typed_counts(counts, "float", np.dtype(np.float64))
+            self.__quantiles.update(num_counts.index.to_numpy(dtype=np.float64), num_counts.to_numpy())
+            self.__num_uniques.update(num_counts.index)
+
+    def sum(self):
+        if self.kind == "float":
+            return self.__int_sum + math.fsum(self.__float_sums)
+        if self.dtype() == np.float64:
+            return float(self.__int_sum)
+        return self.__int_sum
+
+    def mean(self):
+        if self.__n == 0:
+            return np.nan
+        return self.sum() / self.__n
+
+    def std(self):
+        if self.__n < 2:
+            return np.nan
+        return math.sqrt(self.__m2 / (self.__n - 1))
+
+    def skew(self):
+        """unbiased skew, as pandas.Series.skew"""
+        n = self.__n
+        if n < 3:
+            return np.nan
+        if self.__m2 == 0:
+            return 0.0
+        return (n * (n - 1)**0.5 / (n - 2)) * (self.__m3 / self.__m2**1.5)
+
+    def kurt(self):
+        """unbiased kurtosis, as pandas.Series.kurt"""
+        n = self.__n
+        if n < 4:
+            return np.nan
+        if self.__m2 == 0:
+            return 0.0
+        adj = 3 * (n - 1)**2 / ((n - 2) * (n - 3))
+        return n * (n + 1) * (n - 1) * self.__m4 / ((n - 2) * (n - 3) * self.__m2**2) - adj
+
+    def sorted_counts(self):
+        values = self.__counts.index.to_numpy(dtype=np.float64)
+        idx = np.argsort(values, kind="stable")
+        return values[idx], self.__counts.to_numpy()[idx]
+
+    def quantile(self, q):
+        if self.__n == 0:
+            return np.nan
+        if self.__counts is None:
+            return self.__quantiles.quantile(q)
+        values, weights = self.sorted_counts()
+        return quantile_from_sorted(values, weights, self.__n, q)
+
+    def median(self):
+        if self.__n == 0:
+            return np.nan
+        if self.__counts is None:
+            return self.__quantiles.median()
+        values, weights = self.sorted_counts()
+        return median_from_sorted(values, weights, self.__n)
+
+    def value_counts(self):
+        """counts of values in descending order, as pandas.Series.value_counts
+
+        :returns: counts, those are estimated by MisraGries over the limit of exact counts
+        :rtype: pandas.Series
+
+        """
+        if self.__counts is None:
+            return self.__frequents.top()
+        return self.__counts.sort_values(ascending=False)
+
+    def nunique(self):
+        if self.__counts is None:
+            return self.__uniques.count()
+        return len(self.__counts)
+
+    def mode(self):
+        """values that have the most count, as pandas.Series.mode
+
+        :returns: list of values, None if there is no frequent value in sketch
+        :rtype: list
+
+        """
+        counts = self.__counts if self.__counts is not None else self.__frequents.counts
+        if self.__counts is None and len(counts) == 0:
+            return None
+        if len(counts) == 0:
+            return []
+        values = sorted(counts.index[counts == counts.max()])
+        if self.dtype() == np.int64:
+            return [int(v) for v in values]
+        if self.dtype() == np.float64:
+            return [float(v) for v in values]
+        return values
+
+    def describe(self):
+        """statistics as pandas.Series.describe
+
+        :returns: series of statistics
+        :rtype: pandas.Series
+
+        """
+        if self.kind in ["bool", "object"]:
+            objcounts = self.value_counts()
+            if len(objcounts) > 0:
+                top, freq = objcounts.index[0], objcounts.iloc[0]
+                dtype = None
+            else:
+                top, freq = np.nan, np.nan
+                dtype = "object"
+            result = [self.n_values, self.nunique(), top, freq]
+            return pd.Series(result, index=["count", "unique", "top", "freq"], name=self.name, dtype=dtype)
+
+        d = [self.__n, self.mean(), self.std(), self.v_min] + [self.quantile(q) for q in [0.25, 0.5, 0.75]] + [self.v_max]
+        return pd.Series(d, index=["count", "mean", "std", "min", "25%", "50%", "75%", "max"], name=self.name, dtype=float)
+
+
+def accumulate_statistics(csv_reader, check_duplicated=True, n_jobs=1):
+    """accumulate statistics of each column chunk by chunk
+
+    :param csv_reader: reader of 'pd.read_csv(chunksize=..., dtype=str)'
+    :param check_duplicated: if True, number of duplicated rows is counted
+    :param n_jobs: number of threads to update statistics of columns
+    :returns: number of rows, number of duplicated rows, dict of ColumnStatistics
+    :rtype: tuple(int, int, dict)
+    :remark:
+       duplicated rows are counted by StreamingDeduplicator of csv_uty, with strings of values.
+
+    """
+    n_rows = 0
+    c_stats = {}
+    dup_filter = StreamingDeduplicator(["all"]) if check_duplicated else None
+    for df in csv_reader:
+        n_rows += len(df)
+        for cn in df.columns:
+            if cn not in c_stats:
+                c_stats[cn] = ColumnStatistics(cn)
+        map_columns(lambda cn: c_stats[cn].update(df[cn]), list(df.columns), n_jobs)
+        if dup_filter is not None:
+            dup_filter.filter(df)
+
+    for cs in c_stats.values():
+        cs.finish()
+    n_dup = 0
+    if dup_filter is not None:
+        for _ in dup_filter.flush():
+            pass
+        n_dup = dup_filter.n_dropped
+
+    return n_rows, n_dup, c_stats
+
+
+def column_statistics(cs, file=None):
+    """print statistics about ColumnStatistics, same as 'series_statistics'
+
+    :param cs: ColumnStatistics
+    :param file: output, if None, sys.stdout is used
+
+    """
+    if cs.dtype() == object:
+        print(cs.describe(), file=file)
+        print("-- unique values:", file=file)
+        vcs = list(cs.value_counts().items())
+        if not cs.is_exact:
+            print("#Warning:csv_status:too many uniqe values:{}, only frequent values are printed".format(cs.nunique()), file=sys.stderr)
+            print("\n".join([str(v) for v in vcs[:10]]), file=file)
+            print(":\n:", file=file)
+        elif len(vcs) > 10:
+            print("#Warning:csv_status:too many uniqe values:{}".format(cs.nunique()), file=sys.stderr)
+            max_print = 10
+            print("\n".join([str(v) for v in vcs[:max_print]]), file=file)
+            if len(vcs) - max_print > max_print:
+                print(":\n:", file=file)
+                print("\n".join([str(v) for v in vcs[-max_print:]]), file=file)
+            else:
+                print(vcs[max_print:], file=file)
+        else:
+            print("\n".join([str(v) for v in vcs]), file=file)
+
+    else:
+        print(cs.describe(), file=file)
+        v_mode = cs.mode()
+        print("maximum value: pos={}, value={}".format(cs.pos_max, cs.v_max), file=file)
+        print("minimum value: pos={}, value={}".format(cs.pos_min, cs.v_min), file=file)
+        print("summarize    : value={}".format(cs.sum()), file=file)
+        print("median       : value={}".format(cs.median()), file=file)
+        if v_mode is None or len(v_mode) > 10:
+            print("mode         : too many", file=file)
+        else:
+            print("mode         : value={}".format(v_mode), file=file)
+
+    print("NA count     : {}".format(cs.n_na), file=file)
+    print("", file=file)
+
+
+def entire_status_chunks(csv_reader, output, col_list, n_jobs=1):
+    """print status of csv file, that is read chunk by chunk, same as 'entire_status'
+
+    :param csv_reader: reader of 'pd.read_csv(chunksize=..., dtype=str)'
+    :param output: output
+    :param col_list: list of columns to print, if empty, status of entire data is printed
+    :param n_jobs: number of threads
+
+    """
+    n_rows, n_dup, c_stats = accumulate_statistics(csv_reader, check_duplicated=len(col_list) == 0, n_jobs=n_jobs)
+    if len(c_stats) == 0:
+        print("??error:csv_status:no data in {}".format(csv_file), file=sys.stderr)
+        sys.exit(1)
+
+    if len(col_list) > 0:
+        for cn in col_list:
+            cs = c_stats[cn]
+            print("== information for columns:{} of {}".format(cn, csv_file), file=output)
+            print("dtype   {}".format(cs.dtype()), file=output)
+            column_statistics(cs)
+
+    else:
+        cnames = list(c_stats.keys())
+        pd.set_option('display.max_rows', 500)
+        pd.set_option('display.max_columns', 500)
+        pd.set_option('display.width', 1000)
+        print("==== csv file: {}".format(csv_file), file=output)
+        print("-- number of rows   : {}".format(n_rows), file=output)
+        print("-- number of columsn: {}".format(len(cnames)), file=output)
+        print("-- duplicated rows  : {}".format(n_dup), file=output)
+        print("-- statistical information for each column", file=output)
+        print(describe_frame(map_columns(lambda cn: c_stats[cn].describe(), cnames, n_jobs), cnames), file=output)
+        print("-- NA count", file=output)
+        print(pd.Series([cs.n_na for cs in c_stats.values()], index=cnames, dtype=np.int64), file=output)
+
+
+def approx_columns(df, mode, group_col):
+    """columns for mode with '--approx', as ones of 'status_by_mode'
+
+    :param df: dataframe, the first chunk
+    :param mode: one of APPROX_MODES
+    :param group_col: name of group column or None
+    :returns: list of names of columns and flag that only numerical columns are available
+    :rtype: tuple(list, bool)
+    :remark:
+       kind of column is not decided by the first chunk, numerical columns are selected by kinds of values in all chunks.
+
+    """
+    if mode == "mode" and group_col is not None:
+        return list(df.columns), False
+    columns = [cn for cn in df.columns if cn != group_col]
+    return columns, mode != "nunique"
+
+
+def status_by_mode_approx(csv_reader, output, mode, group_col):
+    """result of mode by sketches, chunk by chunk
+
+    :param csv_reader: reader of 'pd.read_csv(chunksize=..., dtype=str)' or list of dataframe
+    :param output: output
+    :param mode: one of APPROX_MODES
+    :param group_col: name of group column or None
+    :remark:
+       for each column and group, KLLSketch, GroupedHyperLogLog or MisraGries is updated by each chunk.
+       format of result is same as one of 'status_by_mode'.
+       strings are given to sketches as they are, and kind of column is decided by all values, as 'ColumnStatistics'.
+       groups are also strings, and those are converted by kind of group column at last.
+       when only numerical columns are available, a column is excluded at the chunk that makes it not numerical,
+       like strings or bool and number, because it is not numerical when entire data is read.
+       for 'nunique', numbers are also hashed as values, and those are used when the column is numerical.
+
+    """
+    columns = None
+    groups = pd.Index([])
+    sketches = {}
+    num_sketches = {}
+    kinds = {}
+    has_na = {}
+    g_kind = None
+    g_has_na = False
+    for df in csv_reader:
+        if columns is None:
+            columns, numeric_only = approx_columns(df, mode, group_col)
+            sketches = {cn: GroupedHyperLogLog() if mode == "nunique" else {} for cn in columns}
+            if mode == "nunique":
+                num_sketches = {cn: GroupedHyperLogLog() for cn in columns}
+            kinds = dict.fromkeys(columns)
+            has_na = dict.fromkeys(columns, False)
+        for cn in columns:
+            has_na[cn] = has_na[cn] or bool(df[cn].isnull().any())
+        if group_col is not None:
+            g_mask = df[group_col].notna()
+            g_has_na = g_has_na or not g_mask.all()
+            df = df[g_mask]
+            if len(df) > 0:
+                g_kind = merge_kind(g_kind, value_kind(df[group_col]))
+            groups = groups.append(pd.Index(df[group_col].unique()).difference(groups, sort=False))
+            g_indices = df.groupby(group_col, sort=False).indices
+            g_values = df[group_col]
+        else:
+            # all rows are in one group
+            g_indices = {0: np.arange(len(df))}
+            g_values = np.zeros(len(df), dtype=np.int64)
+
+        for cn in list(columns):
+            ps = df[cn]
+            na_mask = ps.isnull().to_numpy()
+            kind = None
+            if not na_mask.all():
+                kind = value_kind(ps[~na_mask])
+                c_kind = kinds[cn]
+                kinds[cn] = merge_kind(c_kind, kind)
+                if numeric_only and kinds[cn] == "object":
+                    if c_kind is not None:
+                        print("#warn:csv_status:{}:not numerical values were found, column is excluded".format(cn), file=sys.stderr)
+                    columns.remove(cn)
+                    del sketches[cn]
+                    continue
+            if mode == "nunique":
+                sketches[cn].update(g_values, ps)
+                if kinds[cn] == "object":
+                    num_sketches.pop(cn, None)
+                elif kind is not None:
+                    num_sketches[cn].update(np.asarray(g_values)[~na_mask], cast_values(ps[~na_mask], kind))
+                continue
+            if mode in APPROX_QUANTILES:
+                values = np.full(len(ps), np.nan)
+                if kind is not None:
+                    values[~na_mask] = cast_values(ps[~na_mask], kind).to_numpy(dtype=np.float64)
+            else:
+                values = ps.to_numpy()
+            for key, idx in g_indices.items():
+                if key not in sketches[cn]:
+                    sketches[cn][key] = MisraGries() if mode == "mode" else KLLSketch()
+                sketches[cn][key].update(values[idx])
+
+    if columns is None:
+        print("??error:csv_status:no data", file=sys.stderr)
+        sys.exit(1)
+    if numeric_only:
+        # bool column with NA is read as object
+        columns = [cn for cn in columns if kind_dtype(kinds[cn], has_na[cn]) != object]
+    if group_col is None:
+        groups = pd.Index([0])
+    else:
+        # groups are converted as values of group column
+        g_map = dict(zip(groups, typed_values(groups, g_kind, kind_dtype(g_kind, g_has_na))))
+        groups = pd.Index(list(g_map.values())).unique()
+        sketches = {cn: map_group_sketches(sk, g_map) for cn, sk in sketches.items()}
+        num_sketches = {cn: map_group_sketches(sk, g_map) for cn, sk in num_sketches.items()}
+    groups = groups.sort_values()
+
+    if mode == "nunique":
+        r_df = pd.DataFrame({cn: num_sketches.get(cn, sketches[cn]).count().reindex(groups, fill_value=0)
+                             for cn in columns},
+                            index=groups)
+    elif mode in APPROX_QUANTILES:
+        q = APPROX_QUANTILES[mode]
+        r_df = pd.DataFrame(
+            {
+                cn: [(sk.median() if mode == "median" else sk.quantile(q)) if sk is not None else np.nan
+                     for sk in [sketches[cn].get(key) for key in groups]]
+                for cn in columns
+            },
+            index=groups)
+    else:
+        modes = {}
+        for key in groups:
+            modes[key] = {}
+            for cn in columns:
+                counts = sketches[cn][key].counts if key in sketches[cn] else pd.Series(dtype=np.int64)
+                counts = typed_counts(counts, kinds[cn], kind_dtype(kinds[cn], has_na[cn]))
+                try:
+                    values = sorted(counts.index[counts == counts.max()])
+                except TypeError:
+                    values = list(counts.index[counts == counts.max()])
+                modes[key][cn] = pd.Series(values, dtype=counts.index.dtype)
+        if group_col is None:
+            r_df = pd.DataFrame(modes[0])
+            r_df.index.name = "column"
+            r_df.to_csv(output)
+            return
+        r_df = pd.concat([pd.DataFrame(modes[key]) for key in groups], keys=groups, names=[group_col, None])
+        r_df.to_csv(output)
+        return
+
+    if group_col is None:
+        r_df = r_df.iloc[0]
+        r_df.index.name = "column"
+        r_df.name = mode
+    else:
+        r_df.index.name = group_col
+    r_df.to_csv(output)
+
+
+def status_by_modes(df, output, modes, group_col, opt_args, modes_format="wide"):
+    """evaluate several modes by one groupby
+
+    :param df: dataframe
+    :param output: output
+    :param modes: list of modes in FUSED_MODES
+    :param group_col: name of group column or None
+    :param opt_args: arguments for morethan and lessthan
+    :param modes_format: 'wide' or 'long'
+    :remark:
+       counters are evaluated as boolean columns, and those are added to dataframe before groupby,
+       so all of modes are evaluated from one grouping.
+
+    """
+    columns = [cn for cn in df.columns if cn != group_col]
+    num_columns = [cn for cn in columns if pd.api.types.is_numeric_dtype(df[cn])]
+
+    counters = [m for m in modes if m in COUNTER_MODES]
+    # as select_dtypes of 'status_by_mode', bool columns are not counted
+    cnt_columns = [cn for cn in num_columns if not pd.api.types.is_bool_dtype(df[cn])]
+    if ("morethan" in counters or "lessthan" in counters) and len(opt_args) == 0:
+        print("??error:csv_status:for morethan and lessthan, '--arguments' is required.", file=sys.stderr)
+        sys.exit(1)
+    w_df = df[columns + ([group_col] if group_col is not None else [])]
+    counter_columns = {}
+    if len(counters) > 0:
+        num_df = df[cnt_columns]
+        b_frames = []
+        for m in counters:
+            if m == "notzero":
+                b_df = num_df.notna() & (num_df != 0)
+            elif m == "zero":
+                b_df = num_df == 0
+            elif m == "morethan":
+                b_df = num_df > float(opt_args[0])
+            elif m == "lessthan":
+                b_df = num_df < float(opt_args[0])
+            elif m == "positive":
+                b_df = num_df > 0
+            else:
+                b_df = num_df < 0
+            b_df.columns = ["{}\t{}".format(cn, m) for cn in cnt_columns]
+            counter_columns[m] = list(b_df.columns)
+            b_frames.append(b_df)
+        w_df = pd.concat([w_df] + b_frames, axis=1)
+
+    if group_col is not None:
+        w_df = w_df.groupby(group_col)
+
+    aggregated = {}
+
+    def aggregate(name, func, cols):
+        # min and max are shared with vrange
+        if name not in aggregated:
+            aggregated[name] = getattr(w_df[cols], func)()
+        return aggregated[name]
+
+    results = {}
+    for m in modes:
+        if m in ["count", "nunique"]:
+            r_df = aggregate(m, m, columns)
+        elif m in ["sum", "std", "min", "max", "median", "sem", "skew", "var"]:
+            r_df = aggregate(m, m, num_columns)
+        elif m == "avg":
+            r_df = aggregate(m, "mean", num_columns)
+        elif m in ["quantile25", "quantile50", "quantile75"]:
+            if group_col is None:
+                # quantile of DataFrame is not available for bool
+                q_df = w_df[num_columns]
+                r_df = q_df.astype({cn: np.float64 for cn, dt in q_df.dtypes.items() if pd.api.types.is_bool_dtype(dt)})
+                r_df = r_df.quantile(q=APPROX_QUANTILES[m])
+            else:
+                r_df = w_df[num_columns].quantile(q=APPROX_QUANTILES[m])
+        elif m == "vrange":
+            r_max = aggregate("max", "max", num_columns)
+            r_min = aggregate("min", "min", num_columns)
+            if group_col is None:
+                r_df = r_max.astype(np.float64) - r_min.astype(np.float64)
+            else:
+                b_cols = {cn: np.int64 for cn, dt in r_max.dtypes.items() if pd.api.types.is_bool_dtype(dt)}
+                r_df = r_max.astype(b_cols) - r_min.astype(b_cols)
+        elif m in counters:
+            r_df = w_df[counter_columns[m]].sum()
+            if group_col is None:
+                r_df.index = cnt_columns
+            else:
+                r_df.columns = cnt_columns
+        else:
+            print("??erro:csv_status:invalid mode for '--modes':{}".format(m), file=sys.stderr)
+            sys.exit(1)
+        # integers are kept with NA for columns, those are out of the mode
+        if isinstance(r_df, pd.Series):
+            if pd.api.types.is_integer_dtype(r_df):
+                r_df = r_df.astype("Int64")
+        else:
+            r_df = r_df.astype({cn: "Int64" for cn, dt in r_df.dtypes.items() if pd.api.types.is_integer_dtype(dt)})
+        results[m] = r_df
+
+    if group_col is None:
+        r_df = pd.DataFrame(results).reindex(columns).dropna(how="all")
+        r_df.index.name = "column"
+        if modes_format == "long":
+            r_df = r_df.astype(object).stack()
+            r_df.index.names = ["column", "mode"]
+            r_df.name = "value"
+    else:
+        r_df = pd.concat(results, axis=1, names=["mode", "column"])
+        r_df = r_df.reorder_levels(["column", "mode"], axis=1)
+        r_df = r_df[[(cn, m) for cn in columns for m in modes if (cn, m) in r_df.columns]]
+        if modes_format == "long":
+            r_df = r_df.astype(object).stack(["column", "mode"])
+            c_pos = {cn: i for i, cn in enumerate(columns)}
+            m_pos = {m: i for i, m in enumerate(modes)}
+            r_df = r_df.sort_index(level=[group_col, "column", "mode"],
+                                   key=lambda idx: idx.map(c_pos) if idx.name == "column" else idx.map(m_pos) if idx.name == "mode" else idx,
+                                   sort_remaining=False)
+            r_df.name = "value"
+        else:
+            r_df.columns = ["{}_{}".format(cn, m) for cn, m in r_df.columns]
+    r_df.to_csv(output)
+
+
 def status_by_mode(df, output, mode, group_col, opt_args):
 
     if group_col is not None:
@@ -326,10 +1263,41 @@ if __name__ == "__main__":
     if opt_args_s is not None:
         opt_args = re.split(r"(?<!\\)\s*,\s*", opt_args_s)
 
-    csv_df = pd.read_csv(csv_file)
+    approx_mode = args.APPROX
+    modes = None
+    if args.MODES is not None:
+        modes = re.split(r"\s*,\s*", args.MODES)
+        invalid_modes = [m for m in modes if m not in FUSED_MODES]
+        if len(invalid_modes) > 0:
+            print("??error:csv_status:invalid modes for '--modes':{}, available modes:{}".format(invalid_modes, ", ".join(FUSED_MODES)),
+                  file=sys.stderr)
+            sys.exit(1)
+        if mode is not None or approx_mode or args.CHUNKSIZE is not None:
+            print("??error:csv_status:'--modes' is not available with '--mode', '--approx' and '--chunksize'", file=sys.stderr)
+            sys.exit(1)
+    n_jobs = args.JOBS
+    if n_jobs <= 0:
+        print("??error:csv_status:'--jobs' must be positive integer:{}".format(n_jobs), file=sys.stderr)
+        sys.exit(1)
+    if approx_mode and mode not in APPROX_MODES:
+        print("??error:csv_status:'--approx' is available only for modes: {}".format(", ".join(APPROX_MODES)), file=sys.stderr)
+        sys.exit(1)
 
-    if col_list_a is not None:
+    chunksize = args.CHUNKSIZE
+    if chunksize is not None:
+        if chunksize <= 0:
+            print("??error:csv_status:'--chunksize' must be positive integer:{}".format(chunksize), file=sys.stderr)
+            sys.exit(1)
+        if mode is not None and not approx_mode:
+            print("??error:csv_status:'--chunksize' is not available with '--mode' without '--approx'", file=sys.stderr)
+            sys.exit(1)
+        header_columns = read_csv_header(csv_file)
+        cnames = header_columns
+    else:
+        csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
         cnames = csv_df.columns
+
+    if col_list_a is not None:
         col_list = re.split(r"\s*,\s*", col_list_a)
         if any([re.match(r'^\d+$', v) is not None and int(v) <= 0 for v in col_list]):
             print("??Error:csv_status:column index must be positive integer", file=sys.stderr)
@@ -341,15 +1309,36 @@ if __name__ == "__main__":
     else:
         col_list = []
 
-    rest_cols = set(col_list) - set(csv_df.columns)
+    rest_cols = set(col_list) - set(cnames)
     if len(rest_cols) > 0:
         print("??error:csv_status:invalid columns:{}".format(rest_cols), file=sys.stderr)
         sys.exit(1)
 
-    if mode is None:
-        entire_status(csv_df, output_file, col_list)
+    if chunksize is not None:
+        print("%Inf:csv_status:streaming mode:chunksize={}".format(chunksize), file=sys.stderr)
+        read_opts = {"usecols": col_list if len(col_list) > 0 else None}
+        if csv_file == sys.stdin:
+            read_opts.update({"header": None, "names": header_columns})
+        # kind of each column is decided by all values, see ColumnStatistics
+        read_opts["dtype"] = str
+        csv_reader = read_csv(csv_file, reader=args.READER, cache=args.CACHE, chunksize=chunksize, **read_opts)
+        if mode is None:
+            entire_status_chunks(csv_reader, output_file, col_list, n_jobs=n_jobs)
+        else:
+            print("%inf:csv_status:mode={},group={},approx".format(mode, group_column), file=sys.stderr)
+            status_by_mode_approx(csv_reader, output_file, mode, group_column)
+    elif modes is not None:
+        print("%inf:csv_status:modes={},group={}".format(modes, group_column), file=sys.stderr)
+        if len(col_list) > 0:
+            csv_df = csv_df[col_list]
+        status_by_modes(csv_df, output_file, modes, group_column, opt_args, modes_format=args.MODES_FORMAT)
+    elif mode is None:
+        entire_status(csv_df, output_file, col_list, n_jobs=n_jobs)
     else:
         print("%inf:csv_status:mode={},group={}".format(mode, group_column), file=sys.stderr)
         if len(col_list) > 0:
             csv_df = csv_df[col_list]
-        status_by_mode(csv_df, output_file, mode, group_column, opt_args)
+        if approx_mode:
+            status_by_mode_approx([csv_df], output_file, mode, group_column)
+        else:
+            status_by_mode(csv_df, output_file, mode, group_column, opt_args)
@@ -16,15 +16,21 @@
 import argparse
 import textwrap
 import sys
+import io
+import json
+from pathlib import Path
 
 from datetime import timedelta
 from datetime import datetime as dtt
-from dateutil.relativedelta import relativedelta
+from datetime import time as dtime
 
 import re
 import numpy as np
 import pandas as pd
 
+sys.path.insert(0, format(Path(__file__).parent))
+from csv_reader import add_reader_argument, read_csv
+
 VERSION = 1.0
 
 RESAMPLE_METHOD_INTERPOLATE = [
@@ -34,6 +40,27 @@ RESAMPLE_METHOD_INTERPOLATE = [
 
 RESAMPLE_METHOD = ["nearest", "count", "sum", "min", "max", "mean", "std"] + RESAMPLE_METHOD_INTERPOLATE
 
+DATETIME_FORMAT_CANDIDATES = [
+    "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%d %H:%M", "%Y-%m-%d",
+    "%Y/%m/%d %H:%M:%S", "%Y/%m/%d %H:%M:%S.%f", "%Y/%m/%d %H:%M", "%Y/%m/%d"
+]
+DATETIME_INFER_SAMPLE = 1000
+
+# same as ones of pandas.DatetimeIndex.indexer_between_time
+TIME_OF_DAY_FORMATS = ["%H:%M", "%H%M", "%I:%M%p", "%I%M%p", "%H:%M:%S", "%H%M%S", "%I:%M:%S%p", "%I%M%S%p"]
+
+TIME_INDEX_VERSION = 1
+TIME_INDEX_STEP = 10000
+TIME_INDEX_READ_SIZE = 64 * 1024 * 1024  # bytes
+LAST_ROW_READ_SIZE = 64 * 1024  # bytes
+
+# operations of recipe, those are same as options
+RECIPE_OPERATIONS = [
+    "sort_datetime", "timestamp", "add_time_column", "reformat", "calculate_elapsed_time", "gap", "time_gap", "calculate_time_diff",
+    "change_timefreq", "decompose_datetime", "resample_function", "resample", "select_datetime", "select_hours"
+]
+RECIPE_LIST_OPERATIONS = ["timestamp", "calculate_elapsed_time", "gap", "time_gap", "calculate_time_diff", "change_timefreq"]
+
 
 def init():
     arg_parser = argparse.ArgumentParser(description="triming columns that have time data",
@@ -44,6 +71,9 @@ remark:
   # Time series analysis with pandas https://ourcodingclub.github.io/tutorials/pandas-time-series/
 
   When '--get_range_of_time' was given, only range of time is printed to stdout without other processings.
+  Only the column is read for '--get_range_of_time'. With '--chunksize', minimum and maximum are evaluated chunk by chunk.
+  With '--sorted', only first and last rows of csv file are read, and last row must not have new line in quoted fields.
+  Sort order is not checked, so result is wrong when csv file is not sorted by the column.
   Available 'unit' to print is one of 'H'our, 'M'inuts, 'S'econds. See example.
 
   For '--change_timefreq', available methods are floor, ceil,round. About format string, you may find answer in folowing:
@@ -52,6 +82,8 @@ remark:
   "The frequency level to floor the index to. Must be a fixed frequency like ‘S’ (second) not ‘ME’ (month end). See frequency aliases for a list of possible freq values."
     pandas.Series.dt.floor  pandas 1.2.4 documentation https://pandas.pydata.org/docs/reference/api/pandas.Series.dt.floor.html
   'Time series / date functionality https://pandas.pydata.org/pandas-docs/stable/user_guide/timeseries.html#timeseries-offset-aliases'
+  In addition, 'W'(week, start on monday), 'M'(month) and 'SM'(half month, start on 1st and 15th) are available as frequency.
+  For those, 'ceil' gives start of next period, 'round' gives start of next period when datetime is in latter half of period.
 
   If you make group according to gap in seriesed values or datetime, '--gap' or '--time_gap' are available.
   This group is useful for plotting by 'csv_plot_*', printing status by 'csv_status'.
@@ -59,12 +91,42 @@ remark:
   using '--gap', numeric others than date time data are treated.
   For '--gap' and '--time_gap', given gap should be positive.
 
+  When '--chunksize' was given, input is read and processed in chunks that have given number of rows, and each result is written
+  into output one by one. So size of memory is independent of size of the input.
+  Last value and group id of '--gap' and '--time_gap' are carried over chunks, so groups are same as ones without '--chunksize'.
+  In this streaming mode, only following processings are available:
+    '--get_range_of_time', '--gap', '--time_gap', '--timestamp', '--reformat', '--change_timefreq', '--decompose_datetime',
+    '--select_datetime', '--resample' with fixed frequency and '--resample_func' in nearest, count, sum, min, max, mean, std, linear
+  For '--resample', input must be sorted by datetime, and only statistics of the last period are kept over chunks.
+  Values of period over chunks may be different in last digits from ones without '--chunksize'.
+  In output, datetime is written as '%Y-%m-%d %H:%M:%S' in all chunks, and fraction of second is added only to values that have it.
+  '--reformat' with output format is useful to change it.
+
+  For '--select_datetime' and '--select_hours', when datetime is sorted in ascending order, rows are selected by binary search.
+  With '--time_index', sparse index of datetime to offset in csv file is saved into given file at first run,
+  and at next runs, only rows around the range are read from csv file by the index. Index is remade when csv file was changed.
+  '--time_index' is available only with '--select_datetime' and '--select_hours', for sorted naive datetime in csv file
+  that has no new line in quoted fields.
+
   If you want to use commas and colon in expression of '--change_timefreq' and others, those must be escaped by back-slash. see examples.
+  '--timestamp', '--calculate_time_diff' and '--calculate_elapsed_time' accept several definitions separated by comma.
+  For those, NaT gives empty value. Timestamp of naive datetime is evaluated as local time.
+
+  Each of unique datetime strings in a column is parsed only once by an option.
+  When datetime format may be omitted and was not given, the format is inferred from first values of the column.
 
   processing order:
     sort datetime, convert into timestamp, add time column, reformat, gap, time gap, time diff, change timrefreq, resample, 
     select datetime range, select hours range
 
+  With '--recipe' or '--step', operations are run in given order on data that is read once, and result is written once.
+  Each step is 'OPERATION=DEFINITION', OPERATION is name of option without '--', and DEFINITION is same as one of the option.
+  'resample_function=FUNCTION' changes function for following 'resample' steps.
+  In recipe file, each line has a step, and empty lines and lines starting with '#' are ignored.
+  Steps of '--step' are run after steps in recipe file. Other options of processing are not available with those.
+  Datetime columns that were parsed in a step are shared by following steps.
+  After 'resample' and 'select_hours', datetime column is kept as column, so following steps may refer it.
+
 example:
 
 
@@ -72,6 +134,7 @@ example:
 %inf:csv_uty:get time of range:A:13106.0 mins
   csv_trimtime.py --get_range_of_time='A:M' test_trimtime.csv | sed -E 's/^.*:([0-9.]+) mins/\1/'
 13106.0
+  csv_trimtime.py --get_range_of_time='ABC002:M' --sorted big_sample_headers.csv
 
   csv_trimtime.py --sort_datetime=date a10.csv
 
@@ -104,6 +167,15 @@ A,B,C,GA
   csv_trimtime.py --select_hours="A:10\:00\:00,11\:00\:00" test_trimtime.csv
   csv_trimtime.py --select_hours="A:10\:00\:00,1\:00\:00pm" test_trimtime.csv
   csv_trimtime.py --select_datetime="date:%Y-%m-%d:2007-01-01,2007-12-01" a10.csv
+  csv_trimtime.py --select_datetime="date:%Y-%m-%d:2007-01-01,2007-12-01" --time_index=a10.tidx a10.csv
+
+  cat recipe.txt
+# hourly mean of values in working hours
+select_hours=A:09\:00,18\:00
+resample_function=mean
+resample=A:1H:B,C
+  csv_trimtime.py --recipe=recipe.txt test_trimtime.csv
+  csv_trimtime.py --step="timestamp=TS:A" --step="time_gap=GA=A::61" --step="decompose_datetime=A::hour" test_trimtime.csv
 
   csv_trimtime.py --calculate_time_diff="TD=A:%Y-%m-%d %H\:%M\:%S:1" test_trimtime.csv
 A,B,C,TD
@@ -140,6 +212,11 @@ A,B,C,A_year,A_day_of_week
                             type=str,
                             metavar='COLUMN[:datetime_format]:unit',
                             default=None)
+    arg_parser.add_argument("--sorted",
+                            dest="SORTED",
+                            help="csv file is sorted by datetime, for '--get_range_of_time', only first and last rows are read. " +
+                            "if csv file is not sorted, result is wrong",
+                            action="store_true")
 
     arg_parser.add_argument("--sort_datetime",
                             dest="TSORT",
@@ -153,7 +230,7 @@ A,B,C,A_year,A_day_of_week
                             dest="TSTAMP",
                             help="convert date time column(COLUMN_0) into timestamp(COLUMN_1)",
                             type=str,
-                            metavar='COLUMN_1:COLUMN_0',
+                            metavar='COLUMN_1:COLUMN_0[,COLUMN_1:COLUMN_0...]',
                             default=None)
     arg_parser.add_argument("--add_time_column",
                             dest="TIMECOLUMN",
@@ -191,7 +268,7 @@ A,B,C,A_year,A_day_of_week
         "format is datetime format, default='%%Y-%%m-%%d %%H:%%M:%%S'. 'step' is integer value, default=1." +
         " if you use comma or colon in expression, those must be escaped with back-slash",
         type=str,
-        metavar='COLUMN=definition',
+        metavar='COLUMN=definition[,COLUMN=definition...]',
         default=None)
 
     arg_parser.add_argument(
@@ -203,7 +280,7 @@ A,B,C,A_year,A_day_of_week
         "if 'origin' was omitted, value at first row will be used as origin." +
         " if you use comma or colon in expression, those must be escaped with back-slash",
         type=str,
-        metavar='COLUMN:definition',
+        metavar='COLUMN=definition[,COLUMN=definition...]',
         default=None)
 
     arg_parser.add_argument(
@@ -249,6 +326,26 @@ A,B,C,A_year,A_day_of_week
                             type=str,
                             metavar='COLUMN[:time_format]:start_time,end_time',
                             default=None)
+    arg_parser.add_argument("--time_index",
+                            dest="TINDEX",
+                            help="path of sparse index file of time for '--select_datetime', see remark",
+                            type=str,
+                            metavar='FILE',
+                            default=None)
+
+    arg_parser.add_argument("--recipe",
+                            dest="RECIPE",
+                            help="path of recipe file, that has operations to run in order, see remark",
+                            type=str,
+                            metavar='FILE',
+                            default=None)
+    arg_parser.add_argument("--step",
+                            dest="STEPS",
+                            help="operation to run in order, multiple '--step' are allowed, see remark",
+                            type=str,
+                            action="append",
+                            metavar='OPERATION=DEFINITION',
+                            default=None)
 
     arg_parser.add_argument("--output",
                             dest="OUTPUT",
@@ -256,13 +353,207 @@ A,B,C,A_year,A_day_of_week
                             type=str,
                             metavar='FILE',
                             default=sys.stdout)
+    arg_parser.add_argument("--chunksize",
+                            dest="CHUNKSIZE",
+                            help="number of rows in each chunk for streaming mode, see remark",
+                            type=int,
+                            metavar='INT',
+                            default=None)
 
     arg_parser.add_argument('csv_file', metavar='CSV_FILE', help='files to read, if empty, stdin is used')
 
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
 
+def infer_datetime_format(values, n_sample=DATETIME_INFER_SAMPLE):
+    """infer format of datetime strings from sample
+
+    :param values: array of strings
+    :param n_sample: number of strings in sample
+    :returns: format string or None
+    :rtype: str
+    :remark:
+       only unambiguous formats in DATETIME_FORMAT_CANDIDATES are examined,
+       None is returned if none of them matches all strings in sample.
+
+    """
+    sample = [v for v in values[:n_sample] if isinstance(v, str)]
+    if len(sample) == 0:
+        return None
+    for t_format in DATETIME_FORMAT_CANDIDATES:
+        try:
+            for v in sample:
+                dtt.strptime(v, t_format)
+        except ValueError:
+            continue
+        return t_format
+    return None
+
+
+def parse_datetime(ds, t_format=None, exact_format=True):
+    """parse datetime strings, each of unique strings is parsed only once
+
+    :param ds: series of datetime strings
+    :param t_format: format of datetime
+    :param exact_format: if False and some of strings do not match 't_format', all strings are parsed without format
+    :returns: series of datetime64
+    :rtype: pandas.Series
+    :remark:
+       result is same as 'pd.to_datetime(ds, format=t_format)'.
+
+    """
+    if pd.api.types.is_datetime64_any_dtype(ds) or not (pd.api.types.is_object_dtype(ds) or pd.api.types.is_string_dtype(ds)):
+        return pd.to_datetime(ds, format=t_format)
+
+    codes, uniques = pd.factorize(ds)
+    uniques = np.asarray(uniques, dtype=object)
+    try:
+        parsed = pd.to_datetime(uniques, format=t_format, cache=False)
+    except ValueError:
+        if exact_format or t_format is None:
+            raise
+        parsed = pd.to_datetime(uniques, cache=False)
+    if len(parsed) == 0:
+        parsed = pd.DatetimeIndex([pd.NaT])
+        codes = np.zeros(len(codes), dtype=np.int64)
+    return pd.Series(parsed.take(codes, allow_fill=True, fill_value=pd.NaT), index=ds.index, name=ds.name)
+
+
+def format_datetime(ds, t_format):
+    """format datetime, each of unique datetime is formatted only once
+
+    :param ds: series of datetime64
+    :param t_format: format of datetime
+    :returns: series of strings
+    :rtype: pandas.Series
+    :remark:
+       result is same as 'ds.dt.strftime(t_format)'.
+
+    """
+    codes, uniques = pd.factorize(ds)
+    formatted = np.append(np.asarray(uniques.strftime(t_format), dtype=object), np.nan)
+    # NaT(code=-1) is formatted into NaN
+    return pd.Series(formatted[codes], index=ds.index, name=ds.name)
+
+
+def to_datetime_column(df, column, t_format=None):
+    """datetime of column
+
+    :param df: dataframe
+    :param column: name of column
+    :param t_format: format of datetime, if None, format is inferred from sample of values
+    :returns: series of datetime64
+    :rtype: pandas.Series
+    :remark:
+       column that was already parsed is returned as it is.
+
+    """
+    ds = df[column]
+    if pd.api.types.is_datetime64_any_dtype(ds):
+        return ds
+    i_format = t_format
+    if t_format is None:
+        i_format = infer_datetime_format(ds.array)
+    return parse_datetime(ds, i_format, exact_format=t_format is not None)
+
+
+NS_PER_SECOND = 1000 * 1000 * 1000
+NS_PER_DAY = 24 * 3600 * NS_PER_SECOND
+CALENDAR_FREQS = ["W", "M", "SM"]
+
+
+def wall_nanoseconds(ds):
+    """nano seconds of datetime in wall time, NaT is replaced with 0
+
+    :param ds: series of datetime64
+    :returns: array of int64 and mask of NaT
+    :rtype: tuple(numpy.ndarray, numpy.ndarray)
+
+    """
+    if ds.dt.tz is not None:
+        ds = ds.dt.tz_localize(None)
+    na_mask = ds.isna().to_numpy()
+    ns = ds.to_numpy(dtype="datetime64[ns]").view(np.int64).copy()
+    ns[na_mask] = 0
+    return ns, na_mask
+
+
+def calendar_bucket(ds, t_freq, t_method):
+    """floor, ceil or round datetime by week, month or half month
+
+    :param ds: series of datetime64
+    :param t_freq: 'W'(week, start on monday), 'M'(month) or 'SM'(half month, start on 1st and 15th)
+    :param t_method: 'floor', 'ceil' or 'round'
+    :returns: series of datetime64
+    :rtype: pandas.Series
+    :remark:
+       the computation is done on int64 nano seconds, only time part of hours, minutes and seconds is removed,
+       less than second is kept.
+       'ceil' always returns next start of period, even if datetime is just on the start of period.
+       'round' returns next start, if the datetime is in Saturday or Sunday for 'W', after 15th for 'M',
+       after 7th and 22nd for 'SM'.
+       For 'ceil' and 'round' of 'M', days over days in next month are counted back from start of next month,
+       for example, ceil of Jan. 31 is Jan. 30 in leap year.
+
+    """
+    if ds.dt.tz is not None:
+        wall = ds.dt.tz_localize(None)
+    else:
+        wall = ds
+    ns, na_mask = wall_nanoseconds(wall)
+    days = ns // NS_PER_DAY
+    sub_seconds = ns % NS_PER_SECOND
+
+    if t_freq == "W":
+        weekday = (days + 3) % 7  # 1970-01-01 is thursday
+        t_days = days - weekday
+        if t_method == "ceil":
+            t_days += 7
+        elif t_method == "round":
+            t_days += np.where(weekday > 4, 7, 0)
+    else:
+        # casting of datetime64 from month into day is slow, so table of start days of months is used.
+        month = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        m_min = month.min() if len(month) > 0 else 0
+        m_max = month.max() if len(month) > 0 else 0
+        month_starts = np.arange(m_min, m_max + 3).astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+        m_idx = month - m_min
+        month_days = month_starts[m_idx]
+        day = days - month_days + 1
+        if t_freq == "M":
+            if t_method == "floor":
+                t_idx = m_idx
+            elif t_method == "ceil":
+                t_idx = m_idx + 1
+            else:
+                t_idx = m_idx + (day > 15)
+            t_month_days = month_starts[t_idx]
+            days_in_month = month_starts[t_idx + 1] - t_month_days
+            # as 'relativedelta(months=n)', day is clipped by days in month
+            t_days = t_month_days + np.minimum(day, days_in_month) - day
+        else:
+            next_month_days = month_starts[m_idx + 1]
+            second_half = day >= 15
+            if t_method == "floor":
+                t_days = np.where(second_half, month_days + 14, month_days)
+            elif t_method == "ceil":
+                t_days = np.where(second_half, next_month_days, month_days + 14)
+            else:
+                t_days = np.where(second_half, np.where(day > 22, next_month_days, month_days + 14),
+                                  np.where(day > 7, month_days + 14, month_days))
+
+    t_ns = t_days * NS_PER_DAY + sub_seconds
+    t_ns[na_mask] = np.iinfo(np.int64).min
+    result = pd.Series(t_ns.view("datetime64[ns]"), index=ds.index)
+    if ds.dt.tz is not None:
+        # difference in wall time is applied to original datetime
+        result = ds - (wall - result)
+
+    return result
+
+
 def change_time_frequency(df, ch_definitions):
     """FIXME! briefly describe function
 
@@ -294,40 +585,18 @@ def change_time_frequency(df, ch_definitions):
                 t_format = re.sub(r"\\=", "=", t_format)
             else:
                 t_format = "%Y-%m-%d %H:%M:%S"
-            df[cname] = pd.to_datetime(df[t_col], format=t_format)
-            if t_method == "floor":
-                if t_freq == "W":
-                    df[cname] = df[cname].apply(
-                        lambda x: x - timedelta(days=x.weekday(), hours=x.hour, minutes=x.minute, seconds=x.second)).dt.strftime(
-                            t_format)  # monday
-                elif t_freq == "M":
-                    df[cname] = df[cname].apply(lambda x: x - timedelta(days=x.day - 1) - timedelta(
-                        hours=x.hour, minutes=x.minute, seconds=x.second)).dt.strftime(t_format)
-                else:
-                    df[cname] = df[cname].dt.floor(t_freq).dt.strftime(t_format)
-            elif t_method == "ceil":
-                if t_freq == "W":
-                    df[cname] = df[cname].apply(
-                        lambda x: x - timedelta(days=x.weekday() - 7, hours=x.hour, minutes=x.minute, seconds=x.second)).dt.strftime(
-                            t_format)  # monday
-                elif t_freq == "M":
-                    df[cname] = df[cname].apply(lambda x: x + relativedelta(days=-x.day + 1, months=1) - timedelta(
-                        hours=x.hour, minutes=x.minute, seconds=x.second)).dt.strftime(t_format)
-                else:
-                    df[cname] = df[cname].dt.ceil(t_freq).dt.strftime(t_format)
-            elif t_method == "round":
-                if t_freq == "W":
-                    df[cname] = df[cname].apply(lambda x: x - timedelta(
-                        days=x.weekday() - (7 if x.weekday() > 4 else 0), hours=x.hour, minutes=x.minute, seconds=x.second)).dt.strftime(
-                            t_format)  # monday
-                elif t_freq == "M":
-                    df[cname] = df[cname].apply(lambda x: x + relativedelta(days=-x.day + 1, months=1 if x.day > 15 else 0) - timedelta(
-                        hours=x.hour, minutes=x.minute, seconds=x.second)).dt.strftime(t_format)
-                else:
-                    df[cname] = df[cname].dt.round(t_freq).dt.strftime(t_format)
-            else:
+            df[cname] = to_datetime_column(df, t_col, t_format)
+            if t_method not in ["floor", "ceil", "round"]:
                 print("#warn:csv_trimtime:invalid method for '--change_timefreq':{} in {}".format(t_method, cdf), file=sys.stderr)
                 continue
+            if t_freq in CALENDAR_FREQS:
+                df[cname] = format_datetime(calendar_bucket(df[cname], t_freq, t_method), t_format)
+            elif t_method == "floor":
+                df[cname] = format_datetime(df[cname].dt.floor(t_freq), t_format)
+            elif t_method == "ceil":
+                df[cname] = format_datetime(df[cname].dt.ceil(t_freq), t_format)
+            else:
+                df[cname] = format_datetime(df[cname].dt.round(t_freq), t_format)
             vcs = df[cname].value_counts()
             print("%inf:csv_trimtime:change_timefreq:column={}:number of uniq periods={}:max count in each period={}".format(
                 cname, len(vcs), max(vcs)),
@@ -339,8 +608,85 @@ def change_time_frequency(df, ch_definitions):
     return df
 
 
+DECOMP_PARTS = ["year", "month", "day", "hour", "minute", "second", "week", "day_of_week", "day_of_year", "quarter"]
+DECOMP_DTYPES = {"year": np.int16, "day_of_year": np.int16}  # others are int8
+# days from Jan. 1 to 1st of each month in common year
+CUMULATIVE_MONTH_DAYS = np.array([0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334])
+
+
+def civil_from_days(days):
+    """year, month and day from days since 1970-01-01
+
+    :param days: array of int64
+    :returns: arrays of year, month and day
+    :rtype: tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray)
+    :remark:
+       algorithm of 'chrono-Compatible Low-Level Date Algorithms', by H. Hinnant, in proleptic Gregorian calendar.
+
+    """
+    z = days + 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = np.where(mp < 10, mp + 3, mp - 9)
+    year = yoe + era * 400 + (month <= 2)
+    return year, month, day
+
+
+def day_of_year(year, month, day):
+    """day of year, Jan. 1 is 1
+
+    :param year: array of year
+    :param month: array of month
+    :param day: array of day
+    :returns: array of day of year
+    :rtype: numpy.ndarray
+
+    """
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    return CUMULATIVE_MONTH_DAYS[month - 1] + day + (leap & (month > 2))
+
+
+def decompose_nanoseconds(ns, parts):
+    """calendar fields of datetime in int64 nano seconds, those are evaluated together
+
+    :param ns: array of int64, nano seconds since 1970-01-01 in wall time
+    :param parts: list of names in DECOMP_PARTS
+    :returns: name of part -> array of int64
+    :rtype: dict
+    :remark:
+       'day_of_week' is 0 for monday, 'week' is ISO week number.
+
+    """
+    days = ns // NS_PER_DAY
+    seconds = (ns - days * NS_PER_DAY) // NS_PER_SECOND
+    result = {}
+    if any([v in parts for v in ["year", "month", "day", "day_of_year", "quarter"]]):
+        year, month, day = civil_from_days(days)
+        result["year"] = year
+        result["month"] = month
+        result["day"] = day
+        result["quarter"] = (month - 1) // 3 + 1
+        if "day_of_year" in parts:
+            result["day_of_year"] = day_of_year(year, month, day)
+    result["hour"] = seconds // 3600
+    result["minute"] = seconds // 60 % 60
+    result["second"] = seconds % 60
+    day_of_week = (days + 3) % 7  # 1970-01-01 is thursday
+    result["day_of_week"] = day_of_week
+    if "week" in parts:
+        # ISO week is one that includes its thursday
+        thursday = days - day_of_week + 3
+        th_year, th_month, th_day = civil_from_days(thursday)
+        result["week"] = (day_of_year(th_year, th_month, th_day) - 1) // 7 + 1
+    return {k: result[k] for k in parts}
+
+
 def decomp_datetime(df, decomp_parts):
-    d_parts = ["year", "month", "day", "hour", "minute", "second", "week", "day_of_week", "day_of_year", "quarter"]
+    d_parts = DECOMP_PARTS
     print("%inf:csv_trimtime:decomp_datetime:{}".format(decomp_parts), file=sys.stderr)
     try:
         cvs = re.split(r"\s*(?<!\\):\s*", decomp_parts)
@@ -355,38 +701,26 @@ def decomp_datetime(df, decomp_parts):
             t_format = re.sub(r"\\=", "=", t_format)
         else:
             t_format = "%Y-%m-%d %H:%M:%S"
-        cname_dt = t_col + "_datetime{}".format(dtt.now().timestamp())
-        df[cname_dt] = pd.to_datetime(df[t_col], format=t_format)
+        ns, na_mask = wall_nanoseconds(to_datetime_column(df, t_col, t_format))
         if "all" in t_parts:
             t_parts = d_parts
         r_parts = list(set(t_parts) - set(d_parts))
         if len(r_parts) > 0:
             print(f"#warn:csv_trimtime:decomp_datetime:invalid parts name:{r_parts}", file=sys.stderr)
         t_parts = [v for v in d_parts if v in list(set(t_parts) & set(d_parts))]
-        for d_p in t_parts:
+        has_na = na_mask.any()
+        for d_p, values in decompose_nanoseconds(ns, t_parts).items():
             cname = t_col + f"_{d_p}"
-            if d_p == "year":
-                df[cname] = df[cname_dt].dt.year
-            elif d_p == "month":
-                df[cname] = df[cname_dt].dt.month
-            elif d_p == "day":
-                df[cname] = df[cname_dt].dt.day
-            elif d_p == "hour":
-                df[cname] = df[cname_dt].dt.hour
-            elif d_p == "minute":
-                df[cname] = df[cname_dt].dt.minute
-            elif d_p == "second":
-                df[cname] = df[cname_dt].dt.second
-            elif d_p == "week":
-                df[cname] = df[cname_dt].dt.isocalendar().week
-            elif d_p == "day_of_week":
-                df[cname] = df[cname_dt].dt.day_of_week
-            elif d_p == "day_of_year":
-                df[cname] = df[cname_dt].dt.day_of_year
-            elif d_p == "quarter":
-                df[cname] = df[cname_dt].dt.quarter
-
-        df.drop(columns=cname_dt, inplace=True)
+            values = values.astype(DECOMP_DTYPES.get(d_p, np.int8))
+            if has_na:
+                # as pandas, NaT gives NaN, and <NA> for week
+                if d_p == "week":
+                    values = pd.array(values, dtype="Int8")
+                    values[na_mask] = pd.NA
+                else:
+                    values = values.astype(np.float32)
+                    values[na_mask] = np.nan
+            df[cname] = pd.Series(values, index=df.index)
 
     except ValueError as e:
         print("??error:csv_trimtime:decomp_datetime:{}:{}".format(t_col, e), file=sys.stderr)
@@ -394,11 +728,12 @@ def decomp_datetime(df, decomp_parts):
     return df
 
 
-def groupby_time_gap(df, time_gap_definitions):
+def groupby_time_gap(df, time_gap_definitions, states=None):
     """FIXME! briefly describe function
 
     :param df: 
     :param time_gap_definitions: [new_column_name=old_column:format:gap,...]
+    :param states: dictionary of states of 'groupby_gap' for each definition, in streaming mode
     :returns: 
     :rtype: 
 
@@ -424,9 +759,10 @@ def groupby_time_gap(df, time_gap_definitions):
                 t_format = re.sub(r"\\=", "=", t_format)
             else:
                 t_format = "%Y-%m-%d %H:%M:%S"
-            df[t_col] = pd.to_datetime(df[t_col], format=t_format)
+            df[t_col] = to_datetime_column(df, t_col, t_format)
 
-            df = groupby_gap(df, t_col, cname, timedelta(seconds=t_gap))
+            state = states.setdefault(cdf, {}) if states is not None else None
+            df = groupby_gap(df, t_col, cname, timedelta(seconds=t_gap), state=state)
 
             vcs = df[cname].value_counts()
             print("%inf:csv_trimtime:groupby_time_gap:column={}:number of groups={}:max count in each group={}".format(
@@ -439,11 +775,12 @@ def groupby_time_gap(df, time_gap_definitions):
     return df
 
 
-def groupby_value_gap(df, gap_definitions):
+def groupby_value_gap(df, gap_definitions, states=None):
     """FIXME! briefly describe function
 
     :param df: 
     :param gap_definitions: [new_column_name=old_column:gap,...]
+    :param states: dictionary of states of 'groupby_gap' for each definition, in streaming mode
     :returns: 
     :rtype: 
 
@@ -464,7 +801,8 @@ def groupby_value_gap(df, gap_definitions):
             t_col = cvs[0]
             t_gap = float(cvs[1])
 
-            df = groupby_gap(df, t_col, cname, t_gap)
+            state = states.setdefault(cdf, {}) if states is not None else None
+            df = groupby_gap(df, t_col, cname, t_gap, state=state)
 
             vcs = df[cname].value_counts()
             print("%inf:csv_trimtime:groupby_gap:column={}:number of groups={}:max count in each group={}".format(
@@ -477,98 +815,215 @@ def groupby_value_gap(df, gap_definitions):
     return df
 
 
-def groupby_gap(df, column_name, group_column_name, gap):
-    """FIXME! briefly describe function
+def groupby_gap(df, column_name, group_column_name, gap, state=None):
+    """make group id by gap of values
 
-    :param df: 
-    :param column_name: 
-    :param group_column_name: 
+    :param df: dataframe
+    :param column_name: name of column of values
+    :param group_column_name: name of column of group id
     :param gap: numerica value or datetime.timedelta()
-    :returns: 
-    :rtype: 
+    :param state: dictionary to carry last value and last group id over chunks, in streaming mode
+    :returns: dataframe
+    :rtype: pandas.DataFrame
+    :remark:
+       group id is incremented at each row whose absolute difference from the previous row is greater than 'gap'.
 
     """
+    values = df[column_name]
+    diff = values.diff()
+    if state is not None and len(df) > 0 and "last" in state:
+        diff.iat[0] = values.iat[0] - state["last"]
+    g_mask = (diff.abs() > gap).to_numpy()
+
+    gaps = diff.loc[g_mask]
+    if pd.api.types.is_timedelta64_dtype(gaps):
+        gaps = gaps.dt.total_seconds()
+    print("%inf:csv_trimtime:detected gap values:\n{}".format(list(gaps)), file=sys.stderr)
+
+    g_offset = state.get("group", 0) if state is not None else 0
+    df[group_column_name] = np.cumsum(g_mask, dtype=np.int64) + g_offset
+    if state is not None and len(df) > 0:
+        state["last"] = values.iat[-1]
+        state["group"] = df[group_column_name].iat[-1]
+    return df
 
-    dt_s = pd.Series([False] * len(df), index=df.index, dtype="boolean")
-    dt_s.loc[df[column_name].diff().abs() > gap] = True
 
-    if df[column_name].diff().abs().loc[dt_s].dtype != np.timedelta64:
-        gap_list = list(df[column_name].diff().loc[dt_s].apply(lambda x: x.total_seconds()))
-    else:
-        gap_list = list(df[column_name].diff().loc[dt_s])
-    print("%inf:csv_trimtime:detected gap values:\n{}".format(gap_list), file=sys.stderr)
-
-    g_count = len(dt_s.loc[dt_s])
-    df.loc[dt_s, group_column_name] = list(range(1, g_count + 1))
-    df[group_column_name].iat[0] = 0
-    df[group_column_name].ffill(axis=0, inplace=True)
-    # df[group_column_name].fillna(g_count + 1, inplace=True)
-    df[group_column_name] = df[group_column_name].astype('int64')
-    return df
+EPOCH = dtt(1970, 1, 1)
 
 
-def calculate_time_diff(df, time_diff):
-    cvs = re.split(r"\s*(?<!\\)=\s*", time_diff)
-    cname = cvs[0]
-    if len(cvs) < 2:
-        print("??error:csv_trimtime:calculate_time_diff:invalid format of definition:{}".format(time_diff), file=sys.stderr)
-        sys.exit(1)
-    cvs = re.split(r"\s*(?<!\\):\s*", cvs[1])
-    t_col = cvs[0]
-    if len(cvs) < 2:
-        t_format = ""
-    else:
-        t_format = cvs[1]
-    if len(cvs) < 3:
-        t_step = 1
-    else:
-        t_step = int(cvs[2])
-    if len(t_format) > 0:
-        t_format = re.sub(r"\\:", ":", t_format)
-        t_format = re.sub(r"\\=", "=", t_format)
+def local_utc_offset(seconds):
+    """offset[seconds] from local time into UTC, as 'datetime.timestamp()' does for naive datetime
+
+    :param seconds: int64 array of seconds of local time from 1970-01-01
+    :returns: int64 array of offsets
+    :rtype: numpy.ndarray
+    :remark:
+       offset is evaluated by 'datetime.timestamp()' at start and end of each unique hour,
+       only for hours in those offset is changed, it is evaluated for each unique minute.
+
+    """
+
+    def offset_at(minute):
+        return int((EPOCH + timedelta(minutes=int(minute))).timestamp()) - int(minute) * 60
+
+    minutes = seconds // 60
+    h_codes, h_uniques = pd.factorize(minutes // 60)
+    h_start = np.array([offset_at(h * 60) for h in h_uniques], dtype=np.int64)
+    h_end = np.array([offset_at(h * 60 + 59) for h in h_uniques], dtype=np.int64)
+    offsets = h_start[h_codes]
+    changed = (h_start != h_end)[h_codes]
+    if changed.any():
+        m_codes, m_uniques = pd.factorize(minutes[changed])
+        offsets[changed] = np.array([offset_at(m) for m in m_uniques], dtype=np.int64)[m_codes]
+    return offsets
+
+
+def seconds_and_micros(ns):
+    """split nano seconds into seconds and micro seconds
+
+    :param ns: int64 array of nano seconds
+    :returns: (seconds, micro seconds), nano seconds less than micro second are truncated
+    :rtype: tuple
+
+    """
+    us = ns // 1000
+    return us // 1000000, us % 1000000
+
+
+def evaluate_epoch_seconds(ds):
+    """POSIX timestamp of datetime, same as 'datetime.timestamp()' of each value
+
+    :param ds: series of datetime64, naive or tz-aware
+    :returns: series of float, NaT is NaN
+    :rtype: pandas.Series
+    :remark:
+       naive datetime is treated as local time, as 'datetime.timestamp()' does.
+
+    """
+    na_mask = ds.isna().to_numpy()
+    if ds.dt.tz is not None:
+        ns = ds.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy(dtype="datetime64[ns]").view(np.int64).copy()
+        ns[na_mask] = 0
+        result = (ns // 1000) / 1e6
     else:
-        t_format = "%Y-%m-%d %H:%M:%S"
+        ns = ds.to_numpy(dtype="datetime64[ns]").view(np.int64).copy()
+        ns[na_mask] = 0
+        secs, micros = seconds_and_micros(ns)
+        if len(secs) > 0:
+            secs = secs + local_utc_offset(secs)
+        result = secs.astype(np.float64) + micros / 1e6
+    result[na_mask] = np.nan
+    return pd.Series(result, index=ds.index)
 
-    df[t_col] = pd.to_datetime(df[t_col], format=t_format)
-    df[cname] = df[t_col].diff(t_step).apply(lambda x: x.total_seconds())
 
-    print("%inf:csv_trimtime:calculate_time_diff:min={},max={},mean={}".format(df[cname].min(), df[cname].max(), df[cname].mean()),
-          file=sys.stderr)
+def evaluate_total_seconds(ds):
+    """total seconds of timedelta, same as 'Timedelta.total_seconds()' of each value
+
+    :param ds: series of timedelta64
+    :returns: series of float, NaT is NaN
+    :rtype: pandas.Series
+
+    """
+    na_mask = ds.isna().to_numpy()
+    ns = ds.to_numpy(dtype="timedelta64[ns]").view(np.int64).copy()
+    ns[na_mask] = 0
+    secs, micros = seconds_and_micros(ns)
+    result = secs.astype(np.float64) + micros / 1e6
+    result[na_mask] = np.nan
+    return pd.Series(result, index=ds.index)
+
+
+def calculate_time_diff(df, time_diffs):
+    """difference of datetime in seconds
+
+    :param df: dataframe
+    :param time_diffs: [new_column_name=column[:format[:step]],...]
+    :returns: dataframe
+    :rtype: pandas.DataFrame
+
+    """
+    if isinstance(time_diffs, str):
+        time_diffs = [time_diffs]
+    for time_diff in time_diffs:
+        cvs = re.split(r"\s*(?<!\\)=\s*", time_diff)
+        cname = cvs[0]
+        if len(cvs) < 2:
+            print("??error:csv_trimtime:calculate_time_diff:invalid format of definition:{}".format(time_diff), file=sys.stderr)
+            sys.exit(1)
+        cvs = re.split(r"\s*(?<!\\):\s*", cvs[1])
+        t_col = cvs[0]
+        if len(cvs) < 2:
+            t_format = ""
+        else:
+            t_format = cvs[1]
+        if len(cvs) < 3:
+            t_step = 1
+        else:
+            t_step = int(cvs[2])
+        if len(t_format) > 0:
+            t_format = re.sub(r"\\:", ":", t_format)
+            t_format = re.sub(r"\\=", "=", t_format)
+        else:
+            t_format = "%Y-%m-%d %H:%M:%S"
+
+        df[t_col] = to_datetime_column(df, t_col, t_format)
+        df[cname] = evaluate_total_seconds(df[t_col].diff(t_step))
+
+        print("%inf:csv_trimtime:calculate_time_diff:{}:min={},max={},mean={}".format(cname, df[cname].min(), df[cname].max(),
+                                                                                        df[cname].mean()),
+              file=sys.stderr)
 
     return df
 
 
-def calculate_elapsed_time(df, elapsed_time_def):
-    cvs = re.split(r"\s*(?<!\\)=\s*", elapsed_time_def)
-    cname = cvs[0]
-    if len(cvs) < 2:
-        print("??error:csv_trimtime:calculate_elapsed_time:invalid format of definition:{}".format(elapsed_time_def), file=sys.stderr)
-        sys.exit(1)
-    cvs = re.split(r"\s*(?<!\\):\s*", cvs[1])
-    t_col = cvs[0]
-    if len(cvs) < 2:
-        t_format = ""
-    else:
-        t_format = cvs[1]
-    if len(cvs) < 3:
-        t_org = 0
-    else:
-        t_org = cvs[2]
-        t_org = re.sub(r"\\:", ":", t_org)
-        t_org = dtt.strptime(t_org, "%Y-%m-%d %H:%M:%S")
-    if len(t_format) > 0:
-        t_format = re.sub(r"\\:", ":", t_format)
-        t_format = re.sub(r"\\=", "=", t_format)
-    else:
-        t_format = "%Y-%m-%d %H:%M:%S"
+def calculate_elapsed_time(df, elapsed_time_defs):
+    """elapsed time from origin in seconds
 
-    df[t_col] = pd.to_datetime(df[t_col], format=t_format)
-    if t_org == 0:
-        t_org = df[t_col][0]
-    df[cname] = (df[t_col] - t_org).apply(lambda x: x.total_seconds())
+    :param df: dataframe
+    :param elapsed_time_defs: [new_column_name=column[:format[:origin]],...]
+    :returns: dataframe
+    :rtype: pandas.DataFrame
+    :remark:
+       if origin was omitted, the value at first row is used.
+       for tz-aware column, origin is treated as time in the timezone of the column.
 
-    print("%inf:csv_trimtime:calculate_elapsed_time:min={},max={},mean={}".format(df[cname].min(), df[cname].max(), df[cname].mean()),
-          file=sys.stderr)
+    """
+    if isinstance(elapsed_time_defs, str):
+        elapsed_time_defs = [elapsed_time_defs]
+    for elapsed_time_def in elapsed_time_defs:
+        cvs = re.split(r"\s*(?<!\\)=\s*", elapsed_time_def)
+        cname = cvs[0]
+        if len(cvs) < 2:
+            print("??error:csv_trimtime:calculate_elapsed_time:invalid format of definition:{}".format(elapsed_time_def), file=sys.stderr)
+            sys.exit(1)
+        cvs = re.split(r"\s*(?<!\\):\s*", cvs[1])
+        t_col = cvs[0]
+        if len(cvs) < 2:
+            t_format = ""
+        else:
+            t_format = cvs[1]
+        if len(cvs) < 3:
+            t_org = None
+        else:
+            t_org = cvs[2]
+            t_org = re.sub(r"\\:", ":", t_org)
+            t_org = dtt.strptime(t_org, "%Y-%m-%d %H:%M:%S")
+        if len(t_format) > 0:
+            t_format = re.sub(r"\\:", ":", t_format)
+            t_format = re.sub(r"\\=", "=", t_format)
+        else:
+            t_format = "%Y-%m-%d %H:%M:%S"
+
+        df[t_col] = to_datetime_column(df, t_col, t_format)
+        if t_org is None:
+            t_org = df[t_col].iloc[0] if len(df) > 0 else pd.NaT
+        elif df[t_col].dt.tz is not None:
+            t_org = pd.Timestamp(t_org).tz_localize(df[t_col].dt.tz)
+        df[cname] = evaluate_total_seconds(df[t_col] - t_org)
+
+        print("%inf:csv_trimtime:calculate_elapsed_time:{}:min={},max={},mean={}".format(cname, df[cname].min(), df[cname].max(),
+                                                                                           df[cname].mean()),
+              file=sys.stderr)
 
     return df
 
@@ -581,15 +1036,21 @@ def sort_time_column(df, sort_time_def):
     else:
         t_format = cvs[1]
 
-    df[cname] = pd.to_datetime(df[cname], format=t_format)
+    df[cname] = to_datetime_column(df, cname, t_format)
     df.sort_values(by=cname, inplace=True)
     df.reset_index(inplace=True)
 
     return df
 
 
-def do_rsampling(df, resample_defs, resample_func):
+def parse_resample_definition(resample_defs):
+    """parse definition of resampling
+
+    :param resample_defs: column[:format]:frequency:column_to_resample[,column...]
+    :returns: (column, format, frequency, columns to resample)
+    :rtype: tuple
 
+    """
     cvs = re.split(r"\s*(?<!\\):\s*", resample_defs)
     if len(cvs) > 3:
         t_col = cvs[0]
@@ -607,9 +1068,16 @@ def do_rsampling(df, resample_defs, resample_func):
         sys.exit(1)
     columns = re.split(r"\s*(?<!\\),\s*", columns_s)
 
+    return t_col, t_fmt, t_freq, columns
+
+
+def do_rsampling(df, resample_defs, resample_func):
+
+    t_col, t_fmt, t_freq, columns = parse_resample_definition(resample_defs)
+
     output_df = df[columns + [t_col]]
 
-    output_df[t_col] = pd.to_datetime(df[t_col], format=t_fmt)
+    output_df[t_col] = to_datetime_column(df, t_col, t_fmt)
     output_df.set_index(t_col, inplace=True)
 
     if resample_func == "sum":
@@ -636,6 +1104,312 @@ def do_rsampling(df, resample_defs, resample_func):
     return output_df
 
 
+RESAMPLE_STREAMING_METHOD = ["nearest", "count", "sum", "min", "max", "mean", "std", "linear"]
+RESAMPLE_STREAMING_STATS = {
+    "count": ["count"],
+    "sum": ["count", "sum"],
+    "min": ["count", "min"],
+    "max": ["count", "max"],
+    "mean": ["count", "sum"],
+    "std": ["count", "mean", "m2", "std"]
+}
+
+
+class StreamingResampler():
+    """resampler for chunks of data that is sorted by datetime
+
+    :remark:
+       result is same as 'do_rsampling' for whole data, but only fixed frequency, like 'S', 'min', 'H', 'D', is available.
+       for aggregation functions, only statistics of the last bucket are kept over chunks,
+       statistics of bucket over chunks are merged by running moments.
+       for 'nearest', only the last row is kept.
+       for 'linear', only rows of grid after last valid value of each column are kept.
+       integer columns are kept integer by 'min' and 'max', even if there are empty buckets.
+
+    """
+
+    def __init__(self, t_col, t_fmt, t_freq, columns, resample_func, date_format=None):
+        if resample_func not in RESAMPLE_STREAMING_METHOD:
+            raise ValueError("'{}' is not available in streaming mode, that needs entire data".format(resample_func))
+        freq = pd.tseries.frequencies.to_offset(t_freq)
+        if not isinstance(freq, pd.offsets.Tick):
+            raise ValueError("only fixed frequency is available in streaming mode:{}".format(t_freq))
+        self.t_col = t_col
+        self.t_fmt = t_fmt
+        self.columns = columns
+        self.resample_func = resample_func
+        self.freq_ns = freq.nanos
+        self.date_format = date_format
+
+        self.tz = None
+        self.origin = None
+        self.last_ns = None
+        self.next_k = None
+        self.dtypes = None
+
+        # state of aggregation: statistics of the last bucket
+        self.open_k = None
+        self.open_stats = None
+        # state of 'nearest': the last row
+        self.last_row = None
+        # state of 'linear': rows of grid not yet interpolated, flags that row was found in input,
+        # last valid value and its index of each column
+        self.pending = None
+        self.pending_found = None
+        self.anchors = {}
+
+    def feed(self, df):
+        """resample a chunk
+
+        :param df: chunk of dataframe
+        :returns: resampled dataframe of buckets that were completed, or None
+        :rtype: pandas.DataFrame
+
+        """
+        ds = to_datetime_column(df, self.t_col, self.t_fmt)
+        valid = ds.notna().to_numpy()
+        ds = ds.loc[valid]
+        values = df.loc[valid, self.columns]
+        if len(ds) == 0:
+            return None
+
+        if self.origin is None:
+            # as origin='start_day' of 'resample'
+            self.tz = ds.dt.tz
+            self.origin = ds.iloc[0].normalize().value
+            self.dtypes = values.dtypes
+            for c in self.columns:
+                if not pd.api.types.is_numeric_dtype(values[c]):
+                    raise ValueError("'{}' is not numeric column".format(c))
+        if self.tz is not None:
+            ds = ds.dt.tz_convert("UTC").dt.tz_localize(None)
+        ns = ds.to_numpy(dtype="datetime64[ns]").view(np.int64)
+        if np.any(ns[1:] < ns[:-1]) or (self.last_ns is not None and ns[0] < self.last_ns):
+            raise ValueError("'{}' is not sorted".format(self.t_col))
+        self.last_ns = ns[-1]
+
+        k = (ns - self.origin) // self.freq_ns
+        if self.next_k is None:
+            self.next_k = k[0]
+
+        if self.resample_func == "nearest":
+            return self.resample_nearest(values, ns, k[-1])
+        elif self.resample_func == "linear":
+            return self.resample_linear(values, ns, k[-1])
+        return self.aggregate(values, k)
+
+    def flush(self):
+        """resample remained data at end of stream
+
+        :returns: resampled dataframe, or None
+        :rtype: pandas.DataFrame
+
+        """
+        if self.resample_func == "linear":
+            if self.pending is None or len(self.pending) == 0:
+                return None
+            out_df = self.interpolate_pending(final=True)
+            return self.make_output(out_df)
+        elif self.resample_func in RESAMPLE_STREAMING_STATS:
+            if self.open_k is None:
+                return None
+            out_df = self.make_aggregation(self.open_stats, self.open_k, self.open_k + 1)
+            self.open_k = None
+            return out_df
+        return None
+
+    def bucket_stats(self, values, k):
+        """statistics of each bucket
+
+        :param values: dataframe of columns to resample
+        :param k: indexes of buckets
+        :returns: dictionary of statistics, each of them is dataframe that has index of buckets
+        :rtype: dict
+
+        """
+        gr = values.groupby(k)
+        stats = {}
+        for st in RESAMPLE_STREAMING_STATS[self.resample_func]:
+            if st == "count":
+                stats[st] = gr.count()
+            elif st == "sum":
+                stats[st] = gr.sum()
+            elif st == "min":
+                stats[st] = gr.min()
+            elif st == "max":
+                stats[st] = gr.max()
+            elif st == "mean":
+                stats[st] = gr.mean()
+            elif st == "std":
+                stats[st] = gr.std()
+        if "m2" in RESAMPLE_STREAMING_STATS[self.resample_func]:
+            stats["m2"] = (gr.var() * (stats["count"] - 1)).where(stats["count"] > 1, 0.0)
+        return stats
+
+    @staticmethod
+    def merge_stats(st_a, st_b):
+        """merge statistics of same bucket
+
+        :param st_a: dictionary of statistics, each of them is one row dataframe
+        :param st_b: dictionary of statistics, each of them is one row dataframe with same index as st_a
+        :returns: dictionary of merged statistics
+        :rtype: dict
+
+        """
+        n_a = st_a["count"]
+        n_b = st_b["count"]
+        n = n_a + n_b
+        merged = {"count": n}
+        if "sum" in st_a:
+            merged["sum"] = st_a["sum"] + st_b["sum"]
+        if "min" in st_a:
+            merged["min"] = st_a["min"].where(st_a["min"] <= st_b["min"], st_b["min"]).where(n_b > 0, st_a["min"]).where(n_a > 0, st_b["min"])
+        if "max" in st_a:
+            merged["max"] = st_a["max"].where(st_a["max"] >= st_b["max"], st_b["max"]).where(n_b > 0, st_a["max"]).where(n_a > 0, st_b["max"])
+        if "m2" in st_a:
+            delta = st_b["mean"] - st_a["mean"]
+            mean = st_a["mean"] + delta * n_b / n
+            m2 = st_a["m2"] + st_b["m2"] + delta**2 * n_a * n_b / n
+            merged["mean"] = mean.where(n_b > 0, st_a["mean"]).where(n_a > 0, st_b["mean"])
+            merged["m2"] = m2.where(n_b > 0, st_a["m2"]).where(n_a > 0, st_b["m2"])
+            merged["std"] = np.sqrt(merged["m2"] / (n - 1)).where(n > 1)
+        return merged
+
+    def aggregate(self, values, k):
+        stats = self.bucket_stats(values, k)
+        if self.open_k is not None:
+            first = {st: v.iloc[:1] for st, v in stats.items()}
+            if k[0] == self.open_k:
+                first = self.merge_stats(self.open_stats, first)
+            else:
+                first = {st: pd.concat([self.open_stats[st], first[st]]) for st in first}
+            stats = {st: pd.concat([first[st], v.iloc[1:]]) for st, v in stats.items()}
+
+        last_k = k[-1]
+        self.open_k = last_k
+        self.open_stats = {st: v.iloc[-1:] for st, v in stats.items()}
+        if last_k == self.next_k:
+            return None
+        out_df = self.make_aggregation({st: v.iloc[:-1] for st, v in stats.items()}, self.next_k, last_k)
+        return out_df
+
+    def make_aggregation(self, stats, k_start, k_end):
+        """make result of aggregation for buckets in [k_start, k_end)
+
+        """
+        if self.resample_func == "mean":
+            out_df = stats["sum"] / stats["count"]
+        else:
+            out_df = stats[self.resample_func]
+        dtypes = out_df.dtypes
+        out_df = out_df.reindex(np.arange(k_start, k_end))
+        if self.resample_func in ["count", "sum", "min", "max"]:
+            out_df = out_df.fillna(0).astype(dtypes)
+        self.next_k = k_end
+        return self.make_output(out_df)
+
+    def resample_nearest(self, values, ns, last_k):
+        values = values.set_axis(ns, axis=0)
+        if self.last_row is not None:
+            work_df = pd.concat([self.last_row, values])
+        else:
+            work_df = values
+        out_df = work_df.reindex(self.origin + np.arange(self.next_k, last_k + 1) * self.freq_ns, method="nearest")
+        out_df.index = np.arange(self.next_k, last_k + 1)
+        self.next_k = last_k + 1
+        self.last_row = values.iloc[-1:]
+        return self.make_output(out_df)
+
+    def resample_linear(self, values, ns, last_k):
+        values = values.set_axis(ns, axis=0)
+        grid = np.arange(self.next_k, last_k + 1)
+        grid_ns = self.origin + grid * self.freq_ns
+        grid_df = values.reindex(grid_ns).astype(np.float64)
+        grid_df.index = grid
+        found = np.isin(grid_ns, ns)
+        self.next_k = last_k + 1
+        if self.pending is not None:
+            self.pending = pd.concat([self.pending, grid_df])
+            self.pending_found = np.append(self.pending_found, found)
+        else:
+            self.pending = grid_df
+            self.pending_found = found
+        out_df = self.interpolate_pending(final=False)
+        if out_df is None:
+            return None
+        return self.make_output(out_df)
+
+    def interpolate_pending(self, final=False):
+        """interpolate rows of grid, as 'interpolate(method="linear")' after 'asfreq'
+
+        :param final: if True, NaN after the last valid value is filled by the value
+        :returns: interpolated dataframe of rows that all columns were determined, or None
+        :rtype: pandas.DataFrame
+
+        """
+        if len(self.pending) == 0:
+            return None
+        pos = self.pending.index.to_numpy()
+        interpolated = {}
+        resolved = pos[-1]
+        for c in self.columns:
+            v = self.pending[c].to_numpy()
+            valid = ~np.isnan(v)
+            xp = pos[valid]
+            fp = v[valid]
+            if c in self.anchors:
+                xp = np.insert(xp, 0, self.anchors[c][0])
+                fp = np.insert(fp, 0, self.anchors[c][1])
+            result = v.copy()
+            if len(xp) > 0:
+                fill = ~valid & (pos > xp[0])
+                result[fill] = np.interp(pos[fill], xp, fp)
+                if not final:
+                    resolved = min(resolved, xp[-1])
+            interpolated[c] = result
+
+        out_df = pd.DataFrame(interpolated, index=self.pending.index)
+        out_df = out_df.loc[out_df.index <= resolved]
+        for c in self.columns:
+            v = self.pending[c].to_numpy()[:len(out_df)]
+            i_valid = np.flatnonzero(~np.isnan(v))
+            if len(i_valid) > 0:
+                self.anchors[c] = (pos[i_valid[-1]], v[i_valid[-1]])
+        if self.pending_found[:len(out_df)].all():
+            # as 'asfreq', integer columns are kept, if all rows of grid were found in input
+            out_df = out_df.astype({c: self.dtypes[c] for c in self.columns if pd.api.types.is_integer_dtype(self.dtypes[c])})
+        self.pending = self.pending.iloc[len(out_df):]
+        self.pending_found = self.pending_found[len(out_df):]
+        if len(out_df) == 0:
+            return None
+        return out_df
+
+    def make_output(self, out_df):
+        """make output dataframe that has index of datetime
+
+        :param out_df: resampled dataframe that has index of buckets
+        :returns: dataframe
+        :rtype: pandas.DataFrame
+
+        """
+        labels = pd.to_datetime(self.origin + out_df.index.to_numpy(dtype=np.int64) * self.freq_ns)
+        if self.tz is not None:
+            labels = labels.tz_localize("UTC").tz_convert(self.tz)
+        elif self.date_format is None:
+            # format of datetime is decided by frequency, not by each chunk
+            if self.freq_ns % NS_PER_DAY == 0:
+                labels = labels.strftime("%Y-%m-%d")
+            elif self.freq_ns % NS_PER_SECOND == 0:
+                labels = labels.strftime("%Y-%m-%d %H:%M:%S")
+            elif self.freq_ns % 1000000 == 0:
+                labels = labels.strftime("%Y-%m-%d %H:%M:%S.%f").str[:-3]
+            elif self.freq_ns % 1000 == 0:
+                labels = labels.strftime("%Y-%m-%d %H:%M:%S.%f")
+        out_df.index = pd.Index(labels, name=self.t_col)
+        out_df = out_df.fillna(0)
+        return out_df
+
+
 def do_reformat(df, reformat_def):
 
     cvs = re.split(r"\s*(?<!\\):\s*", reformat_def)
@@ -651,7 +1425,7 @@ def do_reformat(df, reformat_def):
     else:
         out_fmt = None
 
-    df[cname] = pd.to_datetime(df[cname], format=in_fmt)
+    df[cname] = to_datetime_column(df, cname, in_fmt)
 
     return df, out_fmt
 
@@ -674,22 +1448,41 @@ def do_addtimecolumn(df, time_column_def):
     return df
 
 
-def evaluate_timestamp(df, eval_def):
-    cvs = re.split(r"\s*(?<!\\):\s*", eval_def)
-    if len(cvs) < 2:
-        print("??error:csv_trimtime:timestamp:invalid format {}".format(eval_def), file=sys.stderr)
-        sys.exit(1)
-    cname_0 = cvs[0]
-    cname_1 = cvs[1]
+def evaluate_timestamp(df, eval_defs):
+    """convert datetime into POSIX timestamp
+
+    :param df: dataframe
+    :param eval_defs: [new_column_name:column,...]
+    :returns: dataframe
+    :rtype: pandas.DataFrame
 
-    df[cname_0] = list(map(lambda x: x.timestamp(), pd.to_datetime(df[cname_1]).dt.to_pydatetime()))
+    """
+    if isinstance(eval_defs, str):
+        eval_defs = [eval_defs]
+    for eval_def in eval_defs:
+        cvs = re.split(r"\s*(?<!\\):\s*", eval_def)
+        if len(cvs) < 2:
+            print("??error:csv_trimtime:timestamp:invalid format {}".format(eval_def), file=sys.stderr)
+            sys.exit(1)
+        cname_0 = cvs[0]
+        cname_1 = cvs[1]
+
+        df[cname_0] = evaluate_epoch_seconds(to_datetime_column(df, cname_1))
     return df
 
 
-def do_select_hours(df, select_hours_def):
-    cvs = re.split(r"\s*(?<!\\):\s*", select_hours_def)
+def parse_select_definition(select_def, name):
+    """parse definition of '--select_hours' or '--select_datetime'
+
+    :param select_def: definition, 'COLUMN[:time_format]:start_time,end_time'
+    :param name: name of processing for error message
+    :returns: name of column, format of datetime, start and end
+    :rtype: tuple(str, str, str, str)
+
+    """
+    cvs = re.split(r"\s*(?<!\\):\s*", select_def)
     if len(cvs) < 2:
-        print("??error:csv_trimtime:select hours: invalid format {}".format(select_hours_def), file=sys.stderr)
+        print("??error:csv_trimtime:{}: invalid format {}".format(name, select_def), file=sys.stderr)
         sys.exit(1)
 
     if len(cvs) > 2:
@@ -708,7 +1501,150 @@ def do_select_hours(df, select_hours_def):
     t_end = cvs[1]
     t_end = re.sub(r"\\", "", t_end)
 
-    df[t_col] = pd.to_datetime(df[t_col], format=t_fmt)
+    return t_col, t_fmt, t_start, t_end
+
+
+def parse_datetime_bound(value, t_format=None):
+    """parse start or end of '--select_datetime'
+
+    :param value: datetime string
+    :param t_format: format of datetime, if None, string is parsed by pandas.Timestamp
+    :returns: datetime
+    :rtype: datetime.datetime
+
+    """
+    if t_format is None:
+        return pd.Timestamp(value).to_pydatetime()
+    return dtt.strptime(value, t_format)
+
+
+def parse_time_of_day(value):
+    """parse time of day, as pandas.DatetimeIndex.indexer_between_time does
+
+    :param value: time string, ex. '14:00', '14:00:00', '2:00PM'
+    :returns: time or None if it was not parsed
+    :rtype: datetime.time
+
+    """
+    try:
+        t_obj = dtime.fromisoformat(value)
+    except (ValueError, TypeError):
+        t_obj = None
+        for t_format in TIME_OF_DAY_FORMATS:
+            try:
+                t_obj = dtt.strptime(value, t_format).time()
+                break
+            except (ValueError, TypeError):
+                continue
+    if t_obj is not None and t_obj.tzinfo is not None:
+        return None
+    return t_obj
+
+
+def format_datetime_exactly(ds):
+    """format datetime as 'str(pandas.Timestamp)', fraction of second is added only to values that have it
+
+    :param ds: series of datetime64
+    :returns: series of strings, NaT is NaN
+    :rtype: pandas.Series
+
+    """
+    result = ds.dt.strftime("%Y-%m-%d %H:%M:%S")
+    micro = ds.dt.microsecond.fillna(0).astype(np.int64)
+    nano = ds.dt.nanosecond.fillna(0).astype(np.int64)
+    frac = pd.Series("", index=ds.index)
+    u_mask = (micro != 0) & (nano == 0)
+    frac[u_mask] = "." + micro[u_mask].astype(str).str.zfill(6)
+    n_mask = nano != 0
+    frac[n_mask] = "." + (micro[n_mask] * 1000 + nano[n_mask]).astype(str).str.zfill(9)
+    result = result + frac
+    if ds.dt.tz is not None:
+        result = result + ds.dt.strftime("%z").str.replace(r"(\d\d)$", r":\1", regex=True)
+    return result
+
+
+def format_datetime_columns(df):
+    """format datetime columns and index of chunk, so format of datetime is same among chunks
+
+    :param df: dataframe
+    :returns: dataframe
+    :rtype: pandas.DataFrame
+    :remark:
+       format of datetime in 'to_csv' is decided by values in each chunk, for example, date only for midnight.
+
+    """
+    dt_columns = df.select_dtypes(include=["datetime", "datetimetz"]).columns
+    if len(dt_columns) == 0 and not isinstance(df.index, pd.DatetimeIndex):
+        return df
+    df = df.copy()
+    for cn in dt_columns:
+        df[cn] = format_datetime_exactly(df[cn])
+    if isinstance(df.index, pd.DatetimeIndex):
+        df.index = pd.Index(format_datetime_exactly(df.index.to_series()), name=df.index.name)
+    return df
+
+
+def is_sorted_datetime(ds):
+    """check that datetime is sorted in ascending order, without NaT
+
+    :param ds: series of datetime64
+    :returns: True if sorted
+    :rtype: bool
+
+    """
+    return bool(ds.notna().all() and ds.is_monotonic_increasing)
+
+
+def between_time_positions(ds, t_start, t_end):
+    """positions of rows in range of time of day, by binary search on sorted datetime
+
+    :param ds: series of naive datetime64, that is sorted in ascending order
+    :param t_start: start of range, datetime.time
+    :param t_end: end of range, datetime.time
+    :returns: positions of rows
+    :rtype: numpy.ndarray
+    :remark:
+       as pandas.DatetimeIndex.indexer_between_time, both ends are included, and
+       when 't_start' is later than 't_end', range over midnight is selected.
+       time of day is compared in micro seconds.
+
+    """
+    values = ds.to_numpy()
+    if len(values) == 0:
+        return np.arange(0)
+    one_us = np.timedelta64(1, "us")
+    one_day = np.timedelta64(1, "D")
+    d_start = timedelta(hours=t_start.hour, minutes=t_start.minute, seconds=t_start.second, microseconds=t_start.microsecond)
+    d_end = timedelta(hours=t_end.hour, minutes=t_end.minute, seconds=t_end.second, microseconds=t_end.microsecond)
+    d_start = np.timedelta64(d_start)
+    d_end = np.timedelta64(d_end)
+    days = np.arange(values[0].astype("datetime64[D]"), values[-1].astype("datetime64[D]") + one_day).astype(values.dtype)
+    if t_start <= t_end:
+        lowers = days + d_start
+        uppers = days + d_end + one_us
+    else:
+        lowers = np.column_stack([days, days + d_start]).ravel()
+        uppers = np.column_stack([days + d_end + one_us, days + one_day]).ravel()
+    i_lowers = np.searchsorted(values, lowers, side="left")
+    i_uppers = np.searchsorted(values, uppers, side="left")
+    lengths = np.maximum(i_uppers - i_lowers, 0)
+    shifts = np.repeat(i_lowers - np.cumsum(lengths) + lengths, lengths)
+    return np.arange(len(shifts)) + shifts
+
+
+def do_select_hours(df, select_hours_def):
+    t_col, t_fmt, t_start, t_end = parse_select_definition(select_hours_def, "select hours")
+
+    df[t_col] = to_datetime_column(df, t_col, t_fmt)
+    ds = df[t_col]
+    tod_start = parse_time_of_day(t_start)
+    tod_end = parse_time_of_day(t_end)
+    if tod_start is not None and tod_end is not None and ds.dt.tz is None and is_sorted_datetime(ds):
+        print("%inf:csv_trimtime:select hours:binary search on sorted datetime", file=sys.stderr)
+        output_df = df.iloc[between_time_positions(ds, tod_start, tod_end)]
+        output_df = output_df.set_index(t_col)
+        return output_df
+
     df.set_index(t_col, inplace=True)
 
     output_df = df.iloc[df.index.indexer_between_time(t_start, t_end, include_start=True, include_end=True), :]
@@ -722,39 +1658,181 @@ def do_select_hours(df, select_hours_def):
 
 
 def do_select_datetime(df, select_dt_def):
-    cvs = re.split(r"\s*(?<!\\):\s*", select_dt_def)
-    if len(cvs) < 2:
-        print("??error:csv_trimtime:select datetime: invalid format {}".format(select_dt_def), file=sys.stderr)
-        sys.exit(1)
+    t_col, t_fmt, t_start, t_end = parse_select_definition(select_dt_def, "select datetime")
 
-    if len(cvs) > 2:
-        t_col = cvs[0]
-        t_fmt = cvs[1]
-        t_range = cvs[2]
-        t_fmt = re.sub(r"\\", "", t_fmt)
-    else:
-        t_col = cvs[0]
-        t_range = cvs[1]
-        t_fmt = None
+    t_start = parse_datetime_bound(t_start, t_fmt)
+    t_end = parse_datetime_bound(t_end, t_fmt)
 
-    cvs = re.split(r"\s*(?<!\\),\s*", t_range)
-    t_start = cvs[0]
-    t_start = re.sub(r"\\", "", t_start)
-    t_end = cvs[1]
-    t_end = re.sub(r"\\", "", t_end)
-
-    t_start = dtt.strptime(t_start, t_fmt)
-    t_end = dtt.strptime(t_end, t_fmt)
-
-    df[t_col] = pd.to_datetime(df[t_col], format=t_fmt)
+    df[t_col] = to_datetime_column(df, t_col, t_fmt)
     # df.set_index(t_col, inplace=True)
 
+    ds = df[t_col]
+    if ds.dt.tz is None and is_sorted_datetime(ds):
+        i_start = ds.searchsorted(t_start, side="left")
+        i_end = ds.searchsorted(t_end, side="right")
+        return df.iloc[i_start:max(i_start, i_end)].copy()
+
     output_df = df.loc[(df[t_col] >= t_start) & (df[t_col] <= t_end)]
 
     return output_df
 
 
-def do_get_range_time(df, range_time_def):
+def line_start_offsets(csv_file, step):
+    """byte offsets of starts of lines, for every 'step' lines after header line
+
+    :param csv_file: path of csv file
+    :param step: interval of lines
+    :returns: offsets of lines 1, 1+step, 1+2*step..., number of lines and size of file
+    :rtype: tuple(numpy.ndarray, int, int)
+
+    """
+    offsets = []
+    n_lines = 0
+    f_size = 0
+    last_byte = b"\n"
+    with open(csv_file, "rb") as f:
+        while True:
+            buf = f.read(TIME_INDEX_READ_SIZE)
+            if len(buf) == 0:
+                break
+            starts = np.flatnonzero(np.frombuffer(buf, dtype=np.uint8) == ord("\n")) + 1
+            line_ids = n_lines + np.arange(1, len(starts) + 1)
+            offsets.append(starts[(line_ids - 1) % step == 0] + f_size)
+            n_lines += len(starts)
+            f_size += len(buf)
+            last_byte = buf[-1:]
+    if last_byte != b"\n":
+        n_lines += 1
+    offsets = np.concatenate(offsets) if len(offsets) > 0 else np.arange(0)
+    offsets = offsets[offsets < f_size]
+    return offsets, n_lines, f_size
+
+
+def time_index_source(csv_file):
+    """identity of csv file to check that time index is up to date
+
+    :param csv_file: path of csv file
+    :returns: path, size and modification time in nano seconds
+    :rtype: dict
+
+    """
+    st = Path(csv_file).stat()
+    return {"path": str(Path(csv_file).resolve()), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def build_time_index(index_file, csv_file, df, t_col, t_fmt, step=TIME_INDEX_STEP):
+    """make sparse index of time to byte offset in csv file, and save it
+
+    :param index_file: path of index file
+    :param csv_file: path of csv file
+    :param df: dataframe of entire csv file
+    :param t_col: name of datetime column
+    :param t_fmt: format of datetime
+    :param step: interval of rows in index
+    :returns: True if index was saved
+    :rtype: bool
+    :remark:
+       index is not made, when datetime is not sorted or timezone-aware, or when lines of csv file are not same as rows.
+       quoted fields with new line or blank lines make the latter.
+
+    """
+    ds = to_datetime_column(df, t_col, t_fmt)
+    if ds.dt.tz is not None or not is_sorted_datetime(ds):
+        print("#warn:csv_trimtime:time index:'{}' is not sorted naive datetime, index is not made".format(t_col), file=sys.stderr)
+        return False
+    offsets, n_lines, _ = line_start_offsets(csv_file, step)
+    if n_lines != len(df) + 1:
+        print("#warn:csv_trimtime:time index:number of lines({}) is not one of rows({}) with header, index is not made".format(
+            n_lines, len(df)),
+              file=sys.stderr)
+        return False
+
+    t_index = {
+        "version": TIME_INDEX_VERSION,
+        "source": time_index_source(csv_file),
+        "column": t_col,
+        "format": t_fmt,
+        "step": step,
+        "rows": len(df),
+        "dtypes": {c: str(df[c].dtype) for c in df.columns},
+        "times": ds.to_numpy()[::step].astype(np.int64).tolist(),
+        "offsets": offsets.tolist()
+    }
+    with open(index_file, "w") as f:
+        json.dump(t_index, f)
+    print("%inf:csv_trimtime:time index:saved:{}".format(index_file), file=sys.stderr)
+    return True
+
+
+def load_time_index(index_file, csv_file, t_col, t_fmt):
+    """load sparse index of time, that was made by build_time_index
+
+    :param index_file: path of index file
+    :param csv_file: path of csv file
+    :param t_col: name of datetime column
+    :param t_fmt: format of datetime
+    :returns: index or None if it is not available
+    :rtype: dict
+
+    """
+    if not Path(index_file).exists():
+        return None
+    try:
+        with open(index_file) as f:
+            t_index = json.load(f)
+    except (OSError, ValueError) as e:
+        print("#warn:csv_trimtime:time index:failed to read:{}:{}".format(index_file, e), file=sys.stderr)
+        return None
+    if t_index.get("version") != TIME_INDEX_VERSION or t_index.get("source") != time_index_source(csv_file) or t_index.get(
+            "column") != t_col or t_index.get("format") != t_fmt:
+        print("#warn:csv_trimtime:time index:index is not for this file or column, remade:{}".format(index_file), file=sys.stderr)
+        return None
+    return t_index
+
+
+def read_time_window(csv_file, t_index, t_start, t_end, reader="auto"):
+    """read only rows of csv file around range of datetime, using sparse index of time
+
+    :param csv_file: path of csv file
+    :param t_index: index, that was made by build_time_index
+    :param t_start: start of range
+    :param t_end: end of range
+    :param reader: one of csv_reader.READER_ENGINES
+    :returns: dataframe, that includes all rows in the range
+    :rtype: pandas.DataFrame
+    :remark:
+       rows are read from the block of index that may include 't_start' to the block that starts after 't_end',
+       so rows out of range are included, those will be removed by do_select_datetime.
+       types of columns are same as ones of entire csv file.
+
+    """
+    times = np.array(t_index["times"], dtype=np.int64).astype("datetime64[ns]")
+    offsets = t_index["offsets"]
+    i_first = max(np.searchsorted(times, pd.Timestamp(t_start).to_datetime64(), side="left") - 1, 0)
+    i_last = max(np.searchsorted(times, pd.Timestamp(t_end).to_datetime64(), side="right"), i_first)
+    f_size = t_index["source"]["size"]
+    with open(csv_file, "rb") as f:
+        header = f.read(offsets[0]) if len(offsets) > 0 else f.read()
+        b_start = offsets[i_first] if i_first < len(offsets) else f_size
+        b_end = offsets[i_last] if i_last < len(offsets) else f_size
+        f.seek(b_start)
+        body = f.read(b_end - b_start)
+    print("%inf:csv_trimtime:time index:read {} bytes of {} bytes, from row {}".format(len(body), f_size, i_first * t_index["step"]),
+          file=sys.stderr)
+
+    dtypes = {c: np.dtype(v) for c, v in t_index["dtypes"].items()}
+    df = read_csv(io.BytesIO(header + body), reader="c", cache=False, dtype=dtypes)
+    return df
+
+
+def parse_range_time_definition(range_time_def):
+    """parse definition of '--get_range_of_time'
+
+    :param range_time_def: definition, 'COLUMN[:datetime_format]:unit'
+    :returns: name of column, format of datetime and unit
+    :rtype: tuple(str, str, str)
+
+    """
     cvs = re.split(r"\s*(?<!\\):\s*", range_time_def)
     if len(cvs) < 2:
         print("??error:csv_trimtime:get range of time:invalid definition:{}".format(range_time_def), file=sys.stderr)
@@ -767,10 +1845,19 @@ def do_get_range_time(df, range_time_def):
     else:
         in_fmt = None
         t_unit = cvs[1]
+    return cname, in_fmt, t_unit
 
-    df[cname] = pd.to_datetime(df[cname], format=in_fmt)
-    dt_max = df[cname].max()
-    dt_min = df[cname].min()
+
+def time_span(dt_max, dt_min, t_unit):
+    """length of range of time in given unit
+
+    :param dt_max: end of range
+    :param dt_min: start of range
+    :param t_unit: 'D'ays, 'H'ours, 'M'inutes or 'S'econds
+    :returns: length and name of unit
+    :rtype: tuple(float, str)
+
+    """
     dt = dt_max - dt_min
     dt = dt.total_seconds()
     unit_s = "seconds"
@@ -786,10 +1873,169 @@ def do_get_range_time(df, range_time_def):
     elif t_unit.upper() != "S":
         print("??error:csv_trimtime:get time of range:invalid unit:{}".format(t_unit), file=sys.stderr)
         sys.exit(1)
+    return dt, unit_s
+
+
+def do_get_range_time(df, range_time_def):
+    cname, in_fmt, t_unit = parse_range_time_definition(range_time_def)
+
+    df[cname] = to_datetime_column(df, cname, in_fmt)
+    dt_max = df[cname].max()
+    dt_min = df[cname].min()
+    dt, unit_s = time_span(dt_max, dt_min, t_unit)
 
     return dt, cname, unit_s, dt_max, dt_min
 
 
+def do_get_range_time_chunks(csv_reader, range_time_def):
+    """range of time by reduction of minimum and maximum over chunks
+
+    :param csv_reader: reader of csv file, that returns dataframes
+    :param range_time_def: definition of '--get_range_of_time'
+    :returns: same as do_get_range_time
+    :rtype: tuple
+
+    """
+    cname, in_fmt, t_unit = parse_range_time_definition(range_time_def)
+
+    dt_maxs = []
+    dt_mins = []
+    for df in csv_reader:
+        ds = to_datetime_column(df, cname, in_fmt)
+        dt_maxs.append(ds.max())
+        dt_mins.append(ds.min())
+    dt_max = pd.Series(dt_maxs).max() if len(dt_maxs) > 0 else pd.NaT
+    dt_min = pd.Series(dt_mins).min() if len(dt_mins) > 0 else pd.NaT
+    dt, unit_s = time_span(dt_max, dt_min, t_unit)
+
+    return dt, cname, unit_s, dt_max, dt_min
+
+
+def read_first_last_rows(csv_file, usecols=None):
+    """read only first and last rows of csv file
+
+    :param csv_file: path of csv file
+    :param usecols: list of columns to read
+    :returns: dataframe of first and last rows
+    :rtype: pandas.DataFrame
+    :remark:
+       last row is found by reading backward from end of file, so quoted fields with new line are not supported in last row.
+
+    """
+    with open(csv_file, "rb") as f:
+        header = f.readline()
+        first = f.readline()
+        while len(first) > 0 and len(first.strip()) == 0:
+            first = f.readline()
+        body = b""
+        if len(first) > 0:
+            f.seek(0, io.SEEK_END)
+            pos = f.tell()
+            tail = b""
+            while pos > 0:
+                size = min(LAST_ROW_READ_SIZE, pos)
+                pos -= size
+                f.seek(pos)
+                tail = f.read(size) + tail
+                if b"\n" in tail.rstrip():
+                    break
+            last = tail.rstrip().rsplit(b"\n", 1)[-1]
+            body = first.rstrip(b"\r\n") + b"\n" + last + b"\n"
+    return read_csv(io.BytesIO(header + body), reader="c", cache=False, usecols=usecols)
+
+
+def parse_recipe_step(step):
+    """parse step of recipe
+
+    :param step: 'OPERATION=DEFINITION', OPERATION is name of option without '--', ex. 'gap=GA=A\\:1'
+    :returns: name of operation and definition
+    :rtype: tuple(str, str)
+
+    """
+    step = step.strip()
+    if step.startswith("--"):
+        step = step[2:]
+    cvs = step.split("=", 1)
+    if len(cvs) < 2 or cvs[0].strip() not in RECIPE_OPERATIONS:
+        print("??error:csv_trimtime:recipe:invalid step:{}, available operations:{}".format(step, RECIPE_OPERATIONS), file=sys.stderr)
+        sys.exit(1)
+    return cvs[0].strip(), cvs[1].strip()
+
+
+def read_recipe(recipe_file):
+    """read recipe file, that has a step in each line
+
+    :param recipe_file: path of recipe file
+    :returns: list of steps
+    :rtype: list(tuple(str, str))
+    :remark:
+       empty lines and lines starting with '#' are ignored.
+
+    """
+    steps = []
+    with open(recipe_file) as f:
+        for line in f:
+            line = line.strip()
+            if len(line) == 0 or line.startswith("#"):
+                continue
+            steps.append(parse_recipe_step(line))
+    return steps
+
+
+def run_recipe(df, steps, resample_func="mean"):
+    """run operations in order on a dataframe
+
+    :param df: dataframe
+    :param steps: list of (name of operation, definition)
+    :param resample_func: function for 'resample' until 'resample_function' step is given
+    :returns: dataframe and format of datetime for output
+    :rtype: tuple(pandas.DataFrame, str)
+    :remark:
+       parsed datetime column is kept in dataframe, so it is shared among following steps.
+       datetime column that was moved into index by 'resample' or 'select_hours' is restored as column,
+       so following steps may refer it.
+
+    """
+    out_date_fmt = None
+    for i_step, (operation, definition) in enumerate(steps):
+        print("%Inf:csv_trimtime:step {}:{}:[{}]".format(i_step + 1, operation, definition), file=sys.stderr)
+        if operation in RECIPE_LIST_OPERATIONS:
+            definition = re.split(r"\s*(?<!\\),\s*", definition)
+        if operation == "sort_datetime":
+            df = sort_time_column(df, definition)
+        elif operation == "timestamp":
+            df = evaluate_timestamp(df, definition)
+        elif operation == "add_time_column":
+            df = do_addtimecolumn(df, definition)
+        elif operation == "reformat":
+            df, out_date_fmt = do_reformat(df, definition)
+        elif operation == "calculate_elapsed_time":
+            df = calculate_elapsed_time(df, definition)
+        elif operation == "gap":
+            df = groupby_value_gap(df, definition)
+        elif operation == "time_gap":
+            df = groupby_time_gap(df, definition)
+        elif operation == "calculate_time_diff":
+            df = calculate_time_diff(df, definition)
+        elif operation == "change_timefreq":
+            df = change_time_frequency(df, definition)
+        elif operation == "decompose_datetime":
+            df = decomp_datetime(df, definition)
+        elif operation == "resample_function":
+            if definition not in RESAMPLE_METHOD:
+                print("??error:csv_trimtime:recipe:invalid resample function:{}".format(definition), file=sys.stderr)
+                sys.exit(1)
+            resample_func = definition
+        elif operation == "resample":
+            df = do_rsampling(df, definition, resample_func).reset_index()
+        elif operation == "select_datetime":
+            df = do_select_datetime(df, definition)
+        elif operation == "select_hours":
+            df = do_select_hours(df, definition).reset_index()
+
+    return df, out_date_fmt
+
+
 if __name__ == "__main__":
     args = init()
     csv_file = args.csv_file
@@ -811,7 +2057,10 @@ if __name__ == "__main__":
     t_select_dt = args.TSELECT
 
     # timestamp
-    tstamp_def = args.TSTAMP
+    tstamp_s = args.TSTAMP
+    tstamp_defs = []
+    if tstamp_s is not None:
+        tstamp_defs = re.split(r"\s*(?<!\\),\s*", tstamp_s)
 
     # add time series
     time_column_def = args.TIMECOLUMN
@@ -820,7 +2069,10 @@ if __name__ == "__main__":
     refmt_def = args.REFORMAT
 
     # elapsed time
-    elapsed_time_def = args.ETIME
+    elapsed_time_s = args.ETIME
+    elapsed_time_defs = []
+    if elapsed_time_s is not None:
+        elapsed_time_defs = re.split(r"\s*(?<!\\),\s*", elapsed_time_s)
 
     # gap
     gap_s = args.GAP
@@ -835,7 +2087,10 @@ if __name__ == "__main__":
         timegap_defs = re.split(r"\s*(?<!\\),\s*", timegap_s)
 
     # time diff
-    time_diff = args.TDIFF
+    time_diff_s = args.TDIFF
+    time_diffs = []
+    if time_diff_s is not None:
+        time_diffs = re.split(r"\s*(?<!\\),\s*", time_diff_s)
 
     # time frequency
     ch_timefreqs_s = args.CHTFREQ
@@ -850,68 +2105,162 @@ if __name__ == "__main__":
     resample_defs = args.RESAMPLE
     resample_func = args.RESAMPLE_FUNC
 
-    #--- processing
-    csv_df = pd.read_csv(csv_file)
+    chunksize = args.CHUNKSIZE
+    if chunksize is not None:
+        if chunksize <= 0:
+            print("??error:csv_trimtime:'--chunksize' must be positive integer:{}".format(chunksize), file=sys.stderr)
+            sys.exit(1)
+        no_stream_opts = []
+        for opt, v in [("--sort_datetime", sort_time_def), ("--select_hours", t_select_hours),
+                       ("--add_time_column", time_column_def), ("--calculate_elapsed_time", elapsed_time_s),
+                       ("--calculate_time_diff", time_diff_s)]:
+            if v is not None:
+                no_stream_opts.append(opt)
+        if resample_defs is not None and resample_func not in RESAMPLE_STREAMING_METHOD:
+            no_stream_opts.append("--resample_func={}".format(resample_func))
+        if len(no_stream_opts) > 0:
+            print("??error:csv_trimtime:'--chunksize' is not available with {}, those need entire data.".format(", ".join(no_stream_opts)),
+                  file=sys.stderr)
+            sys.exit(1)
 
-    out_date_fmt = None
+    # steps of processing in order
+    steps = []
+    for operation, v in [("sort_datetime", sort_time_def), ("timestamp", tstamp_s), ("add_time_column", time_column_def),
+                         ("reformat", refmt_def), ("calculate_elapsed_time", elapsed_time_s), ("gap", gap_s), ("time_gap", timegap_s),
+                         ("calculate_time_diff", time_diff_s), ("change_timefreq", ch_timefreqs_s), ("decompose_datetime", decomp_parts),
+                         ("resample", resample_defs), ("select_datetime", t_select_dt), ("select_hours", t_select_hours)]:
+        if v is not None:
+            steps.append((operation, v))
+    recipe_steps = []
+    if args.RECIPE is not None:
+        try:
+            recipe_steps.extend(read_recipe(args.RECIPE))
+        except OSError as e:
+            print("??error:csv_trimtime:recipe:{}".format(e), file=sys.stderr)
+            sys.exit(1)
+    if args.STEPS is not None:
+        recipe_steps.extend([parse_recipe_step(v) for v in args.STEPS])
+    if args.RECIPE is not None or args.STEPS is not None:
+        if len(steps) > 0:
+            print("??error:csv_trimtime:options of processing are not available with '--recipe' and '--step', use those as steps:{}".format(
+                [v[0] for v in steps]),
+                  file=sys.stderr)
+            sys.exit(1)
+        if chunksize is not None:
+            print("??error:csv_trimtime:'--chunksize' is not available with '--recipe' and '--step'", file=sys.stderr)
+            sys.exit(1)
+        steps = recipe_steps
+
+    time_index_file = args.TINDEX
+    if time_index_file is not None:
+        if t_select_dt is None:
+            print("??error:csv_trimtime:'--time_index' needs '--select_datetime'", file=sys.stderr)
+            sys.exit(1)
+        if csv_file == sys.stdin:
+            print("??error:csv_trimtime:'--time_index' is not available for stdin", file=sys.stderr)
+            sys.exit(1)
+        other_opts = []
+        for opt, v in [("--sort_datetime", sort_time_def), ("--get_range_of_time", range_time_defs), ("--timestamp", tstamp_s),
+                       ("--add_time_column", time_column_def), ("--reformat", refmt_def), ("--calculate_elapsed_time", elapsed_time_s),
+                       ("--gap", gap_s), ("--time_gap", timegap_s), ("--calculate_time_diff", time_diff_s),
+                       ("--change_timefreq", ch_timefreqs_s), ("--decompose_datetime", decomp_parts), ("--resample", resample_defs),
+                       ("--chunksize", chunksize), ("--recipe", args.RECIPE), ("--step", args.STEPS)]:
+            if v is not None:
+                other_opts.append(opt)
+        if len(other_opts) > 0:
+            print("??error:csv_trimtime:'--time_index' is not available with {}, only '--select_hours' is available.".format(
+                ", ".join(other_opts)),
+                  file=sys.stderr)
+            sys.exit(1)
 
+    #--- processing
     if range_time_defs is not None:
-        r_time, cname, unit_s, dt_max, dt_min = do_get_range_time(csv_df, range_time_defs)
+        cname = parse_range_time_definition(range_time_defs)[0]
+        try:
+            if args.SORTED and csv_file != sys.stdin:
+                csv_df = read_first_last_rows(csv_file, usecols=[cname])
+                r_time, cname, unit_s, dt_max, dt_min = do_get_range_time(csv_df, range_time_defs)
+            elif chunksize is not None:
+                csv_reader = read_csv(csv_file, reader=args.READER, cache=args.CACHE, chunksize=chunksize, usecols=[cname])
+                r_time, cname, unit_s, dt_max, dt_min = do_get_range_time_chunks(csv_reader, range_time_defs)
+            else:
+                csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE, usecols=[cname])
+                r_time, cname, unit_s, dt_max, dt_min = do_get_range_time(csv_df, range_time_defs)
+        except ValueError as e:
+            print("??error:csv_trimtime:get range of time:{}".format(e), file=sys.stderr)
+            sys.exit(1)
         print("%inf:csv_trimtime:get time of range:{}:max={},min={}:perid={} {}".format(cname, dt_max, dt_min, r_time, unit_s))
         sys.exit(0)
 
-    if sort_time_def is not None:
-        print("%Inf:csv_trimtime:sort datetime:[{}]".format(sort_time_def), file=sys.stderr)
-        csv_df = sort_time_column(csv_df, sort_time_def)
-
-    # timestamp
-    if tstamp_def is not None:
-        csv_df = evaluate_timestamp(csv_df, tstamp_def)
-
-    # time series
-    if time_column_def is not None:
-        df = do_addtimecolumn(csv_df, time_column_def)
-
-    # reformat
-    if refmt_def is not None:
-        df, out_date_fmt = do_reformat(csv_df, refmt_def)
-
-    if elapsed_time_def is not None:
-        print("%Inf:csv_trimtime:calculate elapsed time:[{}]".format(elapsed_time_def), file=sys.stderr)
-        csv_df = calculate_elapsed_time(csv_df, elapsed_time_def)
-
-    if len(gap_defs) > 0:
-        print("%Inf:csv_trimtime:groupby gap:[{}]".format(gap_defs), file=sys.stderr)
-        csv_df = groupby_value_gap(csv_df, gap_defs)
-
-    if len(timegap_defs) > 0:
-        print("%Inf:csv_trimtime:groupby time gap:[{}]".format(timegap_defs), file=sys.stderr)
-        csv_df = groupby_time_gap(csv_df, timegap_defs)
-
-    if time_diff is not None:
-        print("%Inf:csv_trimtime:calculate time diff:[{}]".format(time_diff), file=sys.stderr)
-        csv_df = calculate_time_diff(csv_df, time_diff)
-
-    if len(ch_timefreqs) > 0:
-        print("%Inf:csv_trimtime:changing time frequency:[{}]".format(ch_timefreqs), file=sys.stderr)
-        csv_df = change_time_frequency(csv_df, ch_timefreqs)
-
-    if decomp_parts is not None:
-        csv_df = decomp_datetime(csv_df, decomp_parts)
-
-    csv_index = False
-    if resample_defs is not None:
-        print("%Inf:csv_trimtime:resampling:[{}]".format(resample_defs), file=sys.stderr)
-        csv_df = do_rsampling(csv_df, resample_defs, resample_func)
-        csv_index = True
+    #--- processing
+    if chunksize is not None:
+        print("%Inf:csv_trimtime:streaming mode:chunksize={}".format(chunksize), file=sys.stderr)
+        csv_reader = read_csv(csv_file, reader=args.READER, cache=args.CACHE, chunksize=chunksize)
+        if isinstance(output_file, str):
+            output_file = open(output_file, "w")
+        gap_states = {}
+        timegap_states = {}
+        resampler = None
+        out_date_fmt = None
+        csv_index = resample_defs is not None
+        out_header = True
+        n_chunks = 0
+        n_rows = 0
+        for csv_df in csv_reader:
+            if len(tstamp_defs) > 0:
+                csv_df = evaluate_timestamp(csv_df, tstamp_defs)
+            if refmt_def is not None:
+                csv_df, out_date_fmt = do_reformat(csv_df, refmt_def)
+            if len(gap_defs) > 0:
+                csv_df = groupby_value_gap(csv_df, gap_defs, states=gap_states)
+            if len(timegap_defs) > 0:
+                csv_df = groupby_time_gap(csv_df, timegap_defs, states=timegap_states)
+            if len(ch_timefreqs) > 0:
+                csv_df = change_time_frequency(csv_df, ch_timefreqs)
+            if decomp_parts is not None:
+                csv_df = decomp_datetime(csv_df, decomp_parts)
+            n_chunks += 1
+            if resample_defs is not None:
+                try:
+                    if resampler is None:
+                        resampler = StreamingResampler(*parse_resample_definition(resample_defs), resample_func, date_format=out_date_fmt)
+                    csv_df = resampler.feed(csv_df)
+                except ValueError as e:
+                    print("??error:csv_trimtime:resampling:{}".format(e), file=sys.stderr)
+                    sys.exit(1)
+                if csv_df is None:
+                    continue
+            if t_select_dt is not None:
+                csv_df = do_select_datetime(csv_df, t_select_dt)
+            if out_date_fmt is None:
+                csv_df = format_datetime_columns(csv_df)
+            csv_df.to_csv(output_file, index=csv_index, date_format=out_date_fmt, header=out_header)
+            out_header = False
+            n_rows += len(csv_df)
+        if resampler is not None:
+            csv_df = resampler.flush()
+            if csv_df is not None:
+                if out_date_fmt is None:
+                    csv_df = format_datetime_columns(csv_df)
+                csv_df.to_csv(output_file, index=csv_index, date_format=out_date_fmt, header=out_header)
+                n_rows += len(csv_df)
+        print("%Inf:csv_trimtime:streaming mode:number of chunks={}, number of output rows={}".format(n_chunks, n_rows), file=sys.stderr)
+        if output_file != sys.stdout:
+            output_file.close()
+        sys.exit(0)
 
-    if t_select_dt is not None:
-        print("%Inf:csv_trimtime:select datetime:[{}]".format(t_select_dt), file=sys.stderr)
-        csv_df = do_select_datetime(csv_df, t_select_dt)
+    if time_index_file is not None:
+        t_col, t_fmt, t_start, t_end = parse_select_definition(t_select_dt, "select datetime")
+        t_index = load_time_index(time_index_file, csv_file, t_col, t_fmt)
+        if t_index is not None:
+            csv_df = read_time_window(csv_file, t_index, parse_datetime_bound(t_start, t_fmt), parse_datetime_bound(t_end, t_fmt),
+                                      reader=args.READER)
+        else:
+            csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
+            build_time_index(time_index_file, csv_file, csv_df, t_col, t_fmt)
+    else:
+        csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
 
-    if t_select_hours is not None:
-        print("%Inf:csv_trimtime:select hours:[{}]".format(t_select_hours), file=sys.stderr)
-        csv_df = do_select_hours(csv_df, t_select_hours)
-        csv_index = True
+    csv_df, out_date_fmt = run_recipe(csv_df, steps, resample_func=resample_func)
 
-    csv_df.to_csv(output_file, index=csv_index, date_format=out_date_fmt)
+    csv_df.to_csv(output_file, index=False, date_format=out_date_fmt)
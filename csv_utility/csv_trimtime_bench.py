@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# Name:         csv_trimtime_bench.py
+# Description:  benchmark of operations of csv_trimtime.py with synthetic datetime data
+#
+# Author:       m.akei
+# Copyright:    (c) 2021 by m.na.akei
+# Time-stamp:   <2026-10-18 18:12:40>
+# Licence:
+#  Copyright (c) 2021 Masaharu N. Akei
+#
+#  This software is released under the MIT License.
+#    http://opensource.org/licenses/mit-license.php
+# ----------------------------------------------------------------------
+import argparse
+import textwrap
+import sys
+import io
+import time
+import tracemalloc
+from contextlib import redirect_stderr
+from pathlib import Path
+
+from datetime import timedelta
+from dateutil.relativedelta import relativedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, format(Path(__file__).parent))
+import csv_trimtime as ct
+
+VERSION = 1.0
+
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+TIME_FORMAT_ESCAPED = "%Y-%m-%dT%H\\:%M\\:%S"
+STREAMING_CHUNKSIZE = 100000
+
+LEGACY_BUCKETS = {
+    ("floor", "W"): lambda x: x - timedelta(days=x.weekday(), hours=x.hour, minutes=x.minute, seconds=x.second),
+    ("floor", "M"): lambda x: x - timedelta(days=x.day - 1) - timedelta(hours=x.hour, minutes=x.minute, seconds=x.second),
+    ("ceil", "W"): lambda x: x - timedelta(days=x.weekday() - 7, hours=x.hour, minutes=x.minute, seconds=x.second),
+    ("ceil", "M"): lambda x: x + relativedelta(days=-x.day + 1, months=1) - timedelta(hours=x.hour, minutes=x.minute, seconds=x.second),
+    ("round", "W"): lambda x: x - timedelta(days=x.weekday() - (7 if x.weekday() > 4 else 0), hours=x.hour, minutes=x.minute, seconds=x.second),
+    ("round", "M"): lambda x: x + relativedelta(days=-x.day + 1, months=1 if x.day > 15 else 0) - timedelta(
+        hours=x.hour, minutes=x.minute, seconds=x.second),
+}
+
+
+def init():
+    arg_parser = argparse.ArgumentParser(description="benchmark of csv_trimtime.py",
+                                         formatter_class=argparse.RawDescriptionHelpFormatter,
+                                         epilog=textwrap.dedent('''
+remark:
+  synthetic data is generated for each number of rows, and each operation of csv_trimtime.py is applied to it in memory.
+  data has columns of sorted datetime 'T'(every second with random gaps), random datetime 'R', float values 'V'
+  and datetime strings 'S' of 'T'.
+
+  elapsed time and rows/sec of each operation are measured, and peak memory is measured by tracemalloc in another run.
+  memory that is not allocated through python or numpy, for example by pyarrow, is not counted.
+  results are written into csv file given by '--output'.
+
+  for operations that have reference, that is computation used before optimization, result of the operation is compared
+  with one of the reference as csv text on data with '--sample' rows, and the time of reference is also recorded.
+  if any results were different, exit status is 1.
+
+example:
+  csv_trimtime_bench.py
+  csv_trimtime_bench.py --rows=100000,1000000 --sample=10000 --output=bench.csv
+  csv_trimtime_bench.py --rows=10000000 --operation=timestamp,select_hours --no_memory
+
+'''))
+    arg_parser.add_argument('-v', '--version', action='version', version='%(prog)s {}'.format(VERSION))
+
+    arg_parser.add_argument("--rows",
+                            dest="ROWS",
+                            help="numbers of rows, default=100000,1000000,10000000",
+                            type=str,
+                            metavar='INT[,INT...]',
+                            default="100000,1000000,10000000")
+    arg_parser.add_argument("--sample",
+                            dest="SAMPLE",
+                            help="number of rows to compare with reference, default=100000",
+                            type=int,
+                            metavar='INT',
+                            default=100000)
+    arg_parser.add_argument("--operation",
+                            dest="OPERATION",
+                            help="names of operations to measure, default=all",
+                            type=str,
+                            metavar='NAME[,NAME...]',
+                            default=None)
+    arg_parser.add_argument("--no_memory", dest="NO_MEMORY", help="peak memory is not measured", action="store_true", default=False)
+    arg_parser.add_argument("--seed", dest="SEED", help="seed of random generator, default=0", type=int, metavar='INT', default=0)
+    arg_parser.add_argument("--output",
+                            dest="OUTPUT",
+                            help="path of csv file of results, default=csv_trimtime_bench.csv",
+                            type=str,
+                            metavar='FILE',
+                            default="csv_trimtime_bench.csv")
+
+    args = arg_parser.parse_args()
+    return args
+
+
+def make_timestamps(n_rows, seed=0):
+    """make random timestamps
+
+    :param n_rows: number of timestamps
+    :param seed: seed of random generator
+    :returns: series of datetime64
+    :rtype: pandas.Series
+
+    """
+    rng = np.random.default_rng(seed)
+    t_start = pd.Timestamp("1990-01-01").value
+    t_end = pd.Timestamp("2040-01-01").value
+    values = rng.integers(t_start, t_end, n_rows)
+    values = values - values % 1000  # in micro seconds
+    return pd.Series(pd.to_datetime(values))
+
+
+def make_sorted_timestamps(n_rows, seed=0):
+    """make sorted timestamps, every second with random gaps
+
+    :param n_rows: number of timestamps
+    :param seed: seed of random generator
+    :returns: series of datetime64
+    :rtype: pandas.Series
+
+    """
+    rng = np.random.default_rng(seed)
+    steps = np.where(rng.random(n_rows) < 0.001, rng.integers(60, 3600, n_rows), 1)
+    steps[0] = 0
+    seconds = np.cumsum(steps)
+    return pd.Series(pd.Timestamp("2021-01-01") + pd.to_timedelta(seconds, unit="s"))
+
+
+def make_frame(n_rows, seed=0):
+    """make synthetic data
+
+    :param n_rows: number of rows
+    :param seed: seed of random generator
+    :returns: dataframe that has columns 'T', 'R', 'V' and 'S', see remark of init()
+    :rtype: pandas.DataFrame
+
+    """
+    rng = np.random.default_rng(seed)
+    ds_t = make_sorted_timestamps(n_rows, seed=seed)
+    df = pd.DataFrame({
+        "T": ds_t,
+        "R": make_timestamps(n_rows, seed=seed),
+        "V": np.cumsum(rng.normal(size=n_rows)).round(3),
+        "S": np.datetime_as_string(ds_t.to_numpy(), unit="s").astype(object)
+    })
+    return df
+
+
+def legacy_groupby_gap(df, column_name, gap):
+    """group by gap, as groupby_gap did before optimization
+
+    :param df: dataframe
+    :param column_name: name of column
+    :param gap: numerical value or datetime.timedelta
+    :returns: group ids
+    :rtype: pandas.Series
+
+    """
+    dt_s = pd.Series([False] * len(df), index=df.index, dtype="boolean")
+    dt_s.loc[df[column_name].diff().abs() > gap] = True
+    groups = pd.Series(np.nan, index=df.index)
+    groups.loc[dt_s] = list(range(1, len(dt_s.loc[dt_s]) + 1))
+    groups.iat[0] = 0
+    return groups.ffill().astype("int64")
+
+
+def legacy_decomp_datetime(ds):
+    """decompose datetime by accessors of pandas, as decomp_datetime did before optimization
+
+    :param ds: series of datetime64
+    :returns: dataframe of parts
+    :rtype: pandas.DataFrame
+
+    """
+    result = pd.DataFrame(index=ds.index)
+    for d_p in ct.DECOMP_PARTS:
+        cname = "{}_{}".format(ds.name, d_p)
+        if d_p == "week":
+            result[cname] = ds.dt.isocalendar().week
+        else:
+            result[cname] = getattr(ds.dt, d_p)
+    return result
+
+
+def select_datetime_definition(df):
+    """definition of '--select_datetime' for range of middle half of data
+
+    :param df: synthetic data
+    :returns: definition
+    :rtype: str
+
+    """
+    n_rows = len(df)
+    t_start = df["T"].iloc[n_rows // 4].strftime(TIME_FORMAT_ESCAPED)
+    t_end = df["T"].iloc[n_rows * 3 // 4].strftime(TIME_FORMAT_ESCAPED)
+    return "T:{}:{},{}".format(TIME_FORMAT_ESCAPED, t_start, t_end)
+
+
+def streaming_resample(df, resample_def, resample_func):
+    """resample by StreamingResampler, data is given in chunks
+
+    :param df: dataframe
+    :param resample_def: definition of '--resample'
+    :param resample_func: function of aggregation
+    :returns: resampled dataframe
+    :rtype: pandas.DataFrame
+
+    """
+    resampler = ct.StreamingResampler(*ct.parse_resample_definition(resample_def), resample_func)
+    results = []
+    for i_start in range(0, len(df), STREAMING_CHUNKSIZE):
+        results.append(resampler.feed(df.iloc[i_start:i_start + STREAMING_CHUNKSIZE].copy()))
+    results.append(resampler.flush())
+    return pd.concat([v for v in results if v is not None])
+
+
+def make_operations():
+    """operations to measure
+
+    :returns: list of (name, function, reference function or None), function takes dataframe and returns result.
+    :rtype: list
+
+    """
+    operations = [
+        ("parse_datetime", lambda df: ct.to_datetime_column(df, "S", TIME_FORMAT), lambda df: pd.to_datetime(df["S"], format=TIME_FORMAT)),
+        ("change_timefreq:H", lambda df: ct.change_time_frequency(df, ["F=T:{}:floor:H".format(TIME_FORMAT_ESCAPED)])["F"],
+         lambda df: df["T"].dt.floor("H").dt.strftime(TIME_FORMAT)),
+    ]
+    for t_freq in ct.CALENDAR_FREQS:
+        for t_method in ["floor", "ceil", "round"]:
+            key = (t_method, t_freq)
+            reference = None
+            if key in LEGACY_BUCKETS:
+                reference = lambda df, key=key: df["R"].apply(LEGACY_BUCKETS[key])
+            operations.append(("calendar_bucket:{}:{}".format(t_freq, t_method),
+                               lambda df, t_freq=t_freq, t_method=t_method: ct.calendar_bucket(df["R"], t_freq, t_method), reference))
+    operations += [
+        ("decompose_datetime", lambda df: ct.decomp_datetime(df, "R::all").filter(like="R_"), lambda df: legacy_decomp_datetime(df["R"])),
+        ("timestamp", lambda df: ct.evaluate_timestamp(df, ["TS:R"])["TS"],
+         lambda df: pd.Series(list(map(lambda x: x.timestamp(), df["R"].dt.to_pydatetime())))),
+        ("elapsed_time", lambda df: ct.calculate_elapsed_time(df, ["E=R"])["E"],
+         lambda df: (df["R"] - df["R"][0]).apply(lambda x: x.total_seconds())),
+        ("time_diff", lambda df: ct.calculate_time_diff(df, ["D=R"])["D"], lambda df: df["R"].diff(1).apply(lambda x: x.total_seconds())),
+        ("time_gap", lambda df: ct.groupby_time_gap(df, ["G=T::60"])["G"], lambda df: legacy_groupby_gap(df, "T", timedelta(seconds=60))),
+        ("value_gap", lambda df: ct.groupby_value_gap(df, ["G=V:1"])["G"], lambda df: legacy_groupby_gap(df, "V", 1)),
+        ("resample:mean", lambda df: ct.do_rsampling(df, "T:1H:V", "mean"), lambda df: df.set_index("T")[["V"]].resample("1H").mean()),
+        ("resample_streaming:max", lambda df: streaming_resample(df, "T:1H:V", "max"), lambda df: ct.do_rsampling(df, "T:1H:V", "max")),
+        ("select_datetime", lambda df: ct.do_select_datetime(df, select_datetime_definition(df)),
+         lambda df: df.loc[(df["T"] >= df["T"].iloc[len(df) // 4]) & (df["T"] <= df["T"].iloc[len(df) * 3 // 4])]),
+        ("select_hours", lambda df: ct.do_select_hours(df, "T:09\\:00,17\\:00"),
+         lambda df: df.set_index("T").iloc[df.set_index("T").index.indexer_between_time("09:00", "17:00")]),
+        ("get_range_of_time", lambda df: pd.Series(ct.do_get_range_time(df, "T:H")[0]),
+         lambda df: pd.Series((df["T"].max() - df["T"].min()).total_seconds() / 3600)),
+        ("sort_datetime", lambda df: ct.sort_time_column(df, "R"), None),
+    ]
+    return operations
+
+
+def run_operation(func, df):
+    """run operation, messages to stderr are discarded
+
+    :param func: function of operation
+    :param df: dataframe, that may be modified by operation
+    :returns: result and elapsed time[sec]
+    :rtype: tuple
+
+    """
+    with redirect_stderr(io.StringIO()):
+        t_0 = time.perf_counter()
+        result = func(df)
+        elapsed = time.perf_counter() - t_0
+    return result, elapsed
+
+
+def measure_peak_memory(func, df):
+    """peak memory of operation, that is traced by tracemalloc
+
+    :param func: function of operation
+    :param df: dataframe, that may be modified by operation
+    :returns: peak memory[MB]
+    :rtype: float
+    :remark:
+       memory of given dataframe is not included.
+
+    """
+    tracemalloc.start()
+    try:
+        run_operation(func, df)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+
+def to_csv_text(result):
+    """csv text of result, that is used to compare results
+
+    :param result: dataframe or series
+    :returns: csv text
+    :rtype: str
+
+    """
+    if isinstance(result, pd.Series):
+        result = result.reset_index(drop=True).to_frame("value")
+        return result.to_csv(index=False)
+    return result.to_csv()
+
+
+def print_result(name, n_rows, elapsed, status=""):
+    print("{:<24s} rows={:>10d} time={:>10.3f}s rows/sec={:>14,.0f} {}".format(name, n_rows, elapsed, n_rows / max(elapsed, 1e-9), status))
+
+
+if __name__ == "__main__":
+    args = init()
+    rows_list = [int(v) for v in args.ROWS.split(",")]
+    n_sample = args.SAMPLE
+
+    operations = make_operations()
+    if args.OPERATION is not None:
+        op_names = args.OPERATION.split(",")
+        unknown_names = [v for v in op_names if v not in [op[0] for op in operations]]
+        if len(unknown_names) > 0:
+            print("??error:csv_trimtime_bench:unknown operations:{}, available:{}".format(unknown_names, [op[0] for op in operations]),
+                  file=sys.stderr)
+            sys.exit(1)
+        operations = [op for op in operations if op[0] in op_names]
+
+    results = []
+    check_status = {}
+    n_failed = 0
+    if n_sample > 0:
+        print("%inf:csv_trimtime_bench:comparing with reference on {} rows".format(n_sample), file=sys.stderr)
+        df_sample = make_frame(n_sample, seed=args.SEED)
+        for name, func, reference in operations:
+            if reference is None:
+                continue
+            result, _ = run_operation(func, df_sample.copy())
+            expected, elapsed = run_operation(reference, df_sample.copy())
+            if to_csv_text(result) == to_csv_text(expected):
+                check_status[name] = "same"
+            else:
+                check_status[name] = "different"
+                n_failed += 1
+            print_result("{}:reference".format(name), n_sample, elapsed, "{} as reference".format(check_status[name]))
+            results.append({
+                "operation": "{}:reference".format(name),
+                "rows": n_sample,
+                "seconds": elapsed,
+                "rows_per_sec": n_sample / max(elapsed, 1e-9),
+                "peak_memory_mb": np.nan,
+                "check": check_status[name]
+            })
+
+    for n_rows in rows_list:
+        print("%inf:csv_trimtime_bench:generating {} rows".format(n_rows), file=sys.stderr)
+        df = make_frame(n_rows, seed=args.SEED)
+        for name, func, _ in operations:
+            _, elapsed = run_operation(func, df.copy())
+            peak_mb = np.nan if args.NO_MEMORY else measure_peak_memory(func, df.copy())
+            status = check_status.get(name, "")
+            print_result(name, n_rows, elapsed, "peak={:.1f}MB {}".format(peak_mb, status))
+            results.append({
+                "operation": name,
+                "rows": n_rows,
+                "seconds": elapsed,
+                "rows_per_sec": n_rows / max(elapsed, 1e-9),
+                "peak_memory_mb": peak_mb,
+                "check": status
+            })
+        del df
+
+    pd.DataFrame(results).to_csv(args.OUTPUT, index=False)
+    print("%inf:csv_trimtime_bench:results were written into {}".format(args.OUTPUT), file=sys.stderr)
+
+    if n_failed > 0:
+        print("??error:csv_trimtime_bench:{} results were different from reference".format(n_failed), file=sys.stderr)
+        sys.exit(1)
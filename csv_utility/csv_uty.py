@@ -18,6 +18,11 @@ import textwrap
 import sys
 
 import re
+import io
+import ast
+import heapq
+import pickle
+import tempfile
 from pathlib import Path
 from distutils.version import LooseVersion
 
@@ -27,6 +32,15 @@ import numpy as np
 
 import pandas as pd
 
+NUMEXPR_PKG = True
+try:
+    import numexpr as ne
+except Exception as e:
+    NUMEXPR_PKG = False
+
+sys.path.insert(0, format(Path(__file__).parent))
+from csv_reader import add_reader_argument, read_csv
+
 VERSION = 1.0
 PANDAS_MIN_VERSION = "1.1.3"
 if LooseVersion(PANDAS_MIN_VERSION) > LooseVersion(pd.__version__):
@@ -105,6 +119,19 @@ remark:
   For '--split_into_columns', the separactor is sigle character or regexp.
   If named parameter is used, the names are names of columns in the result. see example.
 
+  When '--chunksize' was given, input is read and processed in chunks that have given number of rows, and each result is written
+  into output one by one. So size of memory is independent of size of the input.
+  In this streaming mode, only processings that need only values in each row are available:
+    '--serial_column', '--drop_columns[_regex]', '--drop_rows', '--drop_na_columns', '--change_timefreq', '--add_columns',
+    '--trim_columns', '--type_columns', '--fillna'(without '@'), '--replace', '--split_into_rows', '--rename_columns'
+  and '--sort', '--sort_datetime' are done by external merge sort: each chunk is sorted and stored into temporary file,
+  that is in TMPDIR, and those are merged at last.
+  '--drop_duplicated' is done by hashing values into 64-bit digests, first occurrences are kept. When number of digests is too large,
+  rows are partitioned into temporary files by digests and those are processed at last.
+  Others, that need entire data, cause an error. Only 'csv' is available as output format in this mode.
+  Index of row in '--drop_rows' out of range is found after the last chunk, so it causes an error after rows were written.
+  NOTE: result of '--type_columns' and numerical results of '--add_columns' are evaluated in each chunk.
+
   output format:
     csv      : comma-separated values (csv) file
     hdf      : HDF5 file using HDFStore
@@ -152,6 +179,7 @@ example:
 
   csv_uty.py --trim_columns=D="lambda x: int(x\,0)" test1.csv # convert binary string into decimal value.
   csv_uty.py --type_columns=A=float,B=bin test2.csv
+  csv_uty.py --type_columns=A=hex:4,B=bin:8 test2.csv
 
   csv_uty.py --decompose_bit_string=D:16 test1.csv |csvlook -I
   csv_uty.py --decompose_bit_string=A,B,C,D --rename_columns=A_B000:BIT_A,A_B001:BIT_B test1.csv
@@ -207,6 +235,9 @@ example:
 
   csv_uty.py --output_format=hdf --output=test.dat bit-pattern-headers.csv
 
+  csv_uty.py --chunksize=100 --drop_na_columns=all --add_columns='NCOL3=${ABC005}.astype(int)*2' big_sample_headers.csv
+  csv_uty.py --chunksize=100 --sort="desc|ABC004,ABC005" big_sample_headers.csv
+
   input: test1.csv
   A,B,C,D
   1,2,3,0b01010
@@ -292,7 +323,7 @@ example:
                             default=None)
     arg_parser.add_argument("--type_columns",
                             dest="DTYPE",
-                            help="data type for each column:type=str, int, float, bin, oct, hex",
+                            help="data type for each column:type=str, int, float, bin[:DIGITS], oct[:DIGITS], hex[:DIGITS]",
                             type=str,
                             metavar='COLUMN=type[,COLUMN=type..]',
                             default=None)
@@ -353,6 +384,12 @@ example:
     arg_parser.add_argument("--transpose", dest="TRANS", help="transpose dataframe", action="store_true", default=False)
 
     arg_parser.add_argument("--output_format", dest="OFORMAT", help="output format", choices=OUTPUT_FORMAT, default="csv")
+    arg_parser.add_argument("--chunksize",
+                            dest="CHUNKSIZE",
+                            help="number of rows in each chunk for streaming mode, see remark",
+                            type=int,
+                            metavar='INT',
+                            default=None)
     arg_parser.add_argument("--columns_regex",
                             dest="OCOLS_REGEX",
                             help="pattern of column names to output",
@@ -376,6 +413,7 @@ example:
     arg_parser.add_argument('csv_file', metavar='CSV_FILE', help='file to read. if "-", stdin is used')
     # arg_parser.add_argument('infile', nargs='?', type=argparse.FileType('r'), default=sys.stdin)
     # arg_parser.add_argument('outfile', nargs='?', type=argparse.FileType('w'), default=sys.stdout)
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -436,11 +474,16 @@ def trim_output_file(output_file, mkdir=True, overwrite=True):
             raise Exception("{} already exists".format(output_file))
 
 
+RADIX_TYPES = {"bin": (2, "0b"), "oct": (8, "0o"), "hex": (16, "0x")}
+
+
 def type_columns_in_df(df, typ_columns):
     """ set type of columns at output results
 
     :param df: dataframe that will be modified inplace
     :param type_columns: list of definitions
+    :remark:
+       for 'bin', 'oct' and 'hex', number of digits may be given as 'bin:32', default is 16.
 
     """
     print("%inf:csv_uty:type_columns:{}".format(typ_columns), file=sys.stderr)
@@ -450,16 +493,11 @@ def type_columns_in_df(df, typ_columns):
             typ = cs[1]
             if cs[0] in df.columns:
                 try:
-                    if typ == "bin":
-                        df[cs[0]] = df[cs[0]].astype(str, errors="ignore")
-                        # print(df[cs[0]].dtype)
-                        df[cs[0]] = df[cs[0]].apply(lambda x: ("0b{:016b}".format(int(x, 0)) if x != "nan" else x))
-                    elif typ == "oct":
-                        df[cs[0]] = df[cs[0]].astype(str, errors="ignore")
-                        df[cs[0]] = df[cs[0]].apply(lambda x: ("0b{:016o}".format(int(x, 0)) if x != "nan" else x))
-                    elif typ == "hex":
-                        df[cs[0]] = df[cs[0]].astype(str, errors="ignore")
-                        df[cs[0]] = df[cs[0]].apply(lambda x: ("0b{:016x}".format(int(x, 0)) if x != "nan" else x))
+                    tcs = re.split(r"\s*:\s*", typ)
+                    if tcs[0] in RADIX_TYPES:
+                        width = int(tcs[1]) if len(tcs) > 1 else 16
+                        base, prefix = RADIX_TYPES[tcs[0]]
+                        df[cs[0]] = series_to_radix(df[cs[0]], base, width=width, prefix=prefix)
                     else:
                         df[cs[0]] = df[cs[0]].astype(cs[1])
                 except ValueError as e:
@@ -493,36 +531,138 @@ def trim_columns_in_df(df, fmt_columns):
             print("#warning:csv_uty:trim_columns: invalid definitin for triming columns:{}".format(fc), file=sys.stderr)
 
 
+# nodes of expression that may be evaluated by numexpr
+NUMEXPR_AST_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Name, ast.Load, ast.Constant, ast.Add, ast.Sub, ast.Mult,
+                     ast.Div, ast.Pow, ast.USub, ast.UAdd, ast.Invert, ast.BitAnd, ast.BitOr, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt,
+                     ast.GtE)
+
+ADD_COLUMNS_CACHE = {}
+
+
+def compile_add_column(definition):
+    """parse and compile definition of '--add_columns'
+
+    :param definition: 'COLUMN=expr'
+    :returns: None for invalid definition, or dict of compiled results:
+              "column": name of column to add, "expr": expression with 'df[...]',
+              "code": code object of "expr", "columns": list of referred columns,
+              "ne_expr": expression for numexpr, that is None if the expression is not pure numerical.
+    :rtype: dict
+    :remark:
+       results are cached in ADD_COLUMNS_CACHE, so each definition is compiled only once in streaming mode.
+
+    """
+    if definition in ADD_COLUMNS_CACHE:
+        return ADD_COLUMNS_CACHE[definition]
+
+    cs = re.split(r"\s*=\s*", definition, maxsplit=1)
+    if len(cs) < 2:
+        return None
+    columns = []
+
+    def column_to_name(m):
+        if m.group(1) not in columns:
+            columns.append(m.group(1))
+        return "__col{}__".format(columns.index(m.group(1)))
+
+    rcs = cs[1]
+    # rcs = re.sub(r'\$(\w+)', r'df["\1"]', rcs)
+    # rcs = re.sub(r'\$([\w:;@_；：＠＿\(\)（）]+)', r'df["\1"]', rcs)
+    ne_rcs = re.sub(r'\${([^}]+)}', column_to_name, rcs)
+    rcs = re.sub(r'\${([^}]+)}', r'df["\1"]', rcs)
+    rcs = re.sub(r'(0b[01]+|0o[0-7]+|0x[0-9a-f]+)', lambda m: str(int(m.group(1), 0)), rcs, flags=re.IGNORECASE)
+    rcs = re.sub(r'\\,', r',', rcs)
+    ne_rcs = re.sub(r'(0b[01]+|0o[0-7]+|0x[0-9a-f]+)', lambda m: str(int(m.group(1), 0)), ne_rcs, flags=re.IGNORECASE)
+    ne_rcs = re.sub(r'\\,', r',', ne_rcs)
+    try:
+        code = compile(rcs, "<add_columns:{}>".format(cs[0]), "eval")
+    except SyntaxError as e:
+        print("??Error:csv_uty:add_columns:invalid expression:{}={}:{}".format(cs[0], rcs, e), file=sys.stderr)
+        sys.exit(1)
+
+    if NUMEXPR_PKG and len(columns) > 0 and is_numerical_expression(ne_rcs, len(columns)):
+        print("%Inf:csv_uty:add columns:numerical expression for numexpr:{}".format(ne_rcs), file=sys.stderr)
+    else:
+        ne_rcs = None
+
+    result = {"column": cs[0], "expr": rcs, "code": code, "columns": columns, "ne_expr": ne_rcs}
+    ADD_COLUMNS_CACHE[definition] = result
+
+    return result
+
+
+def is_numerical_expression(expr, n_columns):
+    """check that expression has only arithmetic, comparison and logical operators for numerical values
+
+    :param expr: expression, in which columns are written as '__col<n>__'
+    :param n_columns: number of columns in expression
+    :returns: True if expression may be evaluated by numexpr
+    :rtype: bool
+
+    """
+    try:
+        tree = ast.parse(expr, mode="eval")
+    except SyntaxError:
+        return False
+    col_names = ["__col{}__".format(i) for i in range(n_columns)]
+    for node in ast.walk(tree):
+        if not isinstance(node, NUMEXPR_AST_NODES):
+            return False
+        if isinstance(node, ast.Name) and node.id not in col_names:
+            return False
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            return False
+
+    return True
+
+
 def add_columns_to_df(df, add_columns):
     """add or replace columns as result of evaluating expression
 
     :param df: dataframe that will be modified inplace.
     :param add_columns: list of defitions
+    :remark:
+       If expression is pure numerical and all columns in the expression have numerical values,
+       the expression is evaluated by numexpr(if it is available).
 
     """
 
     print("%inf:csv_uty:add_columns:{}".format(add_columns), file=sys.stderr)
     for ac in add_columns:
-        cs = re.split(r"\s*=\s*", ac, maxsplit=1)
-        if len(cs) >= 2:
-            # if cs[0] in df.columns:
-            #     print("??Error:csv_uty:add_columns:{} was already exists".format(cs[0]), file=sys.stderr)
-            #     exit(1)
-            rcs = cs[1]
-            # rcs = re.sub(r'\$(\w+)', r'df["\1"]', rcs)
-            # rcs = re.sub(r'\$([\w:;@_；：＠＿\(\)（）]+)', r'df["\1"]', rcs)
-            rcs = re.sub(r'\${([^}]+)}', r'df["\1"]', rcs)
-            rcs = re.sub(r'(0b[01]+|0o[0-7]+|0x[0-9a-f]+)', lambda m: str(int(m.group(1), 0)), rcs, re.IGNORECASE)
-            rcs = re.sub(r'\\,', r',', rcs)
+        n_cache = len(ADD_COLUMNS_CACHE)
+        acd = compile_add_column(ac)
+        if acd is None:
+            print("#warning:csv_uty:add_columns: invalid definitin for add columns:{}".format(ac), file=sys.stderr)
+            continue
+        if len(ADD_COLUMNS_CACHE) > n_cache:
+            print("%Inf:csv_uty:add columns:df[\"{}\"]={}".format(acd["column"], acd["expr"]), file=sys.stderr)
+
+        # if acd["column"] in df.columns:
+        #     print("??Error:csv_uty:add_columns:{} was already exists".format(acd["column"]), file=sys.stderr)
+        #     exit(1)
+        rest_cols = [v for v in acd["columns"] if v not in df.columns]
+        if len(rest_cols) > 0:
+            print("??Error:csv_uty:add_columns_to_df:{}={}:columns not found:{}".format(acd["column"], acd["expr"], rest_cols),
+                  file=sys.stderr)
+            sys.exit(1)
+
+        if acd["ne_expr"] is not None and all([isinstance(df[v].dtype, np.dtype) and df[v].dtype.kind in "biuf" for v in acd["columns"]]):
+            local_dict = {"__col{}__".format(i): df[v].to_numpy() for i, v in enumerate(acd["columns"])}
             try:
-                estr = 'df["{}"]={}'.format(cs[0], rcs)
-                print("%Inf:csv_uty:add columns:{}".format(estr), file=sys.stderr)
-                exec(estr)
-            except TypeError as e:
-                print("??Error:csv_uty:add_columns_to_df:{}={}:{}".format(cs[0], rcs, e), file=sys.stderr)
+                df[acd["column"]] = ne.evaluate(acd["ne_expr"], local_dict=local_dict)
+                continue
+            except (NotImplementedError, TypeError, ValueError, KeyError):
+                # ex. bit operation for integer, those are evaluated by python.
+                pass
 
-        else:
-            print("#warning:csv_uty:add_columns: invalid definitin for add columns:{}".format(ac), file=sys.stderr)
+        try:
+            df[acd["column"]] = eval(acd["code"], globals(), {"df": df})
+        except TypeError as e:
+            print("??Error:csv_uty:add_columns_to_df:{}={}:{}".format(acd["column"], acd["expr"], e), file=sys.stderr)
+
+
+PREFIX_SAMPLE_SIZE = 100
+PREFIX_BASE = {"0b": 2, "0o": 8, "0x": 16}
 
 
 def prefix_number_to_int(df):
@@ -531,14 +671,49 @@ def prefix_number_to_int(df):
     :param df: dataframe that will be modified inplace.
     :returns: information of modified columns
     :rtype: list of dict
+    :remark:
+       columns are selected by first PREFIX_SAMPLE_SIZE values that are not NA,
+       all of those must have the same prefix, '0b', '0o' or '0x'.
+       values are converted into int64(or uint64) in bulk, and nullable integer is used if there are NA.
 
     """
     done_columns = []
     for col in df.columns:
-        val = str(df[col][0])
-        if re.match(r'^(0x[a-f0-9]|0o[0-7]+|0b[01]+)$', val, re.IGNORECASE) is not None:
-            df[col] = df[col].map(lambda x: int(x, 0), na_action='ignore')
-            done_columns.append({"column": col, "mode": val[:2], "length": len(val) - 2})
+        ds = df[col]
+        if format(ds.dtype) != "string" and format(ds.dtype) != "object":
+            continue
+        na_mask = ds.isna().to_numpy()
+        sample = ds[~na_mask].head(PREFIX_SAMPLE_SIZE).astype(str)
+        if len(sample) == 0 or not sample.str.match(r'^(0x[a-f0-9]+|0o[0-7]+|0b[01]+)$', case=False).all():
+            continue
+        val = sample.iloc[0]
+        mode = val[:2].lower()
+        if (sample.str.slice(0, 2).str.lower() != mode).any():
+            continue
+
+        codes, lengths = strings_to_codes(ds.to_numpy(dtype=object)[~na_mask])
+        values, neg, bases, done = parse_int_codes(codes, lengths)
+        done &= ~neg & (bases == PREFIX_BASE[mode])
+        if not done.all():
+            # values that have more than 64 bits or other prefix
+            try:
+                df[col] = ds.map(lambda x: int(x, 0), na_action='ignore')
+            except ValueError as e:
+                print("#warning:csv_uty:prefix_number_to_int:{} was not converted:{}".format(col, e), file=sys.stderr)
+                continue
+        else:
+            if len(values) == 0 or values.max() < np.uint64(2**63):
+                values = values.astype(np.int64)
+                dtype = "Int64"
+            else:
+                dtype = "UInt64"
+            if na_mask.any():
+                res = np.zeros(len(ds), dtype=values.dtype)
+                res[~na_mask] = values
+                df[col] = pd.Series(pd.arrays.IntegerArray(res, na_mask), index=ds.index, dtype=dtype)
+            else:
+                df[col] = pd.Series(values, index=ds.index)
+        done_columns.append({"column": col, "mode": val[:2], "length": len(val) - 2})
     return done_columns
 
 
@@ -553,8 +728,27 @@ def int_to_prefix_numer(df, done_columns):
         col = col_d["column"]
         mode = col_d["mode"]
         slen = col_d["length"]
+        ds = df[col]
+        if ds.dtype.kind in "biuf":
+            na_mask = ds.isna().to_numpy()
+            if ds.dtype.kind == "f":
+                values = np.trunc(ds.to_numpy(dtype=np.float64, na_value=0)[~na_mask])
+                if len(values) > 0 and np.abs(values).max() >= 2**63:
+                    values = None
+                else:
+                    values = values.astype(np.int64)
+            elif ds.dtype.kind == "u":
+                values = ds.to_numpy(dtype=np.uint64, na_value=0)[~na_mask]
+            else:
+                values = ds.to_numpy(dtype=np.int64, na_value=0)[~na_mask]
+            if values is not None:
+                res = np.full(len(ds), np.nan, dtype=object)
+                res[~na_mask] = format_radix(values, PREFIX_BASE[mode.lower()], width=slen, prefix=mode, upper=(mode[1] == "X"))
+                df[col] = pd.Series(res, index=ds.index)
+                continue
+
         fmt = "#0{}{}".format(slen + 2, mode[1])
-        df[col] = df[col].map(lambda x: format(int(x), fmt), na_action='ignore')
+        df[col] = ds.map(lambda x: format(int(x), fmt), na_action='ignore')
 
 
 def parse_drop_rows(d_rows):
@@ -578,6 +772,242 @@ def parse_drop_rows(d_rows):
     return result
 
 
+RADIX_MAX_DIGITS = {2: 64, 8: 21, 10: 19, 16: 16}
+RADIX_FORMAT = {2: "b", 8: "o", 10: "d", 16: "x"}
+
+
+# lookup table from code point into digit, 255 means invalid digit
+DIGIT_TABLE = np.full(128, 255, dtype=np.uint8)
+DIGIT_TABLE[ord("0"):ord("9") + 1] = range(10)
+DIGIT_TABLE[ord("a"):ord("f") + 1] = range(10, 16)
+DIGIT_TABLE[ord("A"):ord("F") + 1] = range(10, 16)
+
+
+def strings_to_codes(ss):
+    """convert strings into matrix of code points
+
+    :param ss: pandas.Series or numpy.ndarray of str
+    :returns: matrix of code points, that is padded by 0, and length of each string
+    :rtype: (numpy.ndarray(uint32, shape=(n, width)), numpy.ndarray(int64))
+
+    """
+    if isinstance(ss, pd.Series):
+        ss = ss.to_numpy(dtype=object)
+    arr = np.asarray(ss, dtype=str)
+    if len(arr) == 0:
+        arr = np.array([], dtype="U1")
+    codes = arr.view(np.uint32).reshape(len(arr), -1)
+    lengths = (codes != 0).sum(axis=1)
+
+    return codes, lengths
+
+
+def parse_int_codes(codes, lengths, base=None):
+    """parse matrix of code points as integers in bulk
+
+    :param codes: result of strings_to_codes
+    :param lengths: result of strings_to_codes
+    :param base: radix of digits without prefix. if None, sign and prefix '0b','0o','0x' are parsed as 'int(x, 0)'
+    :returns: absolute values, flags of negative, radix and flags of success for each string
+    :rtype: (numpy.ndarray(uint64), numpy.ndarray(bool), numpy.ndarray(int64), numpy.ndarray(bool))
+    :remark:
+       strings, that are empty or have invalid digits or more digits than RADIX_MAX_DIGITS, are not converted.
+       white spaces and '_' are not accepted, those may be parsed by 'int()'.
+
+    """
+    n, w = codes.shape
+    neg = np.zeros(n, dtype=bool)
+    start = np.zeros(n, dtype=np.int64)
+    bases = np.full(n, 10 if base is None else base, dtype=np.int64)
+    if base is None and w > 0:
+        rows = np.arange(n)
+        neg = codes[:, 0] == ord("-")
+        start = (neg | (codes[:, 0] == ord("+"))).astype(np.int64)
+        c_0 = codes[rows, np.minimum(start, w - 1)]
+        c_p = codes[rows, np.minimum(start + 1, w - 1)] | 0x20  # lower case
+        for p, b in PREFIX_BASE.items():
+            has_prefix = (c_0 == ord("0")) & (c_p == ord(p[1])) & (start + 1 < lengths)
+            bases[has_prefix] = b
+            start[has_prefix] += 2
+
+    digits = DIGIT_TABLE[np.minimum(codes.T, 127)]
+    values = np.zeros(n, dtype=np.uint64)
+    done = np.ones(n, dtype=bool)
+    u_bases = bases.astype(np.uint64) if base is None else np.uint64(base)
+    for j in range(w):
+        active = (j >= start) & (j < lengths)
+        d_j = digits[j]
+        done &= ~active | (d_j < u_bases)
+        values = np.where(active, values * u_bases + d_j, values)
+    n_digits = lengths - start
+    max_digits = np.zeros(n, dtype=np.int64)
+    for b, nd in RADIX_MAX_DIGITS.items():
+        max_digits[bases == b] = nd
+    done &= (n_digits >= 1) & (n_digits <= max_digits)
+    if base is None and w > 0:
+        # decimal with leading zeros is invalid for 'int(x, 0)'
+        rows = np.arange(n)
+        done &= ~((bases == 10) & (codes[rows, np.minimum(start, w - 1)] == ord("0")) & (values != 0))
+    values[~done] = 0
+
+    return values, neg, bases, done
+
+
+def digits_to_uint64(ds, base):
+    """convert strings of digits without prefix into unsigned integers in bulk
+
+    :param ds: pandas.Series of strings
+    :param base: radix, 2, 8, 10 or 16
+    :returns: array of values and array of flags that the value was converted
+    :rtype: (numpy.ndarray(uint64), numpy.ndarray(bool))
+    :remark:
+       strings, that are empty or have invalid digits or more digits than RADIX_MAX_DIGITS[base], are not converted,
+       and those values are 0 in results.
+
+    """
+    codes, lengths = strings_to_codes(ds)
+    values, _, _, done = parse_int_codes(codes, lengths, base=base)
+
+    return values, done
+
+
+def parse_int_strings(ds):
+    """convert strings of integer into integers in bulk, like 'int(x, 0)'
+
+    :param ds: pandas.Series of strings, that may have sign and prefix '0b','0o','0x'
+    :returns: values for elements that are not NA, and flags of NA
+    :rtype: (numpy.ndarray(int64 or object), numpy.ndarray(bool))
+    :remark:
+       values that are out of range of int64 are returned as array of python int.
+       ValueError will be raised for invalid string, as 'int(x, 0)'.
+
+    """
+    na_mask = ds.isna().to_numpy()
+    ss = ds.to_numpy(dtype=object)[~na_mask]
+    codes, lengths = strings_to_codes(ss)
+    mags, neg, _, done = parse_int_codes(codes, lengths)
+    done &= np.where(neg, mags <= np.uint64(2**63), mags < np.uint64(2**63))
+    values = mags.astype(np.int64)
+    values[neg] = -values[neg]
+    if not done.all():
+        p_values = values.astype(object)
+        for ir in np.flatnonzero(~done):
+            p_values[ir] = int(ss[ir], 0)
+        if all([-2**63 <= v < 2**63 for v in p_values[~done]]):
+            values = p_values.astype(np.int64)
+        else:
+            values = p_values
+
+    return values, na_mask
+
+
+# lookup tables from byte into characters, for binary and hex: {base: {upper: table}}
+BYTE_DIGITS_TABLE = {
+    b: {u: np.array([list(format(i, f).encode()) for i in range(256)], dtype=np.uint8)
+        for u, f in [(False, fl), (True, fu)]}
+    for b, fl, fu in [(2, "08b", "08b"), (16, "02x", "02X")]
+}
+
+
+def format_radix(values, base, width=1, prefix="", upper=False, prefix_first=False):
+    """format integers into strings with given radix in bulk
+
+    :param values: numpy.ndarray of int64 or uint64
+    :param base: radix, 2, 8, 10 or 16
+    :param width: minimum number of digits, including '-' for negative value
+    :param prefix: prefix of each string, that is placed after '-'
+    :param upper: if True, upper case is used for hex digits
+    :param prefix_first: if True, prefix is placed before '-'
+    :returns: array of strings
+    :rtype: numpy.ndarray(object)
+    :remark:
+       results are the same as 'format(x, "#0{}x".format(width + len(prefix)))' for prefix='0x'.
+       all digits are computed for all values as matrix of characters, by lookup tables on each byte for binary and hex,
+       and they are trimmed for each group of the same length.
+
+    """
+    values = np.asarray(values)
+    result = np.empty(len(values), dtype=object)
+    if len(values) == 0:
+        return result
+    if values.dtype.kind == "i":
+        neg = values < 0
+        mags = np.where(neg, -values, values).astype(np.uint64)
+    else:
+        neg = np.zeros(len(values), dtype=bool)
+        mags = values.astype(np.uint64)
+    chars = np.frombuffer(b"0123456789ABCDEF" if upper else b"0123456789abcdef", dtype=np.uint8)
+    nd = len(np.base_repr(int(mags.max()), base))
+    if base in BYTE_DIGITS_TABLE:
+        # characters for each byte by lookup table
+        codes = BYTE_DIGITS_TABLE[base][upper][mags.astype(">u8").view(np.uint8).reshape(-1, 8)].reshape(len(mags), -1)
+        codes = codes[:, codes.shape[1] - nd:]
+    else:
+        codes = np.empty((len(values), nd), dtype=np.uint8)
+        shift = {8: 3}.get(base)
+        u_base = np.uint64(base)
+        for j in range(nd):
+            if shift is not None:
+                digits = (mags >> np.uint64(shift * j)) & np.uint64(base - 1)
+            else:
+                digits = mags % u_base
+                mags = mags // u_base
+            codes[:, nd - 1 - j] = chars[digits]
+    is_zero = codes == ord("0")
+    n_sig = nd - np.argmin(is_zero, axis=1)
+    n_sig[is_zero.all(axis=1)] = 1
+    n_width = np.maximum(n_sig, width - neg.astype(np.int64))
+    for nw in np.flatnonzero(np.bincount(n_width)):
+        for s_neg in (False, True):
+            rows = np.flatnonzero((n_width == nw) & (neg == s_neg))
+            if len(rows) == 0:
+                continue
+            elif len(rows) == len(values):
+                rows = slice(None)
+            lead = (prefix + "-" if prefix_first else "-" + prefix) if s_neg else prefix
+            lead = np.frombuffer(lead.encode(), dtype=np.uint8)
+            pad = np.full(max(nw - nd, 0), ord("0"), dtype=np.uint8)
+            w_codes = codes[rows, max(nd - nw, 0):]
+            if len(lead) + len(pad) > 0:
+                w_codes = np.concatenate([np.tile(np.concatenate([lead, pad]), (len(w_codes), 1)), w_codes], axis=1)
+            n_chars = w_codes.shape[1]
+            result[rows] = np.ascontiguousarray(w_codes).view("S{}".format(n_chars)).ravel().astype("U{}".format(n_chars))
+
+    return result
+
+
+def series_to_radix(ds, base, width=16, prefix=""):
+    """convert integers or strings of integer into strings with given radix
+
+    :param ds: pandas.Series
+    :param base: radix, 2, 8, 10 or 16
+    :param width: minimum number of digits
+    :param prefix: prefix of results, that is placed before '-'
+    :returns: Series of strings, NA is kept
+    :rtype: pandas.Series
+
+    """
+    if ds.dtype.kind in "iub":
+        na_mask = ds.isna().to_numpy()
+        values = ds[~na_mask].to_numpy(dtype=np.uint64 if ds.dtype.kind == "u" else np.int64)
+    elif ds.dtype.kind == "f":
+        na_mask = ds.isna().to_numpy()
+        values = ds[~na_mask].to_numpy()
+        if not (values == np.trunc(values)).all() or (len(values) > 0 and np.abs(values).max() >= 2**63):
+            raise ValueError("{} has values that are not integer".format(ds.name))
+        values = values.astype(np.int64)
+    else:
+        values, na_mask = parse_int_strings(ds)
+
+    res = np.full(len(ds), np.nan, dtype=object)
+    if values.dtype == object:
+        res[~na_mask] = [prefix + format(v, "0{}{}".format(width, RADIX_FORMAT[base])) for v in values]
+    else:
+        res[~na_mask] = format_radix(values, base, width=width, prefix=prefix, prefix_first=True)
+
+    return pd.Series(res, index=ds.index)
+
+
 def decomp_bits_pattern(df, column_name, nbits=0):
     """decompose string into character as bits pattern.
 
@@ -591,6 +1021,8 @@ def decomp_bits_pattern(df, column_name, nbits=0):
        If there was quatation, they is removed.
        If there are "100" and "200" in the same column, "100" is treated as binary string "0b100", 
         but "200" is treated as decimal value and results is ["1","1","0","0","1","0","0","0"].
+       All values are converted into uint64 at once and bits are expanded with numpy.unpackbits,
+       only values that have more than 64 bits are converted one by one.
 
     """
     print("%inf:csv_uty:decomp_bits:{}".format(column_name), file=sys.stderr)
@@ -599,43 +1031,74 @@ def decomp_bits_pattern(df, column_name, nbits=0):
     if format(ds.dtype) != "string" and format(ds.dtype) != "object":
         print("??Error:csv_uty:{} has no string.".format(column_name), file=sys.stderr)
         return
-    if nbits > 0:
-        cns = ["{}_B{:03d}".format(column_name, i) for i in range(nbits)]
-        df[cns] = 0
-        cnames = set(cns)
-    else:
-        cnames = set()
 
-    ds.fillna("0", inplace=True)
-    for ir in range(len(df)):
-        val = ds.loc[ir]
-        if val is np.nan or val is None:
+    ds = ds.fillna("0")
+    df[column_name] = ds
+    ds = ds.astype(str).str.strip('"\'')  # removing quotation
+    ds = ds.str.replace(r"\.0$", "", regex=True)  # removing the trailing ".0"
+    is_dec = ds.str.isdecimal()
+    is_bin = ds.str.startswith("0b")
+    is_oct = ds.str.startswith("0o")
+    is_hex = ds.str.startswith("0x") & ds.str.slice(2).str.isdecimal()
+    invalid = ~(is_dec | is_bin | is_oct | is_hex)
+    for val in ds[invalid]:
+        print("??Error:csv_uty:{} was not decimal value:{}".format(val, column_name), file=sys.stderr)
+
+    # decimal string that has only '0' and '1' is treated as bits pattern, and length of the pattern is kept.
+    is_bits = is_dec & ~ds.str.contains(r"[^01]")
+    is_dec = is_dec & ~is_bits
+    values = np.zeros(len(ds), dtype=np.uint64)
+    n_bits = np.zeros(len(ds), dtype=np.int64)
+    done = np.zeros(len(ds), dtype=bool)
+    for mask, base, digits in [(is_bits, 2, ds), (is_dec, 10, ds), (is_bin, 2, ds.str.slice(2)), (is_oct, 8, ds.str.slice(2)),
+                               (is_hex, 16, ds.str.slice(2))]:
+        mask = mask.to_numpy()
+        if not mask.any():
             continue
-        val = val.strip('"\'')  # removing quotation
-        val = re.sub(r"\.0$", "", val)  # removing the trailing ".0"
-        if not val.isdecimal() and not (val.startswith("0b") or val.startswith("0o") or val.startswith("0x") and val[2:].isdecimal()):
-            print("??Error:csv_uty:{} was not decimal value:{}".format(val, column_name), file=sys.stderr)
+        vs, ok = digits_to_uint64(digits[mask], base)
+        idx = np.flatnonzero(mask)[ok]
+        values[idx] = vs[ok]
+        done[idx] = True
+    n_bits[done] = np.clip(np.frexp(values[done].astype(np.float64))[1], 1, 64)
+    # rounding error of float64 makes one more bit for large values
+    over = done & (n_bits > 1)
+    over[over] = (values[over] >> (n_bits[over] - 1).astype(np.uint64)) == 0
+    n_bits[over] -= 1
+    is_bits = is_bits.to_numpy()
+    n_bits[is_bits & done] = ds[is_bits & done].str.len().to_numpy()
+
+    # values that have more than 64 bits
+    wide_bits = {}
+    for ir in np.flatnonzero(~done & ~invalid.to_numpy()):
+        val = ds.iloc[ir].lower()
+        try:
+            if is_bits[ir]:
+                pass
+            elif val.isdecimal():
+                val = "{:0b}".format(int(val))
+            else:
+                val = "{:0b}".format(int(val[2:], {"0b": 2, "0o": 8, "0x": 16}[val[:2]]))
+        except ValueError as e:
+            print("??Error:csv_uty:{} was not decimal value:{}:{}".format(val, column_name, e), file=sys.stderr)
             continue
-        val = val.lower()
-        if val.isdecimal() and len(re.sub(r"[01]", "", val)) > 0:
-            val = "{:0b}".format(int(val))
-        elif val.startswith("0b"):
-            val = "{:0b}".format(int(val[2:], 2))
-        elif val.startswith("0o"):
-            val = "{:0b}".format(int(val[2:], 8))
-        elif val.startswith("0x"):
-            val = "{:0b}".format(int(val[2:], 16))
-        vals = list(reversed(list(val)))
-        vname = ["{}_B{:03d}".format(column_name, i) for i in range(len(vals))]
-        cnames.update(set(vname))
-        df.loc[ir, vname] = vals
-
-    print("%Inf:csv_uty:new columns was added: {}".format(sorted(list(cnames))), file=sys.stderr)
-
-    # fillna by '0'
-    for cn in cnames:
-        df[cn].fillna(0, inplace=True)
-        df[cn] = df[cn].astype('int64')
+        wide_bits[ir] = val
+        n_bits[ir] = len(val)
+
+    nb = max(nbits, int(n_bits.max()) if len(n_bits) > 0 else 0)
+    bits = np.zeros((len(ds), nb), dtype=np.int8)
+    if nb > 0:
+        b64 = np.unpackbits(values.astype("<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+        bits[:, :min(nb, 64)] = b64[:, :nb]
+    for ir, val in wide_bits.items():
+        bits[ir, :len(val)] = np.array(list(reversed(val)), dtype=np.int8)
+
+    cnames = ["{}_B{:03d}".format(column_name, i) for i in range(nb)]
+    print("%Inf:csv_uty:new columns was added: {}".format(cnames), file=sys.stderr)
+    bits_df = pd.DataFrame(bits, columns=cnames, index=df.index)
+    d_cols = [v for v in cnames if v in df.columns]
+    for cn in d_cols:
+        df[cn] = bits_df[cn]
+    df = pd.concat([df, bits_df.drop(columns=d_cols)], axis=1)
 
     return df
 
@@ -795,13 +1258,14 @@ def do_split_into_columns(df, split_flags):
     return df
 
 
-def do_sort(df, column_defs, datetime_fmt=None):
-    if datetime_fmt is None:
-        print("%inf:csv_uty:sort:{}".format(column_defs), file=sys.stderr)
-    else:
-        print("%inf:csv_uty:sort as datetime:{},fmt={}".format(column_defs, datetime_fmt), file=sys.stderr)
-    # column_defs= [asc_or_desc|]column[,column...]
+def parse_sort_definition(column_defs):
+    """parse definition of sorting
+
+    :param column_defs: [asc_or_desc|]column[,column...]
+    :returns: list of columns and flag of ascending
+    :rtype: (list, bool)
 
+    """
     ascending = True
     if column_defs.find("|") != -1:
         cvs = re.split(r"\|", column_defs)
@@ -816,6 +1280,18 @@ def do_sort(df, column_defs, datetime_fmt=None):
 
     columns = re.split(r"\s*,\s*", column_defs)
 
+    return columns, ascending
+
+
+def do_sort(df, column_defs, datetime_fmt=None):
+    if datetime_fmt is None:
+        print("%inf:csv_uty:sort:{}".format(column_defs), file=sys.stderr)
+    else:
+        print("%inf:csv_uty:sort as datetime:{},fmt={}".format(column_defs, datetime_fmt), file=sys.stderr)
+    # column_defs= [asc_or_desc|]column[,column...]
+
+    columns, ascending = parse_sort_definition(column_defs)
+
     if datetime_fmt is not None:
         for cn in columns:
             df[cn] = pd.to_datetime(df[cn], format=datetime_fmt)
@@ -824,7 +1300,557 @@ def do_sort(df, column_defs, datetime_fmt=None):
     return df
 
 
-def output_dataframe(df, output_file, output_format, index=False, columns=[]):
+EXTERNAL_SORT_BLOCK_ROWS = 10000
+
+
+def write_sorted_run(df, run_file, block_rows=EXTERNAL_SORT_BLOCK_ROWS):
+    """write sorted dataframe into file for external merge sort
+
+    :param df: sorted dataframe
+    :param run_file: path of file
+    :param block_rows: number of rows in each block
+    :returns: False if dataframe is empty and no file was made
+    :rtype: bool
+    :remark:
+       dataframe is pickled block by block into the file, so it may be read back by only one block.
+
+    """
+    if len(df) == 0:
+        return False
+    with open(run_file, "wb") as f:
+        for ir in range(0, len(df), block_rows):
+            pickle.dump(df.iloc[ir:ir + block_rows], f, protocol=pickle.HIGHEST_PROTOCOL)
+    return True
+
+
+def read_sorted_run(run_file, columns, ascending):
+    """read rows from file that was made by write_sorted_run
+
+    :param run_file: path of file
+    :param columns: list of columns as keys of sorting
+    :param ascending: flag of ascending
+    :returns: generator of (key, row), row is tuple of values
+    :remark:
+       NA in keys is sorted at last, like 'na_position="last"'.
+
+    """
+    na_key, v_flag = ((1, ), 0) if ascending else ((0, ), 1)
+    with open(run_file, "rb") as f:
+        while True:
+            try:
+                block = pickle.load(f)
+            except EOFError:
+                break
+            keys = []
+            for cn in columns:
+                na_mask = block[cn].isna().to_numpy()
+                keys.append([na_key if na else (v_flag, v) for na, v in zip(na_mask, block[cn].to_numpy(dtype=object))])
+            for key, row in zip(zip(*keys), block.itertuples(index=False, name=None)):
+                yield key, row
+
+
+def merge_sorted_runs(run_files, columns, ascending, block_rows=EXTERNAL_SORT_BLOCK_ROWS):
+    """merge sorted runs by k-way merge
+
+    :param run_files: list of files that were made by write_sorted_run
+    :param columns: list of columns as keys of sorting
+    :param ascending: flag of ascending
+    :param block_rows: number of rows in each result
+    :returns: generator of sorted dataframe
+    :remark:
+       only one block of each run is kept in memory, and only one row of each run is in the heap.
+
+    """
+    df_dtypes = None
+    for rf in run_files:
+        with open(rf, "rb") as f:
+            try:
+                df_dtypes = pickle.load(f).dtypes
+                break
+            except EOFError:
+                continue
+    if df_dtypes is None:
+        return
+    runs = [read_sorted_run(rf, columns, ascending) for rf in run_files]
+    rows = []
+    for _, row in heapq.merge(*runs, key=lambda x: x[0], reverse=not ascending):
+        rows.append(row)
+        if len(rows) >= block_rows:
+            yield pd.DataFrame(rows, columns=df_dtypes.index).astype(df_dtypes)
+            rows = []
+    if len(rows) > 0:
+        yield pd.DataFrame(rows, columns=df_dtypes.index).astype(df_dtypes)
+
+
+def referred_columns(row_stage_defs, sort_defs=None, split_flags=[], decomp_bits_columns=[], stack_group_column=None):
+    """find names of columns that are referred by processings
+
+    :param row_stage_defs: dict of arguments for do_row_stages
+    :param sort_defs: definition of '--sort' or '--sort_datetime'
+    :param split_flags: list of definitions for '--split_into_columns'
+    :param decomp_bits_columns: list of definitions for '--decompose_bit_string'
+    :param stack_group_column: name of column for '--stack'
+    :returns: list of names of columns, and flag that all columns are required
+    :rtype: (list, bool)
+    :remark:
+       'all' in '--drop_na_columns' or '--drop_duplicated', and 'df' in expression of '--add_columns' or '--trim_columns'
+       require all columns.
+
+    """
+    columns = []
+    all_required = False
+    for cn in row_stage_defs["drop_na_columns"] + row_stage_defs["drop_dup_columns"]:
+        if cn == "all":
+            all_required = True
+        columns.append(cn)
+    for cd in row_stage_defs["ch_timefreqs"]:
+        cvs = re.split(r"\s*(?<!\\)=\s*", cd)
+        if len(cvs) > 1:
+            columns.append(re.split(r"\s*(?<!\\):\s*", cvs[1])[0])
+    for cd in row_stage_defs["add_columns"] + row_stage_defs["trm_columns"]:
+        cvs = re.split(r"\s*=\s*", cd, maxsplit=1)
+        if len(cvs) > 1:
+            columns.extend(re.findall(r"\${([^}]+)}", cvs[1]))
+            if re.search(r"\bdf\b", re.sub(r"\${([^}]+)}", "", cvs[1])):
+                all_required = True
+            if cd in row_stage_defs["trm_columns"]:
+                columns.append(cvs[0])
+    for cd in row_stage_defs["typ_columns"] + row_stage_defs["fillna_defs"] + row_stage_defs["replace_defs"]:
+        columns.append(re.split(r"\s*(?<!\\)=\s*", cd)[0])
+    for cd in row_stage_defs["split_csvs"] + split_flags:
+        columns.append(re.split(r"\s*(?<!\\):\s*", cd)[0])
+    for cd in decomp_bits_columns:
+        columns.append(re.split(r":", cd)[0])
+    if sort_defs is not None:
+        columns.extend(parse_sort_definition(sort_defs)[0])
+    if stack_group_column is not None:
+        columns.append(stack_group_column)
+
+    return columns, all_required
+
+
+def read_csv_header(in_file):
+    """read names of columns from header line
+
+    :param in_file: path of csv file or sys.stdin
+    :returns: list of names of columns
+    :rtype: list
+    :remark:
+       for sys.stdin, the header line is consumed, so the rest must be read with 'header=None, names=...'.
+
+    """
+    if in_file == sys.stdin:
+        return list(pd.read_csv(io.StringIO(in_file.readline()), dtype="string").columns)
+    return list(pd.read_csv(in_file, dtype="string", nrows=0).columns)
+
+
+def select_columns_to_read(header_columns,
+                           required_columns,
+                           output_columns=[],
+                           output_columns_regex=None,
+                           drop_columns=[],
+                           drop_columns_regex=None,
+                           rename_columns={},
+                           all_required=False):
+    """select columns to read, for 'usecols' of 'pd.read_csv'
+
+    :param header_columns: list of names of columns in header
+    :param required_columns: list of columns that are referred by processings
+    :param output_columns: list of columns to output, names after renaming
+    :param output_columns_regex: regular expression for columns to output
+    :param drop_columns: list of columns to drop
+    :param drop_columns_regex: regular expression for columns to drop
+    :param rename_columns: dict of {old_name: new_name}
+    :param all_required: if True, all columns without dropped columns are required.
+    :returns: list of columns or None, that means all columns.
+    :rtype: list
+
+    """
+    if len(output_columns) == 0 and output_columns_regex is None:
+        all_required = True
+    if all_required and len(drop_columns) == 0 and drop_columns_regex is None:
+        return None
+
+    required = set(required_columns) | set(output_columns)
+    required |= set([k for k, v in rename_columns.items() if v in output_columns])
+
+    use_columns = []
+    for cname in header_columns:
+        if cname in drop_columns or (drop_columns_regex is not None and re.search(drop_columns_regex, cname)):
+            continue
+        if all_required or cname in required or (output_columns_regex is not None and re.search(output_columns_regex, cname)):
+            use_columns.append(cname)
+
+    return use_columns
+
+
+def do_row_stages(csv_df,
+                  serial_column="",
+                  serial_step=1,
+                  drop_columns=[],
+                  drop_rows=[],
+                  drop_na_columns=[],
+                  drop_dup_columns=[],
+                  ch_timefreqs=[],
+                  add_columns=[],
+                  trm_columns=[],
+                  typ_columns=[],
+                  fillna_defs=[],
+                  replace_defs=[],
+                  split_csvs=[],
+                  streaming=False,
+                  dup_filter=None):
+    """apply processings, that need only values in each row, to dataframe
+
+    :param csv_df: dataframe
+    :param serial_column: name of serial column
+    :param serial_step: step of serial number
+    :param drop_columns: list of columns to drop
+    :param drop_rows: list of index of rows to drop, result of parse_drop_rows
+    :param drop_na_columns: list of columns to check NA
+    :param drop_dup_columns: list of columns to check duplicated rows
+    :param ch_timefreqs: list of definitions for '--change_timefreq'
+    :param add_columns: list of definitions for '--add_columns'
+    :param trm_columns: list of definitions for '--trim_columns'
+    :param typ_columns: list of definitions for '--type_columns'
+    :param fillna_defs: list of definitions for '--fillna'
+    :param replace_defs: list of definitions for '--replace'
+    :param split_csvs: list of definitions for '--split_into_rows'
+    :param streaming: if True, 'csv_df' is treated as a chunk of 'pd.read_csv(chunksize=...)'.
+    :param dup_filter: StreamingDeduplicator, that is used instead of 'drop_duplicates' in streaming mode.
+    :returns: dataframe
+    :rtype: pandas.DataFrame
+    :remark:
+       index of 'csv_df' must be serial number of rows in the input, it is kept in chunks that was read by 'pd.read_csv(chunksize=...)'.
+       So serial column and '--drop_rows' are available in streaming mode.
+
+    """
+    # add serial column
+    if len(serial_column) > 0:
+        print("%Inf:csv_uty:add serial column:{}".format(serial_column), file=sys.stderr)
+        if serial_column in csv_df:
+            print("#Warn:csv_uty:{} already exits, it was overwritten.", file=sys.stderr)
+        csv_df[serial_column] = csv_df.index * serial_step
+
+    # dropping columns
+    if len(drop_columns) > 0:
+        print("%Inf:csv_uty:drop columns:{}".format(drop_columns), file=sys.stderr)
+        try:
+            csv_df.drop(columns=drop_columns, inplace=True)
+        except KeyError as e:
+            print("??Error:csv_uty:invalid name of column in '--drop_columns':{} ".format(e), file=sys.stderr)
+            sys.exit(1)
+
+    # dropping rows
+    if len(drop_rows) > 0:
+        if not streaming:
+            print("%Inf:csv_uty:drop rows:{}".format(drop_rows), file=sys.stderr)
+        try:
+            if streaming:
+                csv_df.drop(index=csv_df.index.intersection(drop_rows), inplace=True)
+            else:
+                csv_df.drop(index=csv_df.index[drop_rows], inplace=True)
+        except IndexError as e:
+            print("??Error:csv_uty:invalid index of row in '--drop_rows':{} ".format(e), file=sys.stderr)
+            sys.exit(1)
+
+    # dropping na
+    if len(drop_na_columns) > 0:
+        nr0 = len(csv_df)
+        print("%Inf:csv_uty:drop na rows for {}".format(drop_na_columns), file=sys.stderr)
+        if drop_na_columns[0] == "all":
+            csv_df.dropna(how="any", axis="rows", inplace=True)
+        else:
+            try:
+                csv_df.dropna(subset=drop_na_columns, axis="rows", inplace=True)
+            except KeyError as e:
+                print("??Error:csv_uty:invalid name of column in '--drop_na_columns':{} ".format(e), file=sys.stderr)
+                sys.exit(1)
+        print("%Inf:csv_uty:number of dropped rows as na: {}".format(nr0 - len(csv_df)), file=sys.stderr)
+
+    # dropping duplicated
+    if len(drop_dup_columns) > 0:
+        nr0 = len(csv_df)
+        print("%Inf:csv_uty:drop duplicated rows for {}".format(drop_dup_columns), file=sys.stderr)
+        if dup_filter is not None:
+            n_dropped = dup_filter.n_dropped
+            try:
+                csv_df = dup_filter.filter(csv_df)
+            except KeyError as e:
+                print("??Error:csv_uty:invalid name of column in '--drop_duplicated':{} ".format(e), file=sys.stderr)
+                sys.exit(1)
+            # in fallback mode, rows that are not returned are not dropped yet
+            n_dropped = dup_filter.n_dropped - n_dropped
+            n_deferred = nr0 - len(csv_df) - n_dropped
+            if n_deferred > 0:
+                print("%Inf:csv_uty:number of rows deferred to check duplicated: {}".format(n_deferred), file=sys.stderr)
+        elif drop_dup_columns[0] == "all":
+            csv_df.drop_duplicates(keep="first", inplace=True)
+        else:
+            try:
+                csv_df.drop_duplicates(subset=drop_dup_columns, keep="first", inplace=True)
+            except KeyError as e:
+                print("??Error:csv_uty:invalid name of column in '--drop_duplicated':{} ".format(e), file=sys.stderr)
+                sys.exit(1)
+        if dup_filter is None:
+            n_dropped = nr0 - len(csv_df)
+        print("%Inf:csv_uty:number of dropped rows as duplicated: {}".format(n_dropped), file=sys.stderr)
+
+    try:
+        # adding new columns for changing time frequency
+        if len(ch_timefreqs) > 0:
+            print("%Inf:csv_uty:changing time frequency", file=sys.stderr)
+            csv_df = change_time_frequency(csv_df, ch_timefreqs)
+
+        # adding columns
+        if len(add_columns) > 0:
+            print("%Inf:csv_uty:adding columns", file=sys.stderr)
+            toint_columns = prefix_number_to_int(csv_df)
+            add_columns_to_df(csv_df, add_columns)
+            int_to_prefix_numer(csv_df, toint_columns)
+
+        # triming columns
+        if len(trm_columns) > 0:
+            print("%Inf:csv_uty:trim column", file=sys.stderr)
+            trim_columns_in_df(csv_df, trm_columns)
+
+        # type columns
+        if len(typ_columns) > 0:
+            print("%Inf:csv_uty:set data type", file=sys.stderr)
+            type_columns_in_df(csv_df, typ_columns)
+
+    except NameError as e:
+        print("??Error:csv_uty:you may use '--prologe' option: {}".format(e), file=sys.stderr)
+        sys.exit(1)
+
+    # fill na
+    if len(fillna_defs) > 0:
+        csv_df = do_fillna(csv_df, fillna_defs)
+
+    # replace
+    if len(replace_defs) > 0:
+        csv_df = do_replace(csv_df, replace_defs)
+
+    # split csv
+    if len(split_csvs) > 0:
+        csv_df = do_split_into_rows(csv_df, split_csvs)
+
+    return csv_df
+
+
+def do_rename_columns(df, rename_columns):
+    """rename columns
+
+    :param df: dataframe that will be modified inplace
+    :param rename_columns: dict of {old_name: new_name}
+    :returns: dataframe
+    :rtype: pandas.DataFrame
+
+    """
+    if len(rename_columns) > 0:
+        print("%Inf:csv_uty:rename columns:{}".format(rename_columns), file=sys.stderr)
+        invalid_cols = list(set(rename_columns.keys()) - set(df.columns))
+        if len(invalid_cols) > 0:
+            print("#warn:csv_uty: invalid columns in renaming:{}".format(invalid_cols), file=sys.stderr)
+        df.rename(columns=rename_columns, inplace=True, errors='ignore')
+
+    return df
+
+
+DEDUP_MAX_KEYS = 10000000
+DEDUP_PARTITIONS = 16
+DEDUP_ROW_COLUMN = "__csv_uty_row__"
+
+
+class StreamingDeduplicator():
+    """drop duplicated rows in chunks, keeping first occurrences
+
+    :remark:
+       values of subset columns in each row are hashed into 64-bit digest by 'pandas.util.hash_pandas_object',
+       and digests that were already seen are kept as sorted numpy arrays, 8 bytes for each key.
+       When number of keys exceeds 'max_keys', keys in memory are frozen, and rows that have new digest
+       are partitioned by digest into temporary files. Those are deduplicated partition by partition and
+       merged by row number at 'flush'.
+       Rows that have different values but same digest are treated as duplicated, but the probability is negligible.
+
+    """
+    def __init__(self, columns, max_keys=DEDUP_MAX_KEYS, n_partitions=DEDUP_PARTITIONS):
+        """
+        :param columns: list of columns to check duplicated rows, ["all"] means all columns
+        :param max_keys: maximum number of keys in memory
+        :param n_partitions: number of partitions in fallback mode
+        """
+        self.__columns = columns
+        self.__max_keys = max_keys
+        self.__n_partitions = n_partitions
+        self.__seen = []  # sorted unique digests, sizes of those are decreasing
+        self.__n_keys = 0
+        self.__spill_dir = None
+        self.__n_dropped = 0
+
+    @property
+    def n_dropped(self):
+        return self.__n_dropped
+
+    def digest(self, df):
+        """hash values of subset columns in each row
+
+        :param df: dataframe
+        :returns: digests
+        :rtype: numpy.ndarray of uint64
+
+        """
+        if self.__columns[0] == "all":
+            sub_df = df
+        else:
+            sub_df = df[self.__columns]
+        return pd.util.hash_pandas_object(sub_df, index=False).to_numpy(dtype=np.uint64)
+
+    def is_seen(self, digests):
+        seen_mask = np.zeros(len(digests), dtype=bool)
+        for keys in self.__seen:
+            pos = np.searchsorted(keys, digests)
+            pos[pos == len(keys)] = 0
+            seen_mask |= keys[pos] == digests
+        return seen_mask
+
+    def add_keys(self, digests):
+        keys = np.unique(digests)
+        if len(keys) == 0:
+            return
+        self.__n_keys += len(keys)
+        # merge arrays that have similar size, like binary counter, to keep number of arrays small
+        while len(self.__seen) > 0 and len(self.__seen[-1]) <= 2 * len(keys):
+            keys = np.union1d(self.__seen.pop(), keys)
+        self.__seen.append(keys)
+
+    def filter(self, df):
+        """drop rows that were already seen
+
+        :param df: dataframe, a chunk
+        :returns: dataframe that has only first occurrences
+        :rtype: pandas.DataFrame
+        :remark:
+           in fallback mode, rows that have new digest are stored in temporary files and are not returned.
+
+        """
+        nr0 = len(df)
+        digests = self.digest(df)
+        new_mask = ~self.is_seen(digests)
+        if self.__spill_dir is None:
+            new_mask &= ~pd.Series(digests).duplicated(keep="first").to_numpy()
+            self.add_keys(digests[new_mask])
+            if self.__n_keys > self.__max_keys:
+                print("#warn:csv_uty:drop duplicated:number of keys exceeds {}, disk partitioned hashing is used".format(
+                    self.__max_keys),
+                      file=sys.stderr)
+                self.__spill_dir = tempfile.TemporaryDirectory(prefix="csv_uty_")
+                self.__spill_files = [
+                    Path(self.__spill_dir.name) / "dedup_{:03d}.pkl".format(ip) for ip in range(self.__n_partitions)
+                ]
+            self.__n_dropped += nr0 - np.count_nonzero(new_mask)
+            return df[new_mask]
+
+        self.__n_dropped += nr0 - np.count_nonzero(new_mask)
+        df = df[new_mask]
+        parts = digests[new_mask] % np.uint64(self.__n_partitions)
+        for ip in np.unique(parts):
+            with open(self.__spill_files[ip], "ab") as f:
+                pickle.dump(df[parts == ip], f, protocol=pickle.HIGHEST_PROTOCOL)
+        return df.iloc[:0]
+
+    def flush(self):
+        """deduplicate rows in temporary files
+
+        :returns: generator of dataframe, in order of rows in input
+        :remark:
+           index of each dataframe is kept.
+
+        """
+        if self.__spill_dir is None:
+            return
+        run_files = []
+        for ip, spill_file in enumerate(self.__spill_files):
+            if not spill_file.exists():
+                continue
+            blocks = []
+            with open(spill_file, "rb") as f:
+                while True:
+                    try:
+                        blocks.append(pickle.load(f))
+                    except EOFError:
+                        break
+            df = pd.concat(blocks)
+            spill_file.unlink()
+            nr0 = len(df)
+            df = df[~pd.Series(self.digest(df)).duplicated(keep="first").to_numpy()]
+            self.__n_dropped += nr0 - len(df)
+            df.index.name = DEDUP_ROW_COLUMN
+            run_file = Path(self.__spill_dir.name) / "run_{:03d}.pkl".format(ip)
+            if write_sorted_run(df.reset_index(), run_file):
+                run_files.append(run_file)
+        for df in merge_sorted_runs(run_files, [DEDUP_ROW_COLUMN], True):
+            df = df.set_index(DEDUP_ROW_COLUMN)
+            df.index.name = None
+            yield df
+        self.__spill_dir.cleanup()
+        self.__spill_dir = None
+
+
+def process_chunks(csv_df, csv_reader, row_stage_defs, dup_filter=None):
+    """apply row stages to chunks
+
+    :param csv_df: first chunk
+    :param csv_reader: reader of 'pd.read_csv(chunksize=...)'
+    :param row_stage_defs: dict of arguments for do_row_stages
+    :param dup_filter: StreamingDeduplicator or None
+    :returns: generator of dataframe
+    :remark:
+       index of rows in '--drop_rows' is checked with total number of rows after the last chunk.
+
+    """
+    drop_rows = row_stage_defs.get("drop_rows", [])
+    if len(drop_rows) > 0:
+        print("%Inf:csv_uty:drop rows:{}".format(drop_rows), file=sys.stderr)
+    n_rows = 0
+    while csv_df is not None:
+        n_rows += len(csv_df)
+        yield do_row_stages(csv_df, streaming=True, dup_filter=dup_filter, **row_stage_defs)
+        csv_df = next(csv_reader, None)
+    if len(drop_rows) > 0 and max(drop_rows) >= n_rows:
+        print("??Error:csv_uty:invalid index of row in '--drop_rows':index {} is out of bounds for axis 0 with size {} ".format(
+            max(drop_rows), n_rows),
+              file=sys.stderr)
+        sys.exit(1)
+
+    if dup_filter is not None:
+        # rows, that were stored in fallback mode, have passed stages before dropping duplicated rows
+        post_defs = dict(row_stage_defs, serial_column="", drop_columns=[], drop_rows=[], drop_na_columns=[], drop_dup_columns=[])
+        for csv_df in dup_filter.flush():
+            yield do_row_stages(csv_df, streaming=True, **post_defs)
+        print("%Inf:csv_uty:streaming mode:total number of dropped rows as duplicated: {}".format(dup_filter.n_dropped),
+              file=sys.stderr)
+
+
+def output_chunk(df, output_file, output_format, output_columns, rename_columns, first_chunk):
+    """output a chunk in streaming mode
+
+    :param df: dataframe
+    :param output_file: file handler
+    :param output_format: output format
+    :param output_columns: list of columns to output
+    :param rename_columns: dict of {old_name: new_name}
+    :param first_chunk: if True, header is written and columns are checked
+
+    """
+    df = do_rename_columns(df, rename_columns)
+    if first_chunk and not all([v in df.columns for v in output_columns]):
+        print("??Error:csv_uty:'--columns' was inconsist for input", file=sys.stderr)
+        sys.exit(1)
+    output_dataframe(df, output_file, output_format, index=False, columns=output_columns, header=first_chunk, verbose=False)
+
+
+def output_dataframe(df, output_file, output_format, index=False, columns=[], header=True, verbose=True):
     """FIXME! briefly describe function
 
     :param df: 
@@ -832,16 +1858,19 @@ def output_dataframe(df, output_file, output_format, index=False, columns=[]):
     :param output_format: 
     :param index: 
     :param columns: 
+    :param header: if False, header is not written for csv format. this is used for chunks in streaming mode.
+    :param verbose: if False, output is not logged. this is used for chunks in streaming mode.
     :returns: 
     :rtype: 
 
     """
-    print("%inf:csv_uty:output into:{} with '{}' format".format(output_file, output_format), file=sys.stderr)
+    if verbose:
+        print("%inf:csv_uty:output into:{} with '{}' format".format(output_file, output_format), file=sys.stderr)
     if len(columns) > 0:
         d_cols = list(set(df.columns) - set(columns))
         df.drop(columns=d_cols, inplace=True)
     if output_format == "csv":
-        df.to_csv(output_file, index=index)
+        df.to_csv(output_file, index=index, header=header)
     elif output_format == "hdf":
         df.to_hdf(output_file, key="csv_uty", mode="w", complevel=6)
     elif output_format == "parquet":
@@ -999,13 +2028,12 @@ if __name__ == "__main__":
 
     serial_column_s = args.SERICOLUMN
     serial_column = ""
+    serial_step = 1
     if serial_column_s is not None:
         cvs = re.split(r"\s*:\s*", serial_column_s)
         serial_column = cvs[0]
         if len(cvs) > 1:
             serial_step = int(cvs[1])
-        else:
-            serial_step = 1
 
     rename_columns_s = args.RENAMECOLS
     rename_columns = {}
@@ -1023,27 +2051,90 @@ if __name__ == "__main__":
         print("??error:csv_uty:invalid combination: '--stack' and '--transpose'", file=sys.stderr)
         sys.exit(1)
 
+    chunksize = args.CHUNKSIZE
+    if chunksize is not None:
+        if chunksize <= 0:
+            print("??error:csv_uty:'--chunksize' must be positive integer:{}".format(chunksize), file=sys.stderr)
+            sys.exit(1)
+        no_stream_opts = []
+        if any([re.search(r"(?<!\\)=\s*@", v) is not None for v in fillna_defs]):
+            no_stream_opts.append("--fillna=COLUMN=@...")
+        if len(split_flags) > 0:
+            no_stream_opts.append("--split_into_columns")
+        if len(decomp_bits_columns) > 0:
+            no_stream_opts.append("--decompose_bit_string")
+        if stack_group_column is not None:
+            no_stream_opts.append("--stack")
+        if trans_mode:
+            no_stream_opts.append("--transpose")
+        if output_format != "csv":
+            no_stream_opts.append("--output_format={}".format(output_format))
+        if len(no_stream_opts) > 0:
+            print("??error:csv_uty:'--chunksize' is not available with {}, those need entire data.".format(", ".join(no_stream_opts)),
+                  file=sys.stderr)
+            sys.exit(1)
+
+    row_stage_defs = {
+        "serial_column": serial_column,
+        "serial_step": serial_step,
+        "drop_columns": drop_columns,
+        "drop_rows": drop_rows,
+        "drop_na_columns": drop_na_columns,
+        "drop_dup_columns": drop_dup_columns,
+        "ch_timefreqs": ch_timefreqs,
+        "add_columns": add_columns,
+        "trm_columns": trm_columns,
+        "typ_columns": typ_columns,
+        "fillna_defs": fillna_defs,
+        "replace_defs": replace_defs,
+        "split_csvs": split_csvs
+    }
+
+    # columns to read
+    required_columns, all_required = referred_columns(row_stage_defs,
+                                                      sort_defs=sort_defs,
+                                                      split_flags=split_flags,
+                                                      decomp_bits_columns=decomp_bits_columns,
+                                                      stack_group_column=stack_group_column)
+    header_columns = read_csv_header(in_file)
+    usecols = select_columns_to_read(header_columns,
+                                     required_columns,
+                                     output_columns=output_columns,
+                                     output_columns_regex=output_columns_regex,
+                                     drop_columns=drop_columns,
+                                     drop_columns_regex=drop_columns_regex,
+                                     rename_columns=rename_columns,
+                                     all_required=all_required)
+    read_opts = {"dtype": "string", "usecols": usecols}
+    if in_file == sys.stdin:
+        read_opts.update({"header": None, "names": header_columns})
+    if usecols is not None:
+        print("%inf:csv_uty:number of columns to read: {}/{}".format(len(usecols), len(header_columns)), file=sys.stderr)
+
     #--- processig
     print("%Inf:csv_uty:read data from {}".format(in_file), file=sys.stderr)
-    csv_df = pd.read_csv(in_file, dtype="string")
+    if chunksize is not None:
+        csv_reader = read_csv(in_file, reader=args.READER, cache=args.CACHE, chunksize=chunksize, **read_opts)
+        csv_df = next(csv_reader, None)
+        if csv_df is None:
+            print("??Error:csv_uty:no data in {}".format(in_file), file=sys.stderr)
+            sys.exit(1)
+    else:
+        csv_df = read_csv(in_file, reader=args.READER, cache=args.CACHE, **read_opts)
     # csv_df = pd.read_csv(in_file)
 
     # columsn to output
     if output_columns_regex is not None:
-        o_cols = [v for v in csv_df.columns if re.search(output_columns_regex, v)]
+        o_cols = [v for v in header_columns if re.search(output_columns_regex, v)]
         print("%inf:csv_uty:output_columns_regex:columns to output:{}".format(o_cols), file=sys.stderr)
         output_columns.extend(o_cols)
 
-    # add serial column
-    if len(serial_column) > 0:
-        print("%Inf:csv_uty:add serial column:{}".format(serial_column), file=sys.stderr)
-        if serial_column in csv_df:
-            print("#Warn:csv_uty:{} already exits, it was overwritten.", file=sys.stderr)
-        csv_df[serial_column] = list(range(0, len(csv_df) * serial_step, serial_step))
-
     # drop columns
     if drop_columns_regex is not None:
-        d_cols = [v for v in csv_df.columns if re.search(drop_columns_regex, v)]
+        cnames = list(header_columns)
+        if len(serial_column) > 0:
+            cnames.append(serial_column)
+        d_cols = [v for v in cnames if re.search(drop_columns_regex, v)]
         print("%inf:csv_uty:drop_columns_regex: columns to drop:{}".format(d_cols), file=sys.stderr)
         drop_columns.extend(d_cols)
         for dc in drop_columns:
@@ -1051,91 +2142,56 @@ if __name__ == "__main__":
                 output_columns.remove(dc)
                 print("#warning:csv_uty:{} was rmoved from output columns by regex".format(dc), file=sys.stderr)
 
-    # dropping columns
-    if len(drop_columns) > 0:
-        print("%Inf:csv_uty:drop columns:{}".format(drop_columns), file=sys.stderr)
-        try:
-            csv_df.drop(columns=drop_columns, inplace=True)
-        except KeyError as e:
-            print("??Error:csv_uty:invalid name of column in '--drop_columns':{} ".format(e), file=sys.stderr)
-            sys.exit(1)
+    if usecols is not None:
+        # columns that were not read need not to be dropped, but unknown columns are left to cause an error.
+        drop_columns[:] = [v for v in drop_columns if v in csv_df.columns or v not in header_columns]
 
-    # dropping rows
     if len(drop_rows) > 0:
-        print("%Inf:csv_uty:drop rows:{}".format(drop_rows), file=sys.stderr)
         drop_rows = parse_drop_rows(drop_rows)
-        try:
-            csv_df.drop(index=csv_df.index[drop_rows], inplace=True)
-        except IndexError as e:
-            print("??Error:csv_uty:invalid index of row in '--drop_rows':{} ".format(e), file=sys.stderr)
-            sys.exit(1)
-
-    # dropping na
-    if len(drop_na_columns) > 0:
-        nr0 = len(csv_df)
-        print("%Inf:csv_uty:drop na rows for {}".format(drop_na_columns), file=sys.stderr)
-        if drop_na_columns[0] == "all":
-            csv_df.dropna(how="any", axis="rows", inplace=True)
-        else:
-            try:
-                csv_df.dropna(subset=drop_na_columns, axis="rows", inplace=True)
-            except KeyError as e:
-                print("??Error:csv_uty:invalid name of column in '--drop_na_columns':{} ".format(e), file=sys.stderr)
-                sys.exit(1)
-        print("%Inf:csv_uty:number of dropped rows as na: {}".format(nr0 - len(csv_df)), file=sys.stderr)
-
-    # dropping duplicated
-    if len(drop_dup_columns) > 0:
-        nr0 = len(csv_df)
-        print("%Inf:csv_uty:drop duplicated rows for {}".format(drop_dup_columns), file=sys.stderr)
-        if drop_dup_columns[0] == "all":
-            csv_df.drop_duplicates(keep="first", inplace=True)
-        else:
-            try:
-                csv_df.drop_duplicates(subset=drop_dup_columns, keep="first", inplace=True)
-            except KeyError as e:
-                print("??Error:csv_uty:invalid name of column in '--drop_duplicated':{} ".format(e), file=sys.stderr)
-                sys.exit(1)
-        print("%Inf:csv_uty:number of dropped rows as duplicated: {}".format(nr0 - len(csv_df)), file=sys.stderr)
-
-    try:
-        # adding new columns for changing time frequency
-        if len(ch_timefreqs) > 0:
-            print("%Inf:csv_uty:changing time frequency", file=sys.stderr)
-            csv_df = change_time_frequency(csv_df, ch_timefreqs)
-
-        # adding columns
-        if len(add_columns) > 0:
-            print("%Inf:csv_uty:adding columns", file=sys.stderr)
-            toint_columns = prefix_number_to_int(csv_df)
-            add_columns_to_df(csv_df, add_columns)
-            int_to_prefix_numer(csv_df, toint_columns)
-
-        # triming columns
-        if len(trm_columns) > 0:
-            print("%Inf:csv_uty:trim column", file=sys.stderr)
-            trim_columns_in_df(csv_df, trm_columns)
-
-        # type columns
-        if len(typ_columns) > 0:
-            print("%Inf:csv_uty:set data type", file=sys.stderr)
-            type_columns_in_df(csv_df, typ_columns)
-
-    except NameError as e:
-        print("??Error:csv_uty:you may use '--prologe' option: {}".format(e), file=sys.stderr)
-        sys.exit(1)
-
-    # fill na
-    if len(fillna_defs) > 0:
-        csv_df = do_fillna(csv_df, fillna_defs)
-
-    # replace
-    if len(replace_defs) > 0:
-        csv_df = do_replace(csv_df, replace_defs)
-
-    # split csv
-    if len(split_csvs) > 0:
-        csv_df = do_split_into_rows(csv_df, split_csvs)
+        row_stage_defs["drop_rows"] = drop_rows
+
+    if chunksize is not None:
+        print("%Inf:csv_uty:streaming mode:chunksize={}".format(chunksize), file=sys.stderr)
+        print("%inf:csv_uty:output into:{} with '{}' format".format(output_file, output_format), file=sys.stderr)
+        if isinstance(output_file, str):
+            output_file = open(output_file, "w")
+        n_chunks = 0
+        n_rows = 0
+        if sort_defs is not None:
+            # external merge sort
+            sort_columns, sort_ascending = parse_sort_definition(sort_defs)
+            sort_dir = tempfile.TemporaryDirectory(prefix="csv_uty_")
+            sort_runs = []
+        dup_filter = StreamingDeduplicator(drop_dup_columns) if len(drop_dup_columns) > 0 else None
+        for csv_df in process_chunks(csv_df, csv_reader, row_stage_defs, dup_filter=dup_filter):
+            if sort_defs is not None:
+                csv_df = do_sort(csv_df, sort_defs, datetime_fmt=dt_sort_fmt)
+                if n_chunks == 0:
+                    # template to write header, even if all chunks are empty
+                    empty_df = csv_df.iloc[:0]
+                run_file = Path(sort_dir.name) / "run_{:06d}.pkl".format(n_chunks)
+                if write_sorted_run(csv_df, run_file, block_rows=min(chunksize, EXTERNAL_SORT_BLOCK_ROWS)):
+                    sort_runs.append(run_file)
+            else:
+                output_chunk(csv_df, output_file, output_format, output_columns, rename_columns, n_chunks == 0)
+                n_rows += len(csv_df)
+            n_chunks += 1
+        if sort_defs is not None:
+            print("%Inf:csv_uty:streaming mode:merge sorted runs:{}".format(len(sort_runs)), file=sys.stderr)
+            first_chunk = True
+            for csv_df in merge_sorted_runs(sort_runs, sort_columns, sort_ascending):
+                output_chunk(csv_df, output_file, output_format, output_columns, rename_columns, first_chunk)
+                first_chunk = False
+                n_rows += len(csv_df)
+            if first_chunk:
+                output_chunk(empty_df, output_file, output_format, output_columns, rename_columns, True)
+            sort_dir.cleanup()
+        print("%Inf:csv_uty:streaming mode:number of chunks={}, number of output rows={}".format(n_chunks, n_rows), file=sys.stderr)
+        if output_file != sys.stdout:
+            output_file.close()
+        sys.exit(0)
+
+    csv_df = do_row_stages(csv_df, **row_stage_defs)
 
     # split flag
     if len(split_flags) > 0:
@@ -1157,12 +2213,7 @@ if __name__ == "__main__":
         csv_df = do_sort(csv_df, sort_defs, datetime_fmt=dt_sort_fmt)
 
     # rename columns
-    if len(rename_columns) > 0:
-        print("%Inf:csv_uty:rename columns:{}".format(rename_columns), file=sys.stderr)
-        invalid_cols = list(set(rename_columns.keys()) - set(csv_df.columns))
-        if len(invalid_cols) > 0:
-            print("#warn:csv_uty: invalid columns in renaming:{}".format(invalid_cols), file=sys.stderr)
-        csv_df.rename(columns=rename_columns, inplace=True, errors='ignore')
+    csv_df = do_rename_columns(csv_df, rename_columns)
 
     if not all([v in csv_df.columns for v in output_columns]):
         print("??Error:csv_uty:'--columns' was inconsist for input", file=sys.stderr)
@@ -16,9 +16,12 @@
 import argparse
 import textwrap
 import sys
+from pathlib import Path
 
 import re
-import pandas as pd
+
+sys.path.insert(0, format(Path(__file__).parent))
+from csv_reader import add_reader_argument, read_csv
 
 VERSION = 1.0
 
@@ -62,6 +65,7 @@ example:
     arg_parser.add_argument('csv_file', metavar='CSV_FILE', help='files to read, if empty, stdin is used')
     arg_parser.add_argument('columns', metavar='COLUMN[,COLUMN..]', type=str, help='columns to process')
     arg_parser.add_argument('window_size', metavar='INT', type=int, help='size of window')
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -88,7 +92,7 @@ if __name__ == "__main__":
     if csv_file == "-":
         csv_file = sys.stdin
 
-    csv_df = pd.read_csv(csv_file)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
 
     r_params = {"center": True}
     if idx_col is not None:
@@ -21,8 +21,6 @@ import re
 
 from pathlib import Path
 
-import pandas as pd
-
 from openpyxl import Workbook
 from openpyxl.utils import get_column_letter
 from openpyxl.utils.units import pixels_to_points
@@ -33,6 +31,9 @@ from PIL import Image
 
 from io import BytesIO
 
+sys.path.insert(0, format(Path(__file__).parent))
+from csv_reader import add_reader_argument, read_csv
+
 VERSION = 1.0
 
 IMAGE_EXTENSIONS = ["bmp", "png", "jpg"]
@@ -108,6 +109,7 @@ example:
     arg_parser.add_argument("--output", dest="OUTPUT", help="path of file to output", type=str, metavar='EXCEL_FILE', default=None)
 
     arg_parser.add_argument('csv_file', metavar='CSV_FILE', help='csv file to read')
+    add_reader_argument(arg_parser)
     args = arg_parser.parse_args()
     return args
 
@@ -244,7 +246,7 @@ if __name__ == "__main__":
     if csv_file == "-":
         csv_file = sys.stdin
 
-    csv_df = pd.read_csv(csv_file)
+    csv_df = read_csv(csv_file, reader=args.READER, cache=args.CACHE)
 
     columns = []
     if columns_s is not None:
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# ----------------------------------------------------------------------
+# Name:         test_csv_status.py
+# Description:  tests of streaming mode of csv_status.py
+#
+# Author:       m.akei
+# Copyright:    (c) 2021 by m.na.akei
+# Time-stamp:   <2026-10-18 21:02:31>
+# Licence:
+#  Copyright (c) 2021 Masaharu N. Akei
+#
+#  This software is released under the MIT License.
+#    http://opensource.org/licenses/mit-license.php
+# ----------------------------------------------------------------------
+import io
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, format(Path(__file__).parent.parent / "csv_utility"))
+from csv_status import accumulate_statistics, status_by_mode_approx
+
+CSV_TEXT = "id,n\n0012,1\n12,2\n000e0006,3\n0034,\n0012,5\nab,6\n"
+
+
+def chunk_statistics(chunksize):
+    csv_reader = pd.read_csv(io.StringIO(CSV_TEXT), chunksize=chunksize, dtype=str)
+    return accumulate_statistics(csv_reader)[2]
+
+
+def test_strings_are_kept_over_chunks():
+    ps = pd.read_csv(io.StringIO(CSV_TEXT))["id"]
+    for chunksize in [1, 2, 3, 100]:
+        cs = chunk_statistics(chunksize)["id"]
+        assert cs.dtype() == ps.dtype
+        assert cs.value_counts().to_dict() == ps.value_counts().to_dict()
+        assert cs.describe()["top"] == "0012"
+        assert cs.nunique() == ps.nunique() == 5
+
+
+def test_numbers_are_same_as_entire_data():
+    ps = pd.read_csv(io.StringIO(CSV_TEXT))["n"]
+    for chunksize in [1, 2, 3, 100]:
+        cs = chunk_statistics(chunksize)["n"]
+        assert cs.dtype() == ps.dtype
+        assert cs.sum() == ps.sum()
+        assert cs.median() == ps.median()
+        assert cs.mode() == ps.mode().tolist()
+        assert (cs.v_max, cs.pos_max) == (ps.max(), ps.idxmax())
+
+
+def test_approx_strings_are_kept_over_chunks():
+    for chunksize in [1, 2, 100]:
+        csv_reader = pd.read_csv(io.StringIO("id,n\n0012,1\n12,1.0\nab,2\n0012,\n"), chunksize=chunksize, dtype=str)
+        output = io.StringIO()
+        status_by_mode_approx(csv_reader, output, "nunique", None)
+        assert output.getvalue() == "column,nunique\nid,3\nn,2\n"